@@ -1,3 +1,4 @@
+import json
 from pathlib import Path
 
 import colorama
@@ -9,13 +10,383 @@ from colorama import Fore, Style
 from community import community_louvain
 from tqdm import tqdm
 
+from graphLoader import loadTwitchGraph
+from csrGraph import TwitchCSRGraph
+from betweenness import approximateBetweenness
+from bfsSweep import shortestPathSweep
+from regionScheduler import runRegions
+from metricCache import MetricCache, fileHash
+from twitchStorage import readTable
+from powerIteration import loadWarmStart, powerCentralities, reportPowerIteration
+from communityDetection import ensemblePartition, reportEnsemble
+
 colorama.init()
 
 
-def StudyAllCountries(current_dir: Path) -> None:
+# Lista de categorias que não são videojogos
+non_Videojogos = ['IRL', 'Just Chatting', 'Watch TV', 'Art', 'Music',
+                  'Science & Technology', 'Software and Game Development',
+                  'Co-working & Studying', 'Crypto', 'Politics',
+                  'Talk Shows & Podcasts', 'DJs', 'Special Events',
+                  'Sports', 'Food & Drink', 'Casino', 'CooKing',
+                  'Poker', 'Virtual Casino', 'Tabletop RPGs']
+
+non_Videojogos = [Njogo.strip().lower() for Njogo in non_Videojogos]
+
+jogos_offline = ["The Callisto Protocol", "Kingdom Two Crowns", "My Hotel", "Disco Elysium",
+                 "Divinity: Original Sin II", "Grand Theft Auto: San Andreas", "osu!",
+                 "The Binding of Isaac: Repentance", "God of War Ragnarök", "BUCKSHOT ROULETTE", "Atomic Heart",
+                 "Gothic II", "Grand Theft Auto III", "Silent Hill 2", "Ghostwire: Tokyo", "DREDGE",
+                 "VLADiK BRUTAL", "Northern Journey", "The Dark Pictures Anthology: Little Hope",
+                 "Marvel's Spider-Man", "Resident Evil 4", "Crossout", "Horizon Zero Dawn Remastered", "Outlast II",
+                 "The Last of Us Part I", "Neva", "Risk of Rain 2", "ELDEN RING", "Alan Wake II",
+                 "DARK SOULS II: Scholar of the First Sin", "DARK SOULS III", "Dark Souls: Remastered", "Diablo II",
+                 "Fallout 4", "Dungeon Crusher: Soul Hunters", "Castlevania: Dawn of Sorrow", "Artifact",
+                 "I Wanna Kill the Kamilia 3", "Torchlight: Infinite", "The Guild 3", "Sid Meier's Civilization VI",
+                 "Sons of the Forest", "The Sims 4", "X4: Foundations", "Hades II",
+                 "Prince of Persia: The Lost Crown", "Bloodborne", "Angry Birds VR: Isle of Pigs",
+                 "Heroes of Might and Magic V", "Internet Cafe Simulator 2", "Wolfenstein: The New Order",
+                 "Factorio", "DOOM Eternal", "Everlasting Summer", "God Hand", "Beyond: Two Souls", "Mafia III",
+                 "Zenless Zone Zero", "Stardew Valley", "SIFU", "Dead Space 3", "Mafia II", "Fallout 2",
+                 "SnowRunner", "Hollow Knight", "The Witcher 3: Wild Hunt", "Killer Instinct", "Little Misfortune",
+                 "Magicraft", "Magicraft", "Planetbase", "Microsoft Flight Simulator 2024", "Songs of Conquest",
+                 "Stalker 2", "Amnesia: Rebirth", "Napoleon: Total War", "Gran Saga", "Pokémon Emerald Version",
+                 "Football, Tactics & Glory", "Katamari Damacy REROLL", "Lethal Company",
+                 "Vampire: The Masquerade - Bloodlines", "Red Dead Redemption", "The Walking Dead",
+                 "Detroit: Become Human", "Until Dawn", "DiRT Rally 2.0", "Portal 2", "Rise of the Tomb Raider",
+                 "Half-Life: Alyx", "Cyberpunk 2077", "Forza Horizon 5", "South Park: The Fractured But Whole",
+                 "TSIOQUE", "Need for Speed: Most Wanted", "inFAMOUS: Second Son", "Marvel's Spider-Man Remastered",
+                 "Alone in the Dark", "Lobotomy Corporation", "Mortal Kombat 1", "Tropico 6", "Dark and Darker",
+                 "Gray Zone Warfare", "The Dark Pictures Anthology: Man of Medan", "Beat Saber", "Blasphemous",
+                 "Baldur's Gate 3", "Broken Arrow", "Yakuza 0", "Dishonored", "Hogwarts Legacy",
+                 "Grand Theft Auto IV", "Need for Speed: Underground 2", "Only Up!", "Dragon Age: Origins",
+                 "Breathedge", "Lucky Tower Ultimate", "Prey", "Euro Truck Simulator 2", "Pathfinder: Kingmaker",
+                 "Empire of the Ants", "The Dark Pictures Anthology: The Devil in Me", "Tiny Bunny",
+                 "Vintage Story", "The Surfer", "Batman: The Enemy Within", "Wolfenstein II: The New Colossus",
+                 "No Man's Sky", "Cities: Skylines", "Valhall", "The Witcher 2: Assassins of Kings",
+                 "Amnesia: The Dark Descent", "Hollow Knight: Silksong", "Shadow of the Colossus",
+                 "Red Dead Redemption 2", "Mass Effect Legendary Edition", "Sekiro: Shadows Die Twice",
+                 "Journey", "The Elder Scrolls IV: Oblivion", "The Elder Scrolls III: Morrowind",
+                 "Outer Wilds", "The Elder Scrolls Online", "The Elder Scrolls V: Skyrim Special Edition",
+                 "Nier: Automata", "The Witcher: Enhanced Edition", "The Witcher 2: Assassins of Kings Enhanced Edition",
+                 "Ori and the Will of the Wisps", "The Witcher 3: Wild Hunt - Game of the Year Edition",
+                 "Control", "The Witcher 3: Wild Hunt - Blood and Wine", "The Witcher 3: Wild Hunt - Hearts of Stone",
+                 "Metro Exodus", "The Legend of Zelda: Breath of the Wild",
+                 "Dead Cells", "Subnautica", "The Elder Scrolls V: Skyrim"]
+
+jogos_offline = [jogo.strip().lower() for jogo in jogos_offline]
+
+
+# Colunas por nó calculadas pelo AnalyzeCountryNetwork que o resumo pode reaproveitar
+NODE_METRIC_COLUMNS = ['degree', 'degree_centrality', 'betweenness_centrality', 'closeness_centrality',
+                       'eigenvector_centrality', 'pagerank_centrality', 'louvain_community']
+
+
+def loadFreshNodeMetrics(nodes_df: pd.DataFrame, G_csr: TwitchCSRGraph, edges_path: Path,
+                         nodes_path: Path) -> pd.DataFrame:
+    """
+    Devolve as métricas por nó do twitch_network_analysis_{country}.csv (alinhadas com G_csr),
+    ou None se o ficheiro não estiver atualizado em relação ao ficheiro de arestas.
+
+    A verificação usa o hash do ficheiro de arestas guardado pelo AnalyzeCountryNetwork
+    (twitch_network_analysis_{country}.meta.json); sem esse registo, compara o conjunto de nós
+    e a coluna 'degree' com os graus do grafo atual. Depois de uma atualização incremental, as
+    colunas que ficaram desatualizadas estão em meta['stale_columns']; se alguma for das que o
+    resumo usa, as métricas são recalculadas.
+    """
+    node_metrics = nodes_df.drop_duplicates('node', keep='last').set_index('node')
+
+    missing = [column for column in NODE_METRIC_COLUMNS if column not in node_metrics.columns]
+    if missing:
+        print(f"{Fore.YELLOW}Colunas em falta em {nodes_path.name}: {', '.join(missing)}{Style.RESET_ALL}")
+        return None
+    if len(node_metrics) != G_csr.number_of_nodes() or not node_metrics.index.isin(G_csr.node_ids).all():
+        print(f"{Fore.YELLOW}{nodes_path.name} não tem os mesmos nós que o grafo{Style.RESET_ALL}")
+        return None
+    node_metrics = node_metrics.loc[G_csr.node_ids]
+
+    meta_path = nodes_path.with_suffix('.meta.json')
+    if meta_path.exists():
+        with open(meta_path) as f:
+            meta = json.load(f)
+        fresh = meta.get('edge_file_sha256') == fileHash(edges_path)
+        stale = sorted(set(meta.get('stale_columns', [])) & set(NODE_METRIC_COLUMNS))
+        if fresh and stale:
+            print(f"{Fore.YELLOW}{nodes_path.name} tem colunas desatualizadas ({', '.join(stale)}); "
+                  f"as métricas vão ser recalculadas{Style.RESET_ALL}")
+            return None
+    else:
+        fresh = bool((node_metrics['degree'].to_numpy() == G_csr.degree()).all())
+
+    if not fresh:
+        print(f"{Fore.YELLOW}{nodes_path.name} está desatualizado; as métricas vão ser recalculadas{Style.RESET_ALL}")
+        return None
+    return node_metrics
+
+
+def studyCountry(country: str, data_dir: Path, backend: str = "networkx", betweenness_k: int = None,
+                 betweenness_epsilon: float = None, betweenness_seed: int = 42, n_jobs: int = 1,
+                 use_cache: bool = True, reuse_node_metrics: bool = False, power_dtype: str = "float64",
+                 warm_start: bool = False, ensemble_runs: int = 0) -> dict:
+    """
+    Calcula as métricas globais de uma região (uma linha de network_metrics_summary.csv).
+
+    Está ao nível do módulo para poder ser executada num processo separado por runRegions.
+    """
+    print(f"\n{Fore.CYAN}┌{'─' * 50}┐{Style.RESET_ALL}")
+    print(f"{Fore.CYAN}│{Style.RESET_ALL} 🔍 Analisando a região: "
+          f"{Fore.YELLOW}{country:^26}{Style.RESET_ALL} {Fore.CYAN}│{Style.RESET_ALL}")
+    print(f"{Fore.CYAN}└{'─' * 50}┘{Style.RESET_ALL}")
+
+    # Caminho do ficheiro CSV para o país atual (nós)
+    nodes_path = data_dir / country / 'processed_data' / f"twitch_network_analysis_{country}.csv"
+    # Caminho do ficheiro CSV para as arestas
+    edges_path = data_dir / country / f"musae_{country}_edges.csv"
+
+    # Ler o ficheiro CSV com os nós
+    nodes_df = readTable(nodes_path)
+
+    # Converter as variáveis booleanas para inteiros
+    nodes_df['partner'] = nodes_df['partner'].astype(int)
+    nodes_df['mature'] = nodes_df['mature'].astype(int)
+
+    # Criar o grafo a partir das arestas, com os atributos dos nós
+    G = loadTwitchGraph(edges_path, nodes_df=nodes_df, node_col='node')
+    # CSR pré-calculado da versão binária (nós por id crescente; os resultados são alinhados por id);
+    # só é reconstruído se o grafo tiver nós sem arestas, que não estão no CSR guardado
+    G_csr = TwitchCSRGraph.from_edge_file(edges_path)
+    if G_csr.number_of_nodes() != G.number_of_nodes():
+        G_csr = TwitchCSRGraph.from_edge_file(edges_path, node_ids=list(G.nodes()))
+
+    # Cache das métricas mais caras (invalidada se os ficheiros de entrada ou os parâmetros mudarem)
+    cache = MetricCache(data_dir / country / 'cache', [edges_path, nodes_path], label=country, enabled=use_cache)
+
+    # Métricas globais
+    num_nodes = G.number_of_nodes()
+    num_edges = G.number_of_edges()
+    if backend == "csr":
+        # Uma só passagem de BFS (em n_jobs processos) para diâmetro, raio, caminho médio,
+        # closeness e eficiência global
+        sweep = cache.get_or_compute('shortest_path_sweep', lambda: shortestPathSweep(G_csr, n_jobs=n_jobs))
+        diameter = sweep['diameter']
+        radius = sweep['radius']
+        avg_path_length = sweep['avg_path_length']
+        density = G_csr.density()
+        avg_clustering_coeff = G_csr.average_clustering()
+        transitivity = G_csr.transitivity()
+    else:
+        diameter = nx.diameter(G) if nx.is_connected(G) else None
+        radius = nx.radius(G) if nx.is_connected(G) else None
+        avg_path_length = nx.average_shortest_path_length(G) if nx.is_connected(G) else None
+        density = nx.density(G)
+        avg_clustering_coeff = nx.average_clustering(G)
+        transitivity = nx.transitivity(G)
+    assortativity = nx.degree_assortativity_coefficient(G)
+
+    # Centralidades (e comunidades) por nó reaproveitadas do ficheiro de análise, se estiver atualizado
+    node_metrics = None
+    if reuse_node_metrics:
+        node_metrics = loadFreshNodeMetrics(nodes_df, G_csr, edges_path, nodes_path)
+
+    if node_metrics is not None:
+        print(f"Métricas por nó reaproveitadas de {nodes_path.name}")
+        degree_centrality = node_metrics['degree_centrality'].to_dict()
+        betweenness_centrality = node_metrics['betweenness_centrality'].to_dict()
+        closeness_centrality = node_metrics['closeness_centrality'].to_dict()
+        eigenvector_centrality = node_metrics['eigenvector_centrality'].to_dict()
+        pagerank_centrality = node_metrics['pagerank_centrality'].to_dict()
+    elif backend == "csr":
+        degree_centrality = G_csr.to_dict(G_csr.degree_centrality())
+        closeness_centrality = G_csr.to_dict(sweep['closeness'])
+
+        # PageRank e vetor próprio numa só iteração de potência (opcionalmente a partir da análise anterior)
+        def computePowerCentralities() -> dict:
+            starts = loadWarmStart(nodes_path, G_csr.node_ids) if warm_start else {}
+            values, info = powerCentralities(G_csr, dtype=np.dtype(power_dtype), **starts)
+            reportPowerIteration(info, country)
+            return {name: G_csr.to_dict(vector) for name, vector in values.items()}
+
+        power = cache.get_or_compute('power_centralities', computePowerCentralities,
+                                     dtype=power_dtype, warm_start=warm_start)
+        pagerank_centrality = power['pagerank']
+        eigenvector_centrality = power['eigenvector']
+    else:
+        degree_centrality = nx.degree_centrality(G)
+        pagerank_centrality = cache.get_or_compute('pagerank_centrality', lambda: nx.pagerank(G))
+        closeness_centrality = cache.get_or_compute('closeness_centrality', lambda: nx.closeness_centrality(G))
+
+    def computeBetweenness() -> dict:
+        if betweenness_k is None and betweenness_epsilon is None:
+            return nx.betweenness_centrality(G)
+        # Betweenness aproximada por amostragem de pivôs (k fixo ou adaptativo até ao erro pedido)
+        betweenness_values, betweenness_info = approximateBetweenness(
+            G_csr, k=betweenness_k or 256, seed=betweenness_seed, epsilon=betweenness_epsilon)
+        print(f"Betweenness aproximada com {betweenness_info['pivots']} pivôs "
+              f"(erro padrão máximo estimado: {betweenness_info['std_error_max']:.2e})")
+        return G_csr.to_dict(betweenness_values)
+
+    if node_metrics is None:
+        betweenness_centrality = cache.get_or_compute('betweenness_centrality', computeBetweenness,
+                                                      k=betweenness_k, epsilon=betweenness_epsilon,
+                                                      seed=betweenness_seed)
+        if backend != "csr":
+            eigenvector_centrality = cache.get_or_compute('eigenvector_centrality',
+                                                          lambda: nx.eigenvector_centrality(G))
+
+    avg_degree_centrality = np.mean(list(degree_centrality.values()))
+    avg_betweenness_centrality = np.mean(list(betweenness_centrality.values()))
+    avg_closeness_centrality = np.mean(list(closeness_centrality.values()))
+    avg_eigenvector_centrality = np.mean(list(eigenvector_centrality.values()))
+    avg_pagerank_centrality = np.mean(list(pagerank_centrality.values()))
+
+    # Comunidades e modularidade
+    ensemble_metrics = {}
+    if node_metrics is not None:
+        modularity = G_csr.modularity(node_metrics['louvain_community'].to_numpy())
+    elif ensemble_runs > 0:
+        # Partição de consenso de ensemble_runs execuções (reprodutível entre corridas)
+        ensemble = cache.get_or_compute('louvain_ensemble',
+                                        lambda: ensemblePartition(G_csr, n_runs=ensemble_runs, n_jobs=n_jobs),
+                                        n_runs=ensemble_runs, resolution=1.0)
+        reportEnsemble(ensemble, country)
+        modularity = ensemble['modularity']
+        ensemble_metrics = {'Louvain NMI (mean)': ensemble['nmi']['pairwise_mean'],
+                            'Louvain Stability (mean)': float(ensemble['stability'].mean())}
+    else:
+        partition = cache.get_or_compute('louvain_community', lambda: community_louvain.best_partition(G))
+        modularity = community_louvain.modularity(partition, G)
+
+    # Estatísticas de Views
+    views = nodes_df['views'].values
+    avg_views = views.mean()
+    std_views = views.std()
+    total_views = views.sum()
+
+    # Contagem de broadcaster_types
+    broadcaster_counts = nodes_df['broadcaster_type'].value_counts()
+    partner_count = broadcaster_counts.get('partner', 0)
+    affiliate_count = broadcaster_counts.get('affiliate', 0)
+    account_deleted_count = broadcaster_counts.get('account_Deleted', 0)
+    non_streamer_count = broadcaster_counts.get('non_Streamer', 0)
+
+    # Métricas de Centralização da Rede
+    degree_centralization = max(degree_centrality.values()) - avg_degree_centrality
+    betweenness_centralization = max(betweenness_centrality.values()) - avg_betweenness_centrality
+
+    # Métricas de Distribuição
+    degree_values = G_csr.degree() if backend == "csr" else [d for n, d in G.degree()]
+    degree_std = np.std(degree_values)  # Desvio padrão dos graus
+
+    # Eficiência Global da Rede
+    global_efficiency = sweep['global_efficiency'] if backend == "csr" else nx.global_efficiency(G)
+
+    # Ajuste na parte onde se atribui a categoria GameType
+    def categorize_game(x: str) -> str:
+        # Verificar se o nome do jogo não é nulo e compará-lo com as listas fornecidas
+        if pd.isna(x):
+            return np.nan
+        game_name = x.strip().lower()  # Remove espaços extras e converte para minúsculas
+        if game_name in jogos_offline:
+            return 'Offline'
+        elif game_name in non_Videojogos:
+            return 'Non-Videogame'
+        else:
+            return 'Online'
+
+    # Aplicar a função de categorização aos jogos
+    nodes_df['GameType'] = nodes_df['game_name'].apply(categorize_game)
+
+    # Contagens por categoria
+    OFF_videogames_count = nodes_df[nodes_df['GameType'] == 'Offline'].shape[0]
+    non_videogames_count = nodes_df[nodes_df['GameType'] == 'Non-Videogame'].shape[0]
+    ON_videogames_count = nodes_df[nodes_df['GameType'] == 'Online'].shape[0]
+
+    # Contar os valores NaN na coluna GameType
+    nan_count = nodes_df['GameType'].isna().sum()
+
+    # Obter a maior componente conectada (componente gigante) e o seu número de nós e arestas
+    if backend == "csr":
+        giant_mask = G_csr.largest_component()
+        num_nodes_giant = int(giant_mask.sum())
+        num_edges_giant = G_csr.count_edges_within(giant_mask)
+    else:
+        largest_component = max(nx.connected_components(G), key=len)
+        G_giant = G.subgraph(largest_component).copy()
+        num_nodes_giant = G_giant.number_of_nodes()
+        num_edges_giant = G_giant.number_of_edges()
+
+    # Calculando a heterogeneidade dos graus
+    mean_deg = np.mean(degree_values)
+    mean_deg_squared = np.mean(np.array(degree_values) ** 2)
+    heterogeneity = mean_deg_squared / mean_deg ** 2
+
+    # Calcular o k-core e obter a quantidade de nós e arestas no k-core
+    if backend == "csr":
+        k_core_mask = G_csr.k_core()
+        num_nodos_k_core = int(k_core_mask.sum())  # Número de nós
+        num_arestas_k_core = G_csr.count_edges_within(k_core_mask)  # Número de arestas
+    else:
+        k_core = nx.k_core(G)
+        num_nodos_k_core = k_core.number_of_nodes()  # Número de nós
+        num_arestas_k_core = k_core.number_of_edges()  # Número de arestas
+
+    cache.report()
+
+    # Resultados da região
+    return {
+        'Country': country,
+        'Number of Nodes': num_nodes,
+        'Number of Edges': num_edges,
+        'Diameter': diameter,
+        'Radius': radius,
+        'Density': density,
+        'Average Clustering Coefficient': avg_clustering_coeff,
+        'Transitivity': transitivity,
+        'Average Path Length': avg_path_length,
+        'Assortativity': assortativity,
+        'Modularity': modularity,
+        **ensemble_metrics,
+        'Degree Centrality (mean)': avg_degree_centrality,
+        'Betweenness Centrality (mean)': avg_betweenness_centrality,
+        'Closeness Centrality (mean)': avg_closeness_centrality,
+        'Eigenvector Centrality (mean)': avg_eigenvector_centrality,
+        'PageRank Centrality (mean)': avg_pagerank_centrality,
+        'Average Views': avg_views,
+        'Views Std': std_views,
+        'Total Views': total_views,
+        'Degree Centralization': degree_centralization,
+        'Betweenness Centralization': betweenness_centralization,
+        'Degree Std': degree_std,
+        'Global Efficiency': global_efficiency,
+        'Heterogeneity': heterogeneity,
+        'Giant Component Nodes': num_nodes_giant,
+        'Giant Component Edges': num_edges_giant,
+        'Number of Nodes in K-Core': num_nodos_k_core,
+        'Number of Edges in K-Core': num_arestas_k_core,
+        'On-Videogame Channels': ON_videogames_count,
+        'Off-Videogame Channels': OFF_videogames_count,
+        'Non-Videogame Channels': non_videogames_count,
+        'Non-Content': nan_count,
+        'Partner Broadcasters': partner_count,
+        'Affiliate Broadcasters': affiliate_count,
+        'Account Deleted Broadcasters': account_deleted_count,
+        'Non-Streamer Broadcasters': non_streamer_count,
+        'Number of Mature Nodes': nodes_df['mature'].sum(),
+        'Number of Partner Nodes': nodes_df['partner'].sum(),
+        'Number of Non-Mature Nodes': len(nodes_df) - nodes_df['mature'].sum(),
+        'Number of Non-Partner Nodes': len(nodes_df) - nodes_df['partner'].sum(),
+    }
+
+
+def StudyAllCountries(current_dir: Path, backend: str = "networkx", betweenness_k: int = None,
+                      betweenness_epsilon: float = None, betweenness_seed: int = 42, n_jobs: int = 1,
+                      max_workers: int = 1, use_cache: bool = True, reuse_node_metrics: bool = False,
+                      power_dtype: str = "float64", warm_start: bool = False, ensemble_runs: int = 0) -> None:
     countries = ["PTBR", "DE", "ENGB", "ES", "FR", "RU"]
 
     assert isinstance(current_dir, Path)
+    # Backend das métricas: "networkx" (original) ou "csr" (kernels esparsos do TwitchCSRGraph)
+    assert backend in ("networkx", "csr")
     assert "Twitch" in str(current_dir)
 
     while current_dir.name != "Twitch":
@@ -38,232 +409,23 @@ def StudyAllCountries(current_dir: Path) -> None:
         f"({Fore.YELLOW}Tempo restante: {{remaining}}{Style.RESET_ALL})"
     )
 
-    # Lista de categorias que não são videojogos
-    non_Videojogos = ['IRL', 'Just Chatting', 'Watch TV', 'Art', 'Music',
-                      'Science & Technology', 'Software and Game Development',
-                      'Co-working & Studying', 'Crypto', 'Politics',
-                      'Talk Shows & Podcasts', 'DJs', 'Special Events',
-                      'Sports', 'Food & Drink', 'Casino', 'CooKing',
-                      'Poker', 'Virtual Casino', 'Tabletop RPGs']
-
-    non_Videojogos = [Njogo.strip().lower() for Njogo in non_Videojogos]
-
-    jogos_offline = ["The Callisto Protocol", "Kingdom Two Crowns", "My Hotel", "Disco Elysium",
-                     "Divinity: Original Sin II", "Grand Theft Auto: San Andreas", "osu!",
-                     "The Binding of Isaac: Repentance", "God of War Ragnarök", "BUCKSHOT ROULETTE", "Atomic Heart",
-                     "Gothic II", "Grand Theft Auto III", "Silent Hill 2", "Ghostwire: Tokyo", "DREDGE",
-                     "VLADiK BRUTAL", "Northern Journey", "The Dark Pictures Anthology: Little Hope",
-                     "Marvel's Spider-Man", "Resident Evil 4", "Crossout", "Horizon Zero Dawn Remastered", "Outlast II",
-                     "The Last of Us Part I", "Neva", "Risk of Rain 2", "ELDEN RING", "Alan Wake II",
-                     "DARK SOULS II: Scholar of the First Sin", "DARK SOULS III", "Dark Souls: Remastered", "Diablo II",
-                     "Fallout 4", "Dungeon Crusher: Soul Hunters", "Castlevania: Dawn of Sorrow", "Artifact",
-                     "I Wanna Kill the Kamilia 3", "Torchlight: Infinite", "The Guild 3", "Sid Meier's Civilization VI",
-                     "Sons of the Forest", "The Sims 4", "X4: Foundations", "Hades II",
-                     "Prince of Persia: The Lost Crown", "Bloodborne", "Angry Birds VR: Isle of Pigs",
-                     "Heroes of Might and Magic V", "Internet Cafe Simulator 2", "Wolfenstein: The New Order",
-                     "Factorio", "DOOM Eternal", "Everlasting Summer", "God Hand", "Beyond: Two Souls", "Mafia III",
-                     "Zenless Zone Zero", "Stardew Valley", "SIFU", "Dead Space 3", "Mafia II", "Fallout 2",
-                     "SnowRunner", "Hollow Knight", "The Witcher 3: Wild Hunt", "Killer Instinct", "Little Misfortune",
-                     "Magicraft", "Magicraft", "Planetbase", "Microsoft Flight Simulator 2024", "Songs of Conquest",
-                     "Stalker 2", "Amnesia: Rebirth", "Napoleon: Total War", "Gran Saga", "Pokémon Emerald Version",
-                     "Football, Tactics & Glory", "Katamari Damacy REROLL", "Lethal Company",
-                     "Vampire: The Masquerade - Bloodlines", "Red Dead Redemption", "The Walking Dead",
-                     "Detroit: Become Human", "Until Dawn", "DiRT Rally 2.0", "Portal 2", "Rise of the Tomb Raider",
-                     "Half-Life: Alyx", "Cyberpunk 2077", "Forza Horizon 5", "South Park: The Fractured But Whole",
-                     "TSIOQUE", "Need for Speed: Most Wanted", "inFAMOUS: Second Son", "Marvel's Spider-Man Remastered",
-                     "Alone in the Dark", "Lobotomy Corporation", "Mortal Kombat 1", "Tropico 6", "Dark and Darker",
-                     "Gray Zone Warfare", "The Dark Pictures Anthology: Man of Medan", "Beat Saber", "Blasphemous",
-                     "Baldur's Gate 3", "Broken Arrow", "Yakuza 0", "Dishonored", "Hogwarts Legacy",
-                     "Grand Theft Auto IV", "Need for Speed: Underground 2", "Only Up!", "Dragon Age: Origins",
-                     "Breathedge", "Lucky Tower Ultimate", "Prey", "Euro Truck Simulator 2", "Pathfinder: Kingmaker",
-                     "Empire of the Ants", "The Dark Pictures Anthology: The Devil in Me", "Tiny Bunny",
-                     "Vintage Story", "The Surfer", "Batman: The Enemy Within", "Wolfenstein II: The New Colossus",
-                     "No Man's Sky", "Cities: Skylines", "Valhall", "The Witcher 2: Assassins of Kings",
-                     "Amnesia: The Dark Descent", "Hollow Knight: Silksong", "Shadow of the Colossus",
-                     "Red Dead Redemption 2", "Mass Effect Legendary Edition", "Sekiro: Shadows Die Twice",
-                     "Journey", "The Elder Scrolls IV: Oblivion", "The Elder Scrolls III: Morrowind",
-                     "Outer Wilds", "The Elder Scrolls Online", "The Elder Scrolls V: Skyrim Special Edition",
-                     "Nier: Automata", "The Witcher: Enhanced Edition", "The Witcher 2: Assassins of Kings Enhanced Edition",
-                     "Ori and the Will of the Wisps", "The Witcher 3: Wild Hunt - Game of the Year Edition",
-                     "Control", "The Witcher 3: Wild Hunt - Blood and Wine", "The Witcher 3: Wild Hunt - Hearts of Stone",
-                     "Metro Exodus", "The Legend of Zelda: Breath of the Wild",
-                     "Dead Cells", "Subnautica", "The Elder Scrolls V: Skyrim"]
-
-    jogos_offline = [jogo.strip().lower() for jogo in jogos_offline]
+    progress_kwargs = dict(desc=" Análise das Redes Twitch",
+                           bar_format=bar_format,
+                           ascii="░▒▓█",  # Preenchimento gradual com diferentes densidades
+                           ncols=100)
+    region_kwargs = dict(data_dir=current_dir, backend=backend, betweenness_k=betweenness_k,
+                         betweenness_epsilon=betweenness_epsilon, betweenness_seed=betweenness_seed,
+                         n_jobs=n_jobs, use_cache=use_cache, reuse_node_metrics=reuse_node_metrics,
+                         power_dtype=power_dtype, warm_start=warm_start, ensemble_runs=ensemble_runs)
 
     # Iterar sobre cada país com barra de progresso personalizada
-    for country in tqdm(countries,
-                        desc=" Análise das Redes Twitch",
-                        bar_format=bar_format,
-                        ascii="░▒▓█",  # Preenchimento gradual com diferentes densidades
-                        ncols=100):
-
-        print(f"\n{Fore.CYAN}┌{'─' * 50}┐{Style.RESET_ALL}")
-        print(f"{Fore.CYAN}│{Style.RESET_ALL} 🔍 Analisando a região: "
-              f"{Fore.YELLOW}{country:^26}{Style.RESET_ALL} {Fore.CYAN}│{Style.RESET_ALL}")
-        print(f"{Fore.CYAN}└{'─' * 50}┘{Style.RESET_ALL}")
-
-        # Caminho do ficheiro CSV para o país atual (nós)
-        nodes_path = current_dir / country / 'processed_data' / f"twitch_network_analysis_{country}.csv"
-        # Caminho do ficheiro CSV para as arestas
-        edges_path = current_dir / country / f"musae_{country}_edges.csv"
-
-        # Ler o ficheiro CSV com os nós
-        nodes_df = pd.read_csv(nodes_path)
-
-        # Ler o ficheiro CSV com as arestas
-        edges_df = pd.read_csv(edges_path)
-
-        # Converter as variáveis booleanas para inteiros
-        nodes_df['partner'] = nodes_df['partner'].astype(int)
-        nodes_df['mature'] = nodes_df['mature'].astype(int)
-
-        # Criar o grafo a partir das arestas
-        G = nx.from_pandas_edgelist(edges_df, 'from', 'to')
-
-        # Adicionar atributos dos nós ao grafo
-        for index, row in nodes_df.iterrows():
-            G.nodes[row['node']].update(row.to_dict())
-
-        # Métricas globais
-        num_nodes = G.number_of_nodes()
-        num_edges = G.number_of_edges()
-        diameter = nx.diameter(G) if nx.is_connected(G) else None
-        radius = nx.radius(G) if nx.is_connected(G) else None
-        density = nx.density(G)
-        avg_clustering_coeff = nx.average_clustering(G)
-        transitivity = nx.transitivity(G)
-        avg_path_length = nx.average_shortest_path_length(G) if nx.is_connected(G) else None
-        assortativity = nx.degree_assortativity_coefficient(G)
-
-        # Centralidades
-        degree_centrality = nx.degree_centrality(G)
-        betweenness_centrality = nx.betweenness_centrality(G)
-        closeness_centrality = nx.closeness_centrality(G)
-        eigenvector_centrality = nx.eigenvector_centrality(G)
-        pagerank_centrality = nx.pagerank(G)
-
-        avg_degree_centrality = np.mean(list(degree_centrality.values()))
-        avg_betweenness_centrality = np.mean(list(betweenness_centrality.values()))
-        avg_closeness_centrality = np.mean(list(closeness_centrality.values()))
-        avg_eigenvector_centrality = np.mean(list(eigenvector_centrality.values()))
-        avg_pagerank_centrality = np.mean(list(pagerank_centrality.values()))
-
-        # Comunidades e modularidade
-        partition = community_louvain.best_partition(G)
-        modularity = community_louvain.modularity(partition, G)
-
-        # Estatísticas de Views
-        views = nodes_df['views'].values
-        avg_views = views.mean()
-        std_views = views.std()
-        total_views = views.sum()
-
-        # Contagem de broadcaster_types
-        broadcaster_counts = nodes_df['broadcaster_type'].value_counts()
-        partner_count = broadcaster_counts.get('partner', 0)
-        affiliate_count = broadcaster_counts.get('affiliate', 0)
-        account_deleted_count = broadcaster_counts.get('account_Deleted', 0)
-        non_streamer_count = broadcaster_counts.get('non_Streamer', 0)
-
-        # Métricas de Centralização da Rede
-        degree_centralization = max(degree_centrality.values()) - avg_degree_centrality
-        betweenness_centralization = max(betweenness_centrality.values()) - avg_betweenness_centrality
-
-        # Métricas de Distribuição
-        degree_values = [d for n, d in G.degree()]
-        degree_std = np.std(degree_values)  # Desvio padrão dos graus
-
-        # Eficiência Global da Rede
-        global_efficiency = nx.global_efficiency(G)
-
-        # Ajuste na parte onde se atribui a categoria GameType
-        def categorize_game(x: str) -> str:
-            # Verificar se o nome do jogo não é nulo e compará-lo com as listas fornecidas
-            if pd.isna(x):
-                return np.nan
-            game_name = x.strip().lower()  # Remove espaços extras e converte para minúsculas
-            if game_name in jogos_offline:
-                return 'Offline'
-            elif game_name in non_Videojogos:
-                return 'Non-Videogame'
-            else:
-                return 'Online'
-
-        # Aplicar a função de categorização aos jogos
-        nodes_df['GameType'] = nodes_df['game_name'].apply(categorize_game)
-
-        # Contagens por categoria
-        OFF_videogames_count = nodes_df[nodes_df['GameType'] == 'Offline'].shape[0]
-        non_videogames_count = nodes_df[nodes_df['GameType'] == 'Non-Videogame'].shape[0]
-        ON_videogames_count = nodes_df[nodes_df['GameType'] == 'Online'].shape[0]
-
-        # Contar os valores NaN na coluna GameType
-        nan_count = nodes_df['GameType'].isna().sum()
-
-        # Obter a maior componente conectada (componente gigante)
-        largest_component = max(nx.connected_components(G), key=len)
-        G_giant = G.subgraph(largest_component).copy()
-
-        # Número de nós e arestas da componente gigante
-        num_nodes_giant = G_giant.number_of_nodes()
-        num_edges_giant = G_giant.number_of_edges()
-
-        # Calculando a heterogeneidade dos graus
-        mean_deg = np.mean(degree_values)
-        mean_deg_squared = np.mean(np.array(degree_values) ** 2)
-        heterogeneity = mean_deg_squared / mean_deg ** 2
-
-        # Calcular o k-core
-        k_core = nx.k_core(G)
-
-        # Obter a quantidade de nós e arestas no k-core
-        num_nodos_k_core = k_core.number_of_nodes()  # Número de nós
-        num_arestas_k_core = k_core.number_of_edges()  # Número de arestas
-
-        # Armazenar os resultados numa lista
-        results.append({
-            'Country': country,
-            'Number of Nodes': num_nodes,
-            'Number of Edges': num_edges,
-            'Diameter': diameter,
-            'Radius': radius,
-            'Density': density,
-            'Average Clustering Coefficient': avg_clustering_coeff,
-            'Transitivity': transitivity,
-            'Average Path Length': avg_path_length,
-            'Assortativity': assortativity,
-            'Modularity': modularity,
-            'Degree Centrality (mean)': avg_degree_centrality,
-            'Betweenness Centrality (mean)': avg_betweenness_centrality,
-            'Closeness Centrality (mean)': avg_closeness_centrality,
-            'Eigenvector Centrality (mean)': avg_eigenvector_centrality,
-            'PageRank Centrality (mean)': avg_pagerank_centrality,
-            'Average Views': avg_views,
-            'Views Std': std_views,
-            'Total Views': total_views,
-            'Degree Centralization': degree_centralization,
-            'Betweenness Centralization': betweenness_centralization,
-            'Degree Std': degree_std,
-            'Global Efficiency': global_efficiency,
-            'Heterogeneity': heterogeneity,
-            'Giant Component Nodes': num_nodes_giant,
-            'Giant Component Edges': num_edges_giant,
-            'Number of Nodes in K-Core': num_nodos_k_core,
-            'Number of Edges in K-Core': num_arestas_k_core,
-            'On-Videogame Channels': ON_videogames_count,
-            'Off-Videogame Channels': OFF_videogames_count,
-            'Non-Videogame Channels': non_videogames_count,
-            'Non-Content': nan_count,
-            'Partner Broadcasters': partner_count,
-            'Affiliate Broadcasters': affiliate_count,
-            'Account Deleted Broadcasters': account_deleted_count,
-            'Non-Streamer Broadcasters': non_streamer_count,
-            'Number of Mature Nodes': nodes_df['mature'].sum(),
-            'Number of Partner Nodes': nodes_df['partner'].sum(),
-            'Number of Non-Mature Nodes': len(nodes_df) - nodes_df['mature'].sum(),
-            'Number of Non-Partner Nodes': len(nodes_df) - nodes_df['partner'].sum(),
-        })
+    if max_workers == 1:
+        for country in tqdm(countries, **progress_kwargs):
+            results.append(studyCountry(country, **region_kwargs))
+    else:
+        # Regiões em paralelo (maior primeiro); os resultados voltam pela ordem de `countries`
+        results = runRegions(studyCountry, countries, current_dir, max_workers=max_workers,
+                             tqdm_kwargs=progress_kwargs, func_kwargs=region_kwargs)
 
     # Criar um DataFrame com os resultados
     df_results = pd.DataFrame(results)
@@ -0,0 +1,104 @@
+import numpy as np
+
+from csrGraph import TwitchCSRGraph
+
+
+def _singleSourceDependencies(graph: TwitchCSRGraph, source: int) -> np.ndarray:
+    """
+    Dependências de Brandes de uma origem, com a BFS feita nível a nível sobre o CSR
+    (cada nível é um gather dos vizinhos da fronteira, sem ciclos em Python por nó).
+    """
+    n = graph.number_of_nodes()
+    dist = np.full(n, -1, dtype=np.int64)
+    sigma = np.zeros(n, dtype=float)
+    dist[source] = 0
+    sigma[source] = 1.0
+
+    frontier = np.array([source], dtype=np.int64)
+    level_edges = []
+    depth = 0
+    while len(frontier):
+        neighbours, sources = graph.neighbors_of(frontier, return_sources=True)
+        new_nodes = np.unique(neighbours[dist[neighbours] == -1])
+        dist[new_nodes] = depth + 1
+
+        # Arestas da DAG de caminhos mais curtos entre o nível atual e o seguinte
+        mask = dist[neighbours] == depth + 1
+        v, w = sources[mask], neighbours[mask]
+        sigma += np.bincount(w, weights=sigma[v], minlength=n)
+        level_edges.append((v, w))
+
+        frontier = new_nodes
+        depth += 1
+
+    delta = np.zeros(n, dtype=float)
+    for v, w in reversed(level_edges):
+        delta += np.bincount(v, weights=sigma[v] / sigma[w] * (1.0 + delta[w]), minlength=n)
+    delta[source] = 0.0
+    return delta
+
+
+def approximateBetweenness(graph: TwitchCSRGraph, k: int = 256, seed: int = 42,
+                           epsilon: float = None, batch_size: int = 32, max_k: int = None):
+    """
+    Betweenness centrality (normalizada, como no nx.betweenness_centrality) estimada a partir
+    de k pivôs amostrados sem reposição.
+
+    Cada pivô s dá uma estimativa não enviesada X_s(v) = n * δ_s(v) / ((n-1)(n-2)); o resultado
+    é a média das estimativas e o erro estimado é o erro padrão dessa média (com correção de
+    população finita, pelo que é zero quando todos os nós são pivôs).
+
+    Se epsilon for dado, a amostragem é adaptativa: são usados lotes de batch_size pivôs até que
+    o maior intervalo de confiança a 95% (1.96 * erro padrão) seja <= epsilon ou até max_k pivôs.
+
+    Args:
+        graph (TwitchCSRGraph): Grafo da região
+        k (int): Número de pivôs (ou mínimo de pivôs, no modo adaptativo)
+        seed (int): Semente do gerador aleatório
+        epsilon (float): Erro máximo pretendido (modo adaptativo)
+        batch_size (int): Pivôs por lote no modo adaptativo
+        max_k (int): Limite de pivôs no modo adaptativo (por omissão, todos os nós)
+
+    Returns:
+        tuple: (array com a betweenness por nó, dicionário com pivôs usados e erro estimado)
+    """
+    n = graph.number_of_nodes()
+    scale = n / ((n - 1) * (n - 2)) if n > 2 else 0.0
+
+    rng = np.random.default_rng(seed)
+    pivots = rng.permutation(n)
+    k = min(k, n)
+    max_k = n if max_k is None else min(max_k, n)
+
+    total = np.zeros(n, dtype=float)
+    total_sq = np.zeros(n, dtype=float)
+    used = 0
+
+    def standardError(samples: int) -> np.ndarray:
+        if samples < 2:
+            return np.full(n, np.inf)
+        mean = total / samples
+        variance = np.maximum(total_sq / samples - mean ** 2, 0.0) * samples / (samples - 1)
+        fpc = (n - samples) / (n - 1)
+        return np.sqrt(variance / samples * fpc)
+
+    while True:
+        target = k if used < k else min(used + batch_size, max_k)
+        for source in pivots[used:target]:
+            contribution = scale * _singleSourceDependencies(graph, source)
+            total += contribution
+            total_sq += contribution ** 2
+        used = target
+
+        if epsilon is None or used >= max_k:
+            break
+        if 1.96 * standardError(used).max() <= epsilon:
+            break
+
+    std_error = standardError(used) if used < n else np.zeros(n)
+    info = {
+        'pivots': used,
+        'std_error_max': float(std_error.max()) if n else 0.0,
+        'std_error_mean': float(std_error.mean()) if n else 0.0,
+    }
+    return total / max(used, 1), info
@@ -0,0 +1,132 @@
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import scipy.sparse as sp
+
+from csrGraph import TwitchCSRGraph
+
+# Matriz de adjacência partilhada por cada processo trabalhador (definida em _attachSharedGraph)
+_WORKER_ADJACENCY = None
+_WORKER_BUFFERS = []
+
+
+def _batchBFS(A: sp.csr_matrix, sources: np.ndarray):
+    """
+    BFS simultânea a partir de um lote de origens: cada nível é um produto esparso-denso
+    A @ fronteira, com uma coluna por origem.
+
+    Returns:
+        tuple: (excentricidade, soma das distâncias, nós alcançados, soma de 1/d) por origem
+    """
+    n = A.shape[0]
+    b = len(sources)
+    cols = np.arange(b)
+
+    visited = np.zeros((n, b), dtype=bool)
+    visited[sources, cols] = True
+    frontier = np.zeros((n, b), dtype=np.float32)
+    frontier[sources, cols] = 1.0
+
+    eccentricity = np.zeros(b, dtype=np.int64)
+    dist_sum = np.zeros(b, dtype=np.int64)
+    reached = np.zeros(b, dtype=np.int64)
+    inv_sum = np.zeros(b, dtype=float)
+
+    level = 0
+    while True:
+        level += 1
+        new = (A @ frontier > 0) & ~visited
+        counts = new.sum(axis=0)
+        if not counts.any():
+            break
+        visited |= new
+        eccentricity[counts > 0] = level
+        dist_sum += level * counts
+        reached += counts
+        inv_sum += counts / level
+        frontier = new.astype(np.float32)
+
+    return eccentricity, dist_sum, reached, inv_sum
+
+
+def _attachSharedGraph(n: int, indptr_spec: tuple, indices_spec: tuple) -> None:
+    # Inicializador dos trabalhadores: liga-se à memória partilhada sem copiar o grafo
+    global _WORKER_ADJACENCY
+    arrays = []
+    for name, length, dtype in (indptr_spec, indices_spec):
+        shm = shared_memory.SharedMemory(name=name)
+        _WORKER_BUFFERS.append(shm)
+        arrays.append(np.ndarray((length,), dtype=dtype, buffer=shm.buf))
+    indptr, indices = arrays
+    data = np.ones(len(indices), dtype=np.float32)
+    _WORKER_ADJACENCY = sp.csr_matrix((data, indices, indptr), shape=(n, n))
+
+
+def _sweepWorker(sources: np.ndarray):
+    return _batchBFS(_WORKER_ADJACENCY, sources)
+
+
+def _toSharedMemory(array: np.ndarray):
+    shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[:] = array
+    return shm, (shm.name, len(array), array.dtype.str)
+
+
+def shortestPathSweep(graph: TwitchCSRGraph, n_jobs: int = 1, batch_size: int = 256) -> dict:
+    """
+    Faz uma única passagem de BFS a partir de todos os nós e deriva dela a closeness,
+    a excentricidade, o diâmetro, o raio, o comprimento médio dos caminhos e a eficiência global
+    (em vez de cinco passagens completas separadas no networkx).
+
+    Os lotes de origens são distribuídos por um conjunto de processos que partilham o CSR
+    através de memória partilhada.
+
+    Args:
+        graph (TwitchCSRGraph): Grafo da região
+        n_jobs (int): Número de processos (1 -> no processo atual)
+        batch_size (int): Número de origens por lote
+
+    Returns:
+        dict: Arrays por nó ('closeness', 'eccentricity') e métricas globais ('diameter',
+            'radius', 'avg_path_length', 'global_efficiency', 'is_connected'). Diâmetro,
+            raio e comprimento médio só são definidos para grafos conexos (caso contrário None).
+    """
+    n = graph.number_of_nodes()
+    batches = [np.arange(start, min(start + batch_size, n)) for start in range(0, n, batch_size)]
+
+    if n_jobs == 1:
+        A = sp.csr_matrix((np.ones(len(graph.indices), dtype=np.float32), graph.indices, graph.indptr),
+                          shape=(n, n))
+        partial = [_batchBFS(A, sources) for sources in batches]
+    else:
+        shm_indptr, indptr_spec = _toSharedMemory(graph.indptr)
+        shm_indices, indices_spec = _toSharedMemory(graph.indices)
+        try:
+            with ProcessPoolExecutor(max_workers=n_jobs, initializer=_attachSharedGraph,
+                                     initargs=(n, indptr_spec, indices_spec)) as executor:
+                partial = list(executor.map(_sweepWorker, batches))
+        finally:
+            for shm in (shm_indptr, shm_indices):
+                shm.close()
+                shm.unlink()
+
+    eccentricity, dist_sum, reached, inv_sum = (np.concatenate(values) for values in zip(*partial))
+
+    # Closeness com a correção de Wasserman-Faust (igual ao nx.closeness_centrality)
+    closeness = np.zeros(n, dtype=float)
+    mask = dist_sum > 0
+    if n > 1:
+        closeness[mask] = reached[mask] / dist_sum[mask] * reached[mask] / (n - 1)
+
+    is_connected = n > 0 and bool((reached == n - 1).all())
+    pairs = n * (n - 1)
+    return {
+        'closeness': closeness,
+        'eccentricity': eccentricity,
+        'is_connected': is_connected,
+        'diameter': int(eccentricity.max()) if is_connected else None,
+        'radius': int(eccentricity.min()) if is_connected else None,
+        'avg_path_length': dist_sum.sum() / pairs if is_connected and pairs else None,
+        'global_efficiency': inv_sum.sum() / pairs if pairs else 0.0,
+    }
@@ -0,0 +1,240 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from csrGraph import TwitchCSRGraph
+from edgeStore import loadBinaryCSR
+from twitchStorage import readTable
+
+
+class CombinedTwitchGraph:
+    """
+    União disjunta das redes de várias regiões num único TwitchCSRGraph.
+
+    Os new_id de cada região são deslocados por um offset (o primeiro id livre depois da
+    região anterior), pelo que não há colisões: global_id = offset[country] + new_id.
+    O array `country` guarda, para cada nó, o índice da sua região em `countries`, e as
+    métricas por região são obtidas com bincount sobre esse array, numa só passagem.
+    """
+
+    def __init__(self, graph: TwitchCSRGraph, country: np.ndarray, countries: list, offsets: dict):
+        self.graph = graph
+        self.country = country
+        self.countries = countries
+        self.offsets = offsets
+        self.nodes = pd.DataFrame({
+            'global_id': graph.node_ids,
+            'country': pd.Categorical.from_codes(country, categories=countries),
+            'new_id': graph.node_ids - np.array([offsets[c] for c in countries])[country],
+        })
+
+    @classmethod
+    def from_data_dir(cls, data_dir: Path, countries: list = None) -> "CombinedTwitchGraph":
+        """
+        Junta os CSR binários (data/{country}/binary) de cada região num só CSR diagonal por blocos.
+
+        Args:
+            data_dir (Path): Diretório "data" com uma pasta por região
+            countries (list): Regiões a juntar (por omissão, todas)
+
+        Returns:
+            CombinedTwitchGraph: Grafo combinado
+        """
+        if countries is None:
+            countries = ["PTBR", "DE", "ENGB", "ES", "FR", "RU"]
+
+        indptr_parts, indices_parts, id_parts, country_parts = [], [], [], []
+        offsets = {}
+        id_offset = 0
+        node_offset = 0
+        edge_offset = 0
+        for code, country in enumerate(countries):
+            indptr, indices, node_ids = loadBinaryCSR(data_dir / country / f"musae_{country}_edges.csv")
+            n = len(node_ids)
+
+            offsets[country] = id_offset
+            indptr_parts.append(indptr[:-1] + edge_offset if code < len(countries) - 1
+                                else indptr + edge_offset)
+            indices_parts.append(indices.astype(np.int64) + node_offset)
+            id_parts.append(node_ids + id_offset)
+            country_parts.append(np.full(n, code, dtype=np.int64))
+
+            id_offset += int(node_ids.max()) + 1 if n else 0
+            node_offset += n
+            edge_offset += int(indptr[-1])
+
+        graph = TwitchCSRGraph(np.concatenate(indptr_parts), np.concatenate(indices_parts).astype(np.int32),
+                               np.concatenate(id_parts))
+        return cls(graph, np.concatenate(country_parts), countries, offsets)
+
+    def attach(self, data_dir: Path, columns: list) -> None:
+        """
+        Acrescenta a self.nodes colunas do twitch_network_analysis_{country}.csv de cada região
+        (alinhadas por new_id; nós sem linha no ficheiro ficam com NaN).
+        """
+        frames = []
+        for country in self.countries:
+            table_path = data_dir / country / 'processed_data' / f"twitch_network_analysis_{country}.csv"
+            table = readTable(table_path, columns=['node'] + columns).drop_duplicates('node', keep='last')
+            table['global_id'] = table['node'] + self.offsets[country]
+            frames.append(table.drop(columns='node'))
+        attributes = pd.concat(frames, ignore_index=True).set_index('global_id')
+        for column in columns:
+            self.nodes[column] = attributes[column].reindex(self.nodes['global_id']).to_numpy()
+
+    def per_country(self, values: np.ndarray, how: str = "mean") -> np.ndarray:
+        """Agrega um array por nó por região ('sum', 'mean' ou 'max')."""
+        k = len(self.countries)
+        if how == "max":
+            result = np.full(k, -np.inf)
+            np.maximum.at(result, self.country, values)
+            return result
+        sums = np.bincount(self.country, weights=values, minlength=k)
+        if how == "sum":
+            return sums
+        return sums / np.maximum(np.bincount(self.country, minlength=k), 1)
+
+    def edge_country(self) -> np.ndarray:
+        """Região de cada entrada do CSR (cada aresta aparece duas vezes)."""
+        return np.repeat(self.country, self.graph.degree())
+
+    def assortativity(self) -> np.ndarray:
+        """
+        Assortatividade de grau por região (como nx.degree_assortativity_coefficient):
+        correlação de Pearson entre os graus das extremidades de cada aresta.
+        """
+        k = len(self.countries)
+        deg = self.graph.degree().astype(float)
+        sources = np.repeat(np.arange(self.graph.number_of_nodes()), self.graph.degree())
+        x, y = deg[sources], deg[self.graph.indices]
+        edge_country = self.edge_country()
+        count = np.bincount(edge_country, minlength=k)
+        mean = np.bincount(edge_country, weights=x, minlength=k) / count
+        mean_sq = np.bincount(edge_country, weights=x * x, minlength=k) / count
+        mean_xy = np.bincount(edge_country, weights=x * y, minlength=k) / count
+        return (mean_xy - mean ** 2) / (mean_sq - mean ** 2)
+
+    def modularity(self, labels: np.ndarray) -> np.ndarray:
+        """Modularidade por região de uma partição com etiquetas locais a cada região."""
+        k = len(self.countries)
+        # Etiquetas globais únicas: (região, comunidade)
+        community = pd.factorize(pd.MultiIndex.from_arrays([self.country, np.asarray(labels)]))[0]
+        community_country = np.zeros(community.max() + 1, dtype=np.int64)
+        community_country[community] = self.country
+
+        sources = np.repeat(np.arange(self.graph.number_of_nodes()), self.graph.degree())
+        intra = community[sources] == community[self.graph.indices]
+        internal_edges = np.bincount(community[sources][intra], minlength=len(community_country)) / 2
+        degree_sum = np.bincount(community, weights=self.graph.degree(), minlength=len(community_country))
+
+        m = self.per_country(self.graph.degree().astype(float), how="sum") / 2
+        m_comm = m[community_country]
+        terms = internal_edges / m_comm - (degree_sum / (2 * m_comm)) ** 2
+        return np.bincount(community_country, weights=terms, minlength=k)
+
+    def summary(self) -> pd.DataFrame:
+        """
+        Métricas estruturais por região e da união, calculadas sobre o CSR combinado
+        (graus, triângulos, núcleos e componentes são calculados uma única vez para todos os nós).
+        """
+        g = self.graph
+        deg = g.degree().astype(float)
+        n = np.bincount(self.country, minlength=len(self.countries)).astype(float)
+        m = self.per_country(deg, how="sum") / 2
+
+        triangles = g.triangles().astype(float)
+        clustering = g.clustering()
+        triads = self.per_country(deg * (deg - 1), how="sum")
+
+        # Componentes nunca atravessam regiões: a gigante de cada região é a maior das suas
+        _, labels = g.connected_components()
+        component_size = np.bincount(labels)
+        component_country = np.zeros(len(component_size), dtype=np.int64)
+        component_country[labels] = self.country
+        order = np.lexsort((-component_size, component_country))
+        countries_sorted = component_country[order]
+        first = np.unique(countries_sorted, return_index=True)[1]
+        giant_label = np.full(len(self.countries), -1)
+        giant_label[countries_sorted[first]] = order[first]
+        giant_mask = labels == giant_label[self.country]
+
+        # Núcleo principal de cada região (maior core number entre os seus nós)
+        core = g.core_number()
+        max_core = self.per_country(core.astype(float), how="max")
+        k_core_mask = core == max_core[self.country]
+
+        def edgesWithin(mask: np.ndarray) -> np.ndarray:
+            sources = np.repeat(np.arange(g.number_of_nodes()), g.degree())
+            both = mask[sources] & mask[g.indices]
+            return np.bincount(self.country[sources][both], minlength=len(self.countries)) // 2
+
+        summary = pd.DataFrame({
+            'Country': self.countries,
+            'Number of Nodes': n.astype(np.int64),
+            'Number of Edges': m.astype(np.int64),
+            'Density': 2 * m / (n * (n - 1)),
+            'Average Degree': self.per_country(deg),
+            'Degree Std': np.sqrt(self.per_country(deg ** 2) - self.per_country(deg) ** 2),
+            'Average Clustering Coefficient': self.per_country(clustering),
+            'Transitivity': np.divide(2 * self.per_country(triangles, how="sum"), triads,
+                                      out=np.zeros_like(triads), where=triads > 0),
+            'Assortativity': self.assortativity(),
+            'Giant Component Nodes': self.per_country(giant_mask.astype(float), how="sum").astype(np.int64),
+            'Giant Component Edges': edgesWithin(giant_mask),
+            'K-Core Order': max_core.astype(np.int64),
+            'Number of Nodes in K-Core': self.per_country(k_core_mask.astype(float), how="sum").astype(np.int64),
+            'Number of Edges in K-Core': edgesWithin(k_core_mask),
+        })
+        if 'louvain_community' in self.nodes.columns:
+            labels = self.nodes['louvain_community'].fillna(-1).to_numpy()
+            summary['Modularity'] = self.modularity(labels)
+
+        # Linha da união (todas as regiões como um só grafo)
+        total = {
+            'Country': 'ALL',
+            'Number of Nodes': g.number_of_nodes(),
+            'Number of Edges': g.number_of_edges(),
+            'Density': g.density(),
+            'Average Degree': deg.mean(),
+            'Degree Std': deg.std(),
+            'Average Clustering Coefficient': clustering.mean(),
+            'Transitivity': g.transitivity(),
+            'Assortativity': np.nan,
+            'Giant Component Nodes': int(g.largest_component().sum()),
+            'Giant Component Edges': g.count_edges_within(g.largest_component()),
+            'K-Core Order': int(core.max()),
+            'Number of Nodes in K-Core': int(g.k_core().sum()),
+            'Number of Edges in K-Core': g.count_edges_within(g.k_core()),
+        }
+        return pd.concat([summary, pd.DataFrame([total])], ignore_index=True)
+
+
+def StudyCombinedNetwork(current_dir: Path, countries: list = None) -> pd.DataFrame:
+    """
+    Constrói o grafo combinado de todas as regiões e guarda as métricas por região e da união
+    em data/AllCountries/combined_network_summary.csv.
+    """
+    assert isinstance(current_dir, Path)
+    assert "Twitch" in str(current_dir)
+
+    while current_dir.name != "Twitch":
+        current_dir = current_dir.parent
+    data_dir = current_dir / "data"
+
+    combined = CombinedTwitchGraph.from_data_dir(data_dir, countries)
+    print(f"Grafo combinado: {combined.graph.number_of_nodes()} nós, "
+          f"{combined.graph.number_of_edges()} arestas, {len(combined.countries)} regiões")
+    combined.attach(data_dir, ['louvain_community'])
+
+    summary = combined.summary()
+    output_dir = data_dir / "AllCountries"
+    output_dir.mkdir(exist_ok=True)
+    output_path = output_dir / "combined_network_summary.csv"
+    summary.to_csv(output_path, index=False)
+    print(f"Resultados guardados em: {output_path}")
+    return summary
+
+
+if __name__ == "__main__":
+    print(StudyCombinedNetwork(Path.cwd()).to_string(index=False))
@@ -0,0 +1,218 @@
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+import igraph as ig
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from scipy.sparse.csgraph import connected_components
+from sklearn.metrics import normalized_mutual_info_score
+
+from csrGraph import TwitchCSRGraph
+
+ALGORITHMS = ('leiden', 'louvain')
+
+# Grafo igraph de cada processo do pool (construído uma vez por processo, no initializer)
+_shared_graph = None
+
+
+def toIgraph(graph: TwitchCSRGraph) -> ig.Graph:
+    """
+    Converte o TwitchCSRGraph para igraph (vértice i = posição i do CSR), com cada aresta
+    uma só vez (metade superior da adjacência).
+    """
+    sources = np.repeat(np.arange(graph.number_of_nodes()), graph.degree())
+    upper = sources < graph.indices
+    edges = np.column_stack([sources[upper], graph.indices[upper]])
+    return ig.Graph(n=graph.number_of_nodes(), edges=edges.tolist(), directed=False)
+
+
+def _attachGraph(n: int, edges: list, weights: list = None) -> None:
+    global _shared_graph
+    _shared_graph = ig.Graph(n=n, edges=edges, directed=False)
+    if weights is not None:
+        _shared_graph.es['weight'] = weights
+
+
+def _runPartition(task: tuple, g: ig.Graph = None) -> tuple:
+    """
+    Uma execução (algoritmo, resolução, semente); devolve a partição e a modularidade com a
+    mesma resolução (a função objetivo que a execução otimizou).
+    """
+    algorithm, resolution, seed = task
+    g = _shared_graph if g is None else g
+    # Os algoritmos do igraph usam o gerador aleatório do módulo random
+    random.seed(seed)
+    weights = 'weight' if 'weight' in g.es.attributes() else None
+    if algorithm == 'leiden':
+        # Iterar até a partição estabilizar (n_iterations=-1)
+        membership = g.community_leiden(objective_function='modularity', weights=weights,
+                                         resolution=resolution, n_iterations=-1).membership
+    else:
+        membership = g.community_multilevel(weights=weights, resolution=resolution).membership
+    return task, np.asarray(membership, dtype=np.int64), g.modularity(membership, weights=weights,
+                                                                      resolution=resolution)
+
+
+def _runTasks(g: ig.Graph, tasks: list, n_jobs: int) -> list:
+    """Executa as tarefas (algoritmo, resolução, semente) sobre g, no processo atual ou num pool."""
+    if n_jobs == 1 or len(tasks) == 1:
+        return [_runPartition(task, g) for task in tasks]
+    weights = g.es['weight'] if 'weight' in g.es.attributes() else None
+    with ProcessPoolExecutor(max_workers=n_jobs, initializer=_attachGraph,
+                             initargs=(g.vcount(), g.get_edgelist(), weights)) as executor:
+        return list(executor.map(_runPartition, tasks))
+
+
+def communitySweep(graph: TwitchCSRGraph, resolutions: tuple = (1.0,), seeds: tuple = (42,),
+                   algorithms: tuple = ALGORITHMS, n_jobs: int = 1) -> dict:
+    """
+    Leiden e Louvain (implementações em C do igraph) para todas as combinações de resolução
+    e semente.
+
+    O grafo é convertido para igraph uma única vez (em cada processo, com n_jobs > 1) e as
+    execuções (algoritmo, resolução, semente) são distribuídas pelo pool. Para cada algoritmo e
+    resolução fica a partição da semente com maior modularidade nessa resolução (a função que o
+    algoritmo otimiza); a modularidade com resolução 1, comparável entre resoluções e com a do
+    python-louvain, fica na coluna modularity_1.
+
+    Args:
+        graph (TwitchCSRGraph): Grafo da região
+        resolutions (tuple): Resoluções a testar
+        seeds (tuple): Sementes por resolução
+        algorithms (tuple): 'leiden' e/ou 'louvain'
+        n_jobs (int): Número de processos (1 -> no processo atual)
+
+    Returns:
+        dict: {'sweep': DataFrame com uma linha por execução,
+               'partitions': {(algoritmo, resolução): array de comunidades (posições do CSR)}}
+    """
+    assert all(algorithm in ALGORITHMS for algorithm in algorithms)
+    tasks = [(algorithm, float(resolution), int(seed))
+             for algorithm in algorithms for resolution in resolutions for seed in seeds]
+
+    g = toIgraph(graph)
+    results = _runTasks(g, tasks, n_jobs)
+
+    rows = []
+    partitions = {}
+    best = {}
+    for (algorithm, resolution, seed), membership, modularity in results:
+        rows.append({'algorithm': algorithm, 'resolution': resolution, 'seed': seed,
+                     'modularity': modularity, 'modularity_1': g.modularity(membership.tolist()),
+                     'communities': int(membership.max()) + 1 if len(membership) else 0})
+        key = (algorithm, resolution)
+        if key not in best or modularity > best[key][0]:
+            best[key] = (modularity, seed)
+            partitions[key] = membership
+
+    sweep = pd.DataFrame(rows)
+    sweep['best_seed'] = [best[(row.algorithm, row.resolution)][1] == row.seed for row in sweep.itertuples()]
+    return {'sweep': sweep, 'partitions': partitions}
+
+
+def _canonicalLabels(membership: np.ndarray) -> np.ndarray:
+    """Renumera as comunidades por tamanho decrescente (empates pelo primeiro nó), para rótulos estáveis."""
+    _, first, inverse, counts = np.unique(membership, return_index=True, return_inverse=True, return_counts=True)
+    order = np.lexsort((first, -counts))
+    rank = np.empty(len(order), dtype=np.int64)
+    rank[order] = np.arange(len(order))
+    return rank[inverse]
+
+
+def coAssociation(sources: np.ndarray, targets: np.ndarray, memberships: np.ndarray) -> np.ndarray:
+    """Fração das execuções (linhas de memberships) em que as extremidades de cada aresta ficam juntas."""
+    return (memberships[:, sources] == memberships[:, targets]).mean(axis=0)
+
+
+def ensemblePartition(graph: TwitchCSRGraph, n_runs: int = 16, algorithm: str = 'louvain',
+                      resolution: float = 1.0, seed: int = 42, threshold: float = 0.5,
+                      max_rounds: int = 10, n_jobs: int = 1) -> dict:
+    """
+    Partição de consenso de n_runs execuções com sementes seed, seed + 1, ...
+
+    A matriz de co-associação (fração das execuções em que dois nós ficam na mesma comunidade)
+    só é calculada sobre as arestas do grafo. Enquanto houver arestas com co-associação
+    entre 0 e 1, o algoritmo volta a ser executado n_runs vezes sobre o grafo de consenso
+    (arestas com co-associação >= threshold, pesadas por ela); quando as execuções concordam,
+    as comunidades são as componentes ligadas pelas arestas com co-associação 1.
+
+    A estabilidade de um nó é a concordância média, sobre as suas arestas, entre as execuções
+    iniciais e o consenso (co-associação se o vizinho ficou na mesma comunidade, 1 - co-associação
+    caso contrário); nós isolados têm estabilidade 1.
+
+    Args:
+        graph (TwitchCSRGraph): Grafo da região
+        n_runs (int): Número de execuções por ronda
+        algorithm (str): 'louvain' ou 'leiden'
+        resolution (float): Resolução das execuções iniciais
+        seed (int): Primeira semente
+        threshold (float): Co-associação mínima para uma aresta entrar no grafo de consenso
+        max_rounds (int): Número máximo de rondas de consenso
+        n_jobs (int): Número de processos (1 -> no processo atual)
+
+    Returns:
+        dict: {'membership', 'stability' (arrays por posição do CSR), 'modularity',
+               'nmi' (pares de execuções e execuções vs. consenso), 'rounds'}
+    """
+    assert algorithm in ALGORITHMS
+    n = graph.number_of_nodes()
+    sources = np.repeat(np.arange(n), graph.degree())
+    upper = sources < graph.indices
+    sources, targets = sources[upper], graph.indices[upper].astype(np.int64)
+    tasks = [(algorithm, float(resolution), int(seed) + run) for run in range(n_runs)]
+
+    g = toIgraph(graph)
+    runs = np.vstack([membership for _, membership, _ in _runTasks(g, tasks, n_jobs)])
+    agreement = coAssociation(sources, targets, runs)
+
+    # Rondas de consenso (as execuções seguintes são sobre o grafo de consenso, com resolução 1)
+    weights = agreement
+    memberships = runs
+    rounds = 0
+    while ((weights > 0) & (weights < 1)).any() and rounds < max_rounds:
+        rounds += 1
+        keep = weights >= threshold
+        consensus_graph = ig.Graph(n=n, edges=np.column_stack([sources[keep], targets[keep]]).tolist(),
+                                   directed=False)
+        consensus_graph.es['weight'] = weights[keep].tolist()
+        round_tasks = [(algorithm, 1.0, int(seed) + rounds * n_runs + run) for run in range(n_runs)]
+        memberships = np.vstack([membership for _, membership, _ in _runTasks(consensus_graph, round_tasks, n_jobs)])
+        weights = coAssociation(sources, targets, memberships)
+
+    if ((weights > 0) & (weights < 1)).any():
+        # Sem acordo total após max_rounds: fica a execução mais próxima do consenso
+        membership = memberships[np.argmax((memberships[:, sources] == memberships[:, targets])
+                                           @ weights)]
+    else:
+        keep = weights == 1
+        adjacency = sp.coo_matrix((np.ones(int(keep.sum())), (sources[keep], targets[keep])), shape=(n, n))
+        membership = connected_components(adjacency, directed=False)[1]
+    membership = _canonicalLabels(membership)
+
+    same = membership[sources] == membership[targets]
+    edge_stability = np.where(same, agreement, 1 - agreement)
+    degree = np.bincount(sources, minlength=n) + np.bincount(targets, minlength=n)
+    stability_sum = (np.bincount(sources, weights=edge_stability, minlength=n)
+                     + np.bincount(targets, weights=edge_stability, minlength=n))
+    stability = np.divide(stability_sum, degree, out=np.ones(n), where=degree > 0)
+
+    pairs = [normalized_mutual_info_score(runs[i], runs[j])
+             for i in range(n_runs) for j in range(i + 1, n_runs)]
+    vs_consensus = [normalized_mutual_info_score(run, membership) for run in runs]
+    nmi = {'pairwise_mean': float(np.mean(pairs)) if pairs else 1.0,
+           'pairwise_min': float(np.min(pairs)) if pairs else 1.0,
+           'consensus_mean': float(np.mean(vs_consensus))}
+
+    return {'membership': membership, 'stability': stability, 'modularity': g.modularity(membership.tolist()),
+            'nmi': nmi, 'rounds': rounds}
+
+
+def reportEnsemble(ensemble: dict, label: str = "") -> None:
+    """Resumo da partição de consenso."""
+    nmi = ensemble['nmi']
+    print(f"{label} consenso: {int(ensemble['membership'].max()) + 1} comunidades, "
+          f"modularidade {ensemble['modularity']:.4f}, {ensemble['rounds']} rondas | "
+          f"NMI entre execuções {nmi['pairwise_mean']:.3f} (mín. {nmi['pairwise_min']:.3f}), "
+          f"execuções vs. consenso {nmi['consensus_mean']:.3f} | "
+          f"estabilidade média {ensemble['stability'].mean():.3f}")
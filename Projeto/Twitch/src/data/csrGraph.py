@@ -0,0 +1,333 @@
+import datetime
+from pathlib import Path
+
+import networkx as nx
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from scipy.sparse.csgraph import connected_components
+
+from edgeStore import loadBinaryCSR
+from graphLoader import readEdgeArray
+from powerIteration import powerCentralities
+
+
+class TwitchCSRGraph:
+    """
+    Grafo não dirigido guardado em formato CSR (arrays NumPy indptr/indices).
+
+    Os nós são indexados de 0 a n-1; o array node_ids guarda o identificador original
+    (new_id / node) de cada posição, para que os resultados possam ser devolvidos no
+    mesmo formato dos dicionários do networkx.
+    """
+
+    def __init__(self, indptr: np.ndarray, indices: np.ndarray, node_ids: np.ndarray):
+        self.indptr = indptr
+        self.indices = indices
+        self.node_ids = node_ids
+        self._adjacency = None
+        self._triangles = None
+
+    # ==================== #
+    # Construção
+    # ==================== #
+    @classmethod
+    def from_edge_array(cls, edges: np.ndarray, node_ids=None) -> "TwitchCSRGraph":
+        """
+        Constrói o grafo a partir de um array (E, 2) de arestas.
+
+        Args:
+            edges (np.ndarray): Arestas com identificadores originais
+            node_ids (array-like): Ordem dos nós (ex.: coluna new_id do target). Nós que só
+                aparecem nas arestas são acrescentados no fim.
+
+        Returns:
+            TwitchCSRGraph: Grafo em formato CSR
+        """
+        if node_ids is None:
+            node_ids = pd.unique(edges.ravel())
+        else:
+            node_ids = pd.unique(np.asarray(node_ids))
+            missing = np.setdiff1d(np.unique(edges), node_ids)
+            node_ids = np.concatenate([node_ids, missing])
+
+        n = len(node_ids)
+        order = np.argsort(node_ids, kind='stable')
+        src = order[np.searchsorted(node_ids, edges[:, 0], sorter=order)]
+        dst = order[np.searchsorted(node_ids, edges[:, 1], sorter=order)]
+
+        # Remover lacetes; as duplicadas (a,b)/(b,a) desaparecem ao simetrizar
+        keep = src != dst
+        src, dst = src[keep], dst[keep]
+        rows = np.concatenate([src, dst])
+        cols = np.concatenate([dst, src])
+        data = np.ones(len(rows), dtype=np.int32)
+        A = sp.csr_matrix((data, (rows, cols)), shape=(n, n))
+        A.sum_duplicates()
+        A.data[:] = 1
+        A.sort_indices()
+
+        graph = cls(A.indptr.astype(np.int64), A.indices.astype(np.int32), node_ids)
+        graph._adjacency = A
+        return graph
+
+    @classmethod
+    def from_edge_file(cls, edge_file: Path, node_ids=None) -> "TwitchCSRGraph":
+        """
+        Constrói o grafo a partir de musae_{country}_edges.csv, usando a versão binária.
+
+        Se node_ids não for dado (ou coincidir com a ordem guardada, por id crescente), o CSR
+        pré-calculado é usado diretamente a partir dos ficheiros mapeados em memória, sem cópia;
+        caso contrário o CSR é reconstruído a partir do array binário de arestas.
+        """
+        indptr, indices, stored_ids = loadBinaryCSR(edge_file)
+        if node_ids is None or np.array_equal(np.asarray(node_ids), stored_ids):
+            return cls(indptr, indices, stored_ids)
+        return cls.from_edge_array(readEdgeArray(edge_file), node_ids)
+
+    @classmethod
+    def from_networkx(cls, G: nx.Graph) -> "TwitchCSRGraph":
+        """Converte um grafo networkx (mantendo a ordem dos nós)."""
+        node_ids = np.array(list(G.nodes()))
+        edges = np.array(list(G.edges()), dtype=node_ids.dtype).reshape(-1, 2)
+        return cls.from_edge_array(edges, node_ids)
+
+    # ==================== #
+    # Estrutura
+    # ==================== #
+    @property
+    def adjacency(self) -> sp.csr_matrix:
+        if self._adjacency is None:
+            data = np.ones(len(self.indices), dtype=np.int32)
+            n = self.number_of_nodes()
+            self._adjacency = sp.csr_matrix((data, self.indices, self.indptr), shape=(n, n))
+        return self._adjacency
+
+    def number_of_nodes(self) -> int:
+        return len(self.indptr) - 1
+
+    def number_of_edges(self) -> int:
+        return len(self.indices) // 2
+
+    def density(self) -> float:
+        n = self.number_of_nodes()
+        return 2 * self.number_of_edges() / (n * (n - 1)) if n > 1 else 0.0
+
+    def neighbors_of(self, nodes: np.ndarray, return_sources: bool = False):
+        """
+        Junta numa só operação os vizinhos de um conjunto de nós (gather sobre o CSR).
+
+        Args:
+            nodes (np.ndarray): Índices dos nós
+            return_sources (bool): Devolver também o nó de origem de cada vizinho
+
+        Returns:
+            np.ndarray (ou tuplo com as origens): Vizinhos concatenados
+        """
+        nodes = np.asarray(nodes, dtype=np.int64)
+        starts = self.indptr[nodes]
+        lens = self.indptr[nodes + 1] - starts
+        total = int(lens.sum())
+        offsets = np.repeat(starts - (np.cumsum(lens) - lens), lens)
+        neighbours = self.indices[np.arange(total) + offsets]
+        if return_sources:
+            return neighbours, np.repeat(nodes, lens)
+        return neighbours
+
+    def to_dict(self, values: np.ndarray) -> dict:
+        """Converte um array por nó num dicionário {node_id: valor}, como no networkx."""
+        return dict(zip(self.node_ids.tolist(), np.asarray(values).tolist()))
+
+    def count_edges_within(self, mask: np.ndarray) -> int:
+        """Número de arestas com ambas as extremidades no conjunto indicado pela máscara."""
+        neighbours = self.neighbors_of(np.flatnonzero(mask))
+        return int(mask[neighbours].sum()) // 2
+
+    # ==================== #
+    # Métricas
+    # ==================== #
+    def degree(self) -> np.ndarray:
+        return np.diff(self.indptr)
+
+    def degree_centrality(self) -> np.ndarray:
+        n = self.number_of_nodes()
+        return self.degree() / (n - 1) if n > 1 else np.ones(n)
+
+    def triangles(self) -> np.ndarray:
+        """
+        Número de triângulos de cada nó, com o algoritmo "forward" ordenado por grau.
+
+        Cada aresta é orientada do nó de menor para o de maior (grau, índice), pelo que cada nó
+        tem no máximo O(sqrt(m)) vizinhos "à frente" e cada triângulo a < b < c é contado uma
+        única vez. Com O a matriz orientada (índices ordenados):
+            (O @ O) ∘ O    -> linha: triângulos onde o nó é o menor (a); coluna: o maior (c)
+            (O.T @ O) ∘ O  -> linha: triângulos onde o nó é o do meio (b)
+        O resultado é calculado uma vez e reutilizado por clustering, average_clustering e
+        transitivity.
+        """
+        if self._triangles is None:
+            n = self.number_of_nodes()
+            rank = np.empty(n, dtype=np.int64)
+            rank[np.lexsort((np.arange(n), self.degree()))] = np.arange(n)
+
+            sources = np.repeat(np.arange(n), self.degree())
+            forward = rank[sources] < rank[self.indices]
+            O = sp.csr_matrix((np.ones(int(forward.sum()), dtype=np.int64),
+                               (sources[forward], self.indices[forward])), shape=(n, n))
+            O.sort_indices()
+
+            closed = (O @ O).multiply(O)
+            middle = (O.T @ O).multiply(O)
+            self._triangles = (np.asarray(closed.sum(axis=1)).ravel() + np.asarray(closed.sum(axis=0)).ravel()
+                               + np.asarray(middle.sum(axis=1)).ravel()).astype(np.int64)
+        return self._triangles
+
+    def clustering(self) -> np.ndarray:
+        deg = self.degree()
+        possible = deg * (deg - 1)
+        result = np.zeros(len(deg), dtype=float)
+        mask = possible > 0
+        result[mask] = 2 * self.triangles()[mask] / possible[mask]
+        return result
+
+    def average_clustering(self) -> float:
+        return float(self.clustering().mean())
+
+    def transitivity(self) -> float:
+        deg = self.degree()
+        triads = (deg * (deg - 1)).sum()
+        return float(2 * self.triangles().sum() / triads) if triads > 0 else 0.0
+
+    def core_number(self) -> np.ndarray:
+        """
+        Núcleo (k-core) de cada nó, removendo em lote todos os nós com grau <= k
+        e atualizando o grau dos vizinhos com bincount.
+        """
+        n = self.number_of_nodes()
+        deg = self.degree().copy()
+        core = np.zeros(n, dtype=np.int64)
+        alive = np.ones(n, dtype=bool)
+        k = 0
+        while alive.any():
+            peel = np.flatnonzero(alive & (deg <= k))
+            if len(peel) == 0:
+                k = deg[alive].min()
+                continue
+            core[peel] = k
+            alive[peel] = False
+            deg -= np.bincount(self.neighbors_of(peel), minlength=n)
+        return core
+
+    def k_core(self, k: int = None) -> np.ndarray:
+        """Máscara dos nós no k-core (por omissão, o núcleo principal, como no nx.k_core)."""
+        core = self.core_number()
+        if k is None:
+            k = core.max() if len(core) else 0
+        return core >= k
+
+    def connected_components(self):
+        """Devolve (número de componentes, etiqueta da componente de cada nó)."""
+        return connected_components(self.adjacency, directed=False)
+
+    def is_connected(self) -> bool:
+        return self.connected_components()[0] == 1
+
+    def largest_component(self) -> np.ndarray:
+        """Máscara dos nós da componente gigante."""
+        _, labels = self.connected_components()
+        return labels == np.bincount(labels).argmax()
+
+    def modularity(self, labels: np.ndarray) -> float:
+        """
+        Modularidade de uma partição (etiqueta de comunidade por nó), calculada com bincount:
+        Q = sum_c [L_c / m - (D_c / 2m)^2].
+        """
+        m = self.number_of_edges()
+        if m == 0:
+            return 0.0
+        labels = pd.factorize(np.asarray(labels))[0]
+        sources = np.repeat(np.arange(self.number_of_nodes()), self.degree())
+        intra = labels[sources] == labels[self.indices]
+        internal_edges = np.bincount(labels[sources][intra], minlength=labels.max() + 1) / 2
+        degree_sum = np.bincount(labels, weights=self.degree(), minlength=labels.max() + 1)
+        return float((internal_edges / m - (degree_sum / (2 * m)) ** 2).sum())
+
+    def pagerank(self, alpha: float = 0.85, max_iter: int = 100, tol: float = 1.0e-6,
+                 nstart: np.ndarray = None) -> np.ndarray:
+        """
+        PageRank por iteração de potência sobre a matriz esparsa (mesmo critério do nx.pagerank).
+        nstart permite começar de um vetor anterior (warm start) em vez do vetor uniforme.
+        """
+        if self.number_of_nodes() == 0:
+            return np.array([])
+        values, _ = powerCentralities(self, which=('pagerank',), alpha=alpha, max_iter=max_iter, tol=tol,
+                                      pagerank_start=nstart)
+        return values['pagerank']
+
+    def eigenvector_centrality(self, max_iter: int = 100, tol: float = 1.0e-6,
+                               nstart: np.ndarray = None) -> np.ndarray:
+        """
+        Centralidade de vetor próprio por iteração de potência com (A + I), com a mesma
+        normalização e critério de paragem do nx.eigenvector_centrality.
+        """
+        values, _ = powerCentralities(self, which=('eigenvector',), max_iter=max_iter, tol=tol,
+                                      eigenvector_start=nstart)
+        return values['eigenvector']
+
+
+def benchmarkTriangles(current_dir: Path, countries: list = None) -> pd.DataFrame:
+    """
+    Compara, por região, o clustering local, o clustering médio e a transitividade do networkx
+    (três enumerações de triângulos) com o kernel de triângulos do TwitchCSRGraph (uma só).
+
+    Args:
+        current_dir (Path): Qualquer diretório dentro de "Twitch"
+        countries (list): Regiões a testar
+
+    Returns:
+        DataFrame: Tempos (em segundos) por região
+    """
+    if countries is None:
+        countries = ["DE", "FR"]
+
+    while current_dir.name != "Twitch":
+        current_dir = current_dir.parent
+    data_dir = current_dir / "data"
+
+    results = []
+    for country in countries:
+        edge_file = data_dir / country / f"musae_{country}_edges.csv"
+        G = nx.Graph()
+        G.add_edges_from(readEdgeArray(edge_file).tolist())
+
+        start = datetime.datetime.now()
+        clustering_nx = nx.clustering(G)
+        average_nx = nx.average_clustering(G)
+        transitivity_nx = nx.transitivity(G)
+        nx_time = (datetime.datetime.now() - start).total_seconds()
+
+        start = datetime.datetime.now()
+        graph = TwitchCSRGraph.from_networkx(G)
+        clustering_csr = graph.clustering()
+        average_csr = graph.average_clustering()
+        transitivity_csr = graph.transitivity()
+        csr_time = (datetime.datetime.now() - start).total_seconds()
+
+        assert np.allclose([clustering_nx[node] for node in graph.node_ids.tolist()], clustering_csr)
+        assert np.isclose(average_nx, average_csr) and np.isclose(transitivity_nx, transitivity_csr)
+
+        results.append({
+            'Country': country,
+            'Nodes': graph.number_of_nodes(),
+            'Edges': graph.number_of_edges(),
+            'networkx (s)': nx_time,
+            'csr (s)': csr_time,
+            'Speedup': nx_time / csr_time if csr_time > 0 else np.nan,
+        })
+        print(f"{country}: networkx {nx_time:.2f}s | csr {csr_time:.3f}s")
+
+    return pd.DataFrame(results)
+
+
+if __name__ == "__main__":
+    print(benchmarkTriangles(Path.cwd()).to_string(index=False))
@@ -0,0 +1,151 @@
+import datetime
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Versão do formato binário (mudar obriga a converter de novo)
+FORMAT_VERSION = 1
+
+BINARY_FILES = ('edges', 'indptr', 'indices', 'node_ids')
+
+
+def binaryDir(edge_file: Path) -> Path:
+    """Pasta com a versão binária de musae_{country}_edges.csv (data/{country}/binary)."""
+    return Path(edge_file).parent / 'binary'
+
+
+def _sourceStamp(edge_file: Path) -> dict:
+    stat = Path(edge_file).stat()
+    return {'version': FORMAT_VERSION, 'source': Path(edge_file).name,
+            'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def _saveArray(path: Path, array: np.ndarray) -> None:
+    # Escrita atómica, para que outro processo nunca leia um ficheiro incompleto
+    tmp_path = path.with_suffix('.tmp')
+    with open(tmp_path, 'wb') as f:
+        np.save(f, array)
+    os.replace(tmp_path, path)
+
+
+def readEdgeCSV(edge_file: Path) -> np.ndarray:
+    """Lê o CSV de arestas para um array (E, 2) de inteiros (colunas 'from' e 'to')."""
+    edges_df = pd.read_csv(edge_file, usecols=['from', 'to'], dtype=np.int64)
+    return edges_df[['from', 'to']].to_numpy()
+
+
+def isBinaryStale(edge_file: Path) -> bool:
+    """True se a versão binária não existir ou não corresponder ao CSV atual."""
+    folder = binaryDir(edge_file)
+    meta_path = folder / 'meta.json'
+    if not meta_path.exists() or not all((folder / f"{name}.npy").exists() for name in BINARY_FILES):
+        return True
+    with open(meta_path) as f:
+        return json.load(f) != _sourceStamp(edge_file)
+
+
+def convertEdgeFile(edge_file: Path) -> Path:
+    """
+    Converte o CSV de arestas para arrays binários em data/{country}/binary:
+    edges.npy (int32, E x 2), e o CSR simétrico já calculado (indptr.npy, indices.npy),
+    com os nós por ordem crescente de id (node_ids.npy).
+
+    Returns:
+        Path: Pasta com os ficheiros binários
+    """
+    # Importado aqui porque o csrGraph depende do graphLoader, que depende deste módulo
+    from csrGraph import TwitchCSRGraph
+
+    edges = readEdgeCSV(edge_file)
+    graph = TwitchCSRGraph.from_edge_array(edges, node_ids=np.unique(edges))
+
+    folder = binaryDir(edge_file)
+    folder.mkdir(parents=True, exist_ok=True)
+    _saveArray(folder / 'edges.npy', edges.astype(np.int32))
+    _saveArray(folder / 'indptr.npy', graph.indptr.astype(np.int64))
+    _saveArray(folder / 'indices.npy', graph.indices.astype(np.int32))
+    _saveArray(folder / 'node_ids.npy', graph.node_ids.astype(np.int64))
+
+    # O registo do CSV de origem é escrito no fim: só a partir daqui a conversão conta como válida
+    tmp_path = folder / 'meta.json.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(_sourceStamp(edge_file), f, indent=2)
+    os.replace(tmp_path, folder / 'meta.json')
+    return folder
+
+
+def _loadBinary(edge_file: Path, names: tuple, mmap: bool) -> list:
+    if isBinaryStale(edge_file):
+        convertEdgeFile(edge_file)
+    folder = binaryDir(edge_file)
+    return [np.load(folder / f"{name}.npy", mmap_mode='r' if mmap else None) for name in names]
+
+
+def loadBinaryEdges(edge_file: Path, mmap: bool = True) -> np.ndarray:
+    """
+    Array (E, 2) int32 das arestas, mapeado em memória (convertido na primeira utilização
+    ou quando o CSV muda). Vários processos que leiam a mesma região partilham as páginas.
+    """
+    return _loadBinary(edge_file, ('edges',), mmap)[0]
+
+
+def loadBinaryCSR(edge_file: Path, mmap: bool = True) -> tuple:
+    """
+    Arrays CSR (indptr, indices, node_ids) da região, mapeados em memória.
+    Os nós estão por ordem crescente de id.
+    """
+    return tuple(_loadBinary(edge_file, ('indptr', 'indices', 'node_ids'), mmap))
+
+
+def benchmarkBinaryLoad(current_dir: Path, countries: list = None) -> pd.DataFrame:
+    """
+    Compara, por região, a leitura do CSV de arestas com a leitura da versão binária.
+
+    Args:
+        current_dir (Path): Qualquer diretório dentro de "Twitch"
+        countries (list): Regiões a testar
+
+    Returns:
+        DataFrame: Tempos (em segundos) por região
+    """
+    if countries is None:
+        countries = ["PTBR", "DE", "ENGB", "ES", "FR", "RU"]
+
+    while current_dir.name != "Twitch":
+        current_dir = current_dir.parent
+    data_dir = current_dir / "data"
+
+    results = []
+    for country in countries:
+        edge_file = data_dir / country / f"musae_{country}_edges.csv"
+
+        start = datetime.datetime.now()
+        edges_csv = readEdgeCSV(edge_file)
+        csv_time = (datetime.datetime.now() - start).total_seconds()
+
+        if isBinaryStale(edge_file):
+            convertEdgeFile(edge_file)
+        start = datetime.datetime.now()
+        edges_bin = loadBinaryEdges(edge_file)
+        indptr, indices, node_ids = loadBinaryCSR(edge_file)
+        binary_time = (datetime.datetime.now() - start).total_seconds()
+
+        assert np.array_equal(edges_csv, edges_bin)
+
+        results.append({
+            'Country': country,
+            'Edges': len(edges_csv),
+            'CSV (s)': csv_time,
+            'binary (s)': binary_time,
+            'Speedup': csv_time / binary_time if binary_time > 0 else np.nan,
+        })
+        print(f"{country}: CSV {csv_time:.4f}s | binary {binary_time:.4f}s")
+
+    return pd.DataFrame(results)
+
+
+if __name__ == "__main__":
+    print(benchmarkBinaryLoad(Path.cwd()).to_string(index=False))
@@ -1,11 +1,12 @@
-import requests
 import pandas as pd
 import pathlib
 from pathlib import Path
-import time
-from datetime import datetime  # Import necessário para o formato de data
 
-def getData(country: str, current_dir: pathlib.WindowsPath, CLIENT_ID: str, OAUTH_TOKEN: str):
+from twitchFetcher import CheckpointWriter, fetchUsers, loadCheckpoint
+from twitchStorage import writeTable
+
+def getData(country: str, current_dir: pathlib.WindowsPath, CLIENT_ID: str, OAUTH_TOKEN: str,
+            resume: bool = True, checkpoint_every: int = 10):
     countries = ["PTBR", "DE", "ENGB", "ES", "FR", "RU"]
 
     if country not in countries:
@@ -27,100 +28,55 @@ def getData(country: str, current_dir: pathlib.WindowsPath, CLIENT_ID: str, OAUT
 
     nodos_df = pd.read_csv(targetPath)
 
-    user_idList = []
-    usernameList = []
-    created_atList = []
-    profile_picList = []
-    broadcaster_typeList = []
-    game_nameList = []
-
-    qtd = 0
-
-    for user_id in nodos_df['id']:
-        headers = {
-            'Client-ID': CLIENT_ID,
-            'Authorization': f'Bearer {OAUTH_TOKEN}'
-        }
-
-        # https://dev.twitch.tv/docs/api/reference/#get-channel-information
-        try:
-            user_url = f'https://api.twitch.tv/helix/users?id={user_id}'
-            user_response = requests.get(user_url, headers=headers)
-            user_response.raise_for_status()
-            user_data = user_response.json()
-
-            if user_data['data']:
-                user_info = user_data['data'][0]
-                username = user_info.get('display_name', None)
-                created_at_raw = user_info.get('created_at', None)
-                if created_at_raw:
-                    created_at = datetime.strptime(created_at_raw, '%Y-%m-%dT%H:%M:%SZ').date()
-                else:
-                    created_at = None
-                profile_pic = user_info.get('profile_image_url', None)
-                broadcaster_type = user_info.get('broadcaster_type', None)
-            else:
-                username = created_at = profile_pic = broadcaster_type = None
-
-            channel_url = f'https://api.twitch.tv/helix/channels?broadcaster_id={user_id}'
-            channel_response = requests.get(channel_url, headers=headers)
-            channel_response.raise_for_status()
-            channel_data = channel_response.json()
-
-            # TODO Só agr é que vi que existe -> content_classification_labels
-            print(channel_data)
-
-            if channel_data['data']:
-                game_name = channel_data['data'][0].get('game_name', None)
-            else:
-                game_name = None
-
-            print(
-                f"{country} - {qtd}: Utilizador: {username} | Criado em: {created_at} | Tipo: {broadcaster_type} | Jogo: {game_name} | Imagem: {profile_pic}"
-            )
-
-            user_idList.append(user_id)
-            usernameList.append(username)
-            created_atList.append(created_at)
-            profile_picList.append(profile_pic)
-            broadcaster_typeList.append(broadcaster_type)
-            game_nameList.append(game_name)
-            qtd += 1
-
-        except requests.exceptions.HTTPError as http_err:
-            print(f"Erro HTTP ao fazer requisição: {http_err}")
-        except requests.exceptions.RequestException as req_err:
-            print(f"Erro ao fazer requisição: {req_err}")
-        except Exception as e:
-            print(f"Ocorreu um erro inesperado: {e}")
-
-        time.sleep(0.1)
-
-    new_columns = pd.DataFrame({
-        "id": user_idList,
-        "username": usernameList,
-        "created_at": created_atList,
-        "profile_pic": profile_picList,
-        "broadcaster_type": broadcaster_typeList,
-        "game_name": game_nameList
-    })
+    NewFiletarget = "Raw_musae_" + country + "_target.csv"
+
+    # Resultados parciais (append-only), guardados a cada checkpoint_every lotes
+    checkpointPath = current_dir_data / country / "processed_data" / f"Partial_musae_{country}_target.csv"
+    if not resume and checkpointPath.exists():
+        checkpointPath.unlink()
+
+    # Retomar: não voltar a pedir os ids que já estão no ficheiro parcial
+    done_df = loadCheckpoint(checkpointPath)
+    pending_ids = nodos_df.loc[~nodos_df['id'].isin(done_df['id']), 'id'].tolist()
+    if len(done_df):
+        print(f"{country}: a retomar com {len(done_df)} utilizadores já obtidos, faltam {len(pending_ids)}")
+
+    # Pedidos em lotes de 100 ids, concorrentes e limitados pelos cabeçalhos Ratelimit da Twitch
+    fetched_df, failed_ids = fetchUsers(pending_ids, CLIENT_ID, OAUTH_TOKEN,
+                                        checkpoint=CheckpointWriter(checkpointPath, every=checkpoint_every))
+
+    # Ids cujos lotes falharam: ficam registados e o ficheiro parcial mantém-se, para que uma
+    # nova execução (resume=True) peça apenas esses ids
+    failedPath = checkpointPath.with_name(f"Failed_musae_{country}_ids.csv")
+    if failed_ids:
+        failedPath.parent.mkdir(parents=True, exist_ok=True)
+        pd.DataFrame({'id': failed_ids}).to_csv(failedPath, index=False)
+        print(f"{country}: {len(failed_ids)} ids falharam (lista em {failedPath}); "
+              f"{checkpointPath.name} mantido, {NewFiletarget} não foi escrito. Volte a correr para os repetir.")
+        return failed_ids
+
+    new_columns = pd.concat([df for df in (done_df, fetched_df) if len(df)] or [fetched_df], ignore_index=True)
 
     new_df = pd.merge(nodos_df, new_columns, on="id", how="left")
-    NewFiletarget = "Raw_musae_" + country + "_target.csv"
 
     # Definir o nome da nova pasta
     new_folder_name = "processed_data"
 
     # Caminho para a nova pasta
-    newPath = current_dir_data / 'data' / country / new_folder_name / NewFiletarget
+    newPath = current_dir_data / country / new_folder_name / NewFiletarget
 
     # Criar a nova pasta se ela não existir
-    newPath.mkdir(parents=True, exist_ok=True)
+    newPath.parent.mkdir(parents=True, exist_ok=True)
 
-    # Salvar o DataFrame limpo no novo diretório
-    new_df.to_csv(newPath, index=False)
+    # Salvar o DataFrame limpo no novo diretório (CSV + Parquet com o esquema tipado)
+    writeTable(new_df, newPath)
     print(f"Dados salvos em: {newPath}")
 
+    # Todos os ids foram obtidos (ou confirmados como inexistentes): o parcial já não é necessário
+    checkpointPath.unlink(missing_ok=True)
+    failedPath.unlink(missing_ok=True)
+    return []
+
 
 if __name__ == "__main__":
     # https://twitchtokengenerator.com/
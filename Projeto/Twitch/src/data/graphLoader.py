@@ -0,0 +1,195 @@
+import datetime
+from pathlib import Path
+
+import networkx as nx
+import numpy as np
+import pandas as pd
+
+from edgeStore import isBinaryStale, loadBinaryEdges, readEdgeCSV
+
+
+def readEdgeArray(edge_file: Path, use_binary: bool = True) -> np.ndarray:
+    """
+    Lê o ficheiro de arestas diretamente para um array (E, 2) de inteiros.
+
+    Por omissão usa a versão binária mapeada em memória (data/{country}/binary), criada na
+    primeira leitura e refeita sempre que o CSV muda.
+
+    Args:
+        edge_file (Path): Caminho para musae_{country}_edges.csv
+        use_binary (bool): Usar a versão binária em vez de fazer parse do CSV
+
+    Returns:
+        np.ndarray: Array com as colunas 'from' e 'to'
+    """
+    if use_binary:
+        return loadBinaryEdges(edge_file)
+    return readEdgeCSV(edge_file)
+
+
+def nodeMembership(node_ids: np.ndarray):
+    """
+    Função que, para um array de ids, devolve a máscara dos que pertencem a node_ids.
+
+    Com ids inteiros não negativos e pouco dispersos (como os new_id) usa uma tabela booleana
+    indexada pelo id (um acesso por aresta); caso contrário, np.isin.
+    """
+    node_ids = np.unique(np.asarray(node_ids))
+    if (len(node_ids) and np.issubdtype(node_ids.dtype, np.integer) and node_ids[0] >= 0
+            and node_ids[-1] < 4 * len(node_ids) + (1 << 20)):
+        table = np.zeros(int(node_ids[-1]) + 1, dtype=bool)
+        table[node_ids] = True
+
+        def member(ids: np.ndarray) -> np.ndarray:
+            ids = np.asarray(ids)
+            inside = (ids >= 0) & (ids < len(table))
+            return inside & table[np.where(inside, ids, 0)]
+        return member
+    return lambda ids: np.isin(ids, node_ids)
+
+
+def iterEdgeChunks(edge_file: Path, chunksize: int, use_binary: bool = True):
+    """
+    Percorre o ficheiro de arestas em blocos de até chunksize arestas (arrays (k, 2)), sem o
+    carregar todo em memória: fatias do array binário mapeado em memória ou, se a versão
+    binária não existir ou estiver desatualizada, o CSV lido por partes (pd.read_csv com
+    chunksize). A conversão para binário lê o CSV inteiro, por isso não é feita aqui.
+    """
+    if use_binary and not isBinaryStale(edge_file):
+        edges = loadBinaryEdges(edge_file)
+        for start in range(0, len(edges), chunksize):
+            yield np.asarray(edges[start:start + chunksize])
+    else:
+        for chunk in pd.read_csv(edge_file, usecols=['from', 'to'], dtype=np.int64, chunksize=chunksize):
+            yield chunk[['from', 'to']].to_numpy()
+
+
+def filterEdges(edge_file: Path, node_ids: np.ndarray, chunksize: int = None, use_binary: bool = True) -> np.ndarray:
+    """
+    Arestas com as duas extremidades em node_ids (ex.: os nós que passaram os filtros mature/partner).
+
+    Args:
+        edge_file (Path): Caminho para o ficheiro de arestas
+        node_ids (np.ndarray): Nós a manter
+        chunksize (int): Número de arestas por bloco (None -> todas de uma vez)
+        use_binary (bool): Ler a versão binária em vez do CSV
+
+    Returns:
+        np.ndarray: Array (E', 2) das arestas filtradas
+    """
+    member = nodeMembership(node_ids)
+    if chunksize is None:
+        edges = readEdgeArray(edge_file, use_binary)
+        return np.asarray(edges[member(edges[:, 0]) & member(edges[:, 1])])
+
+    kept = [chunk[member(chunk[:, 0]) & member(chunk[:, 1])]
+            for chunk in iterEdgeChunks(edge_file, chunksize, use_binary)]
+    return np.concatenate(kept) if kept else np.empty((0, 2), dtype=np.int64)
+
+
+def loadTwitchGraph(edge_file: Path, target_file: Path = None, node_col: str = 'new_id',
+                    nodes_df: pd.DataFrame = None, attributes: list = None,
+                    restrict_to_nodes: bool = False, chunksize: int = None) -> nx.Graph:
+    """
+    Constrói o grafo de uma região a partir dos ficheiros de arestas e de nós (target),
+    sem iterar linha a linha com iterrows.
+
+    Os nós são adicionados primeiro (mantendo a ordem do ficheiro target) com todos os
+    atributos em lote, e as arestas são adicionadas de uma só vez a partir do array.
+
+    Args:
+        edge_file (Path): Caminho para o ficheiro de arestas
+        target_file (Path): Caminho para o ficheiro de nós (ignorado se nodes_df for dado)
+        node_col (str): Coluna com o identificador do nó
+        nodes_df (DataFrame): Nós já carregados (opcional)
+        attributes (list): Colunas a guardar como atributos (None -> todas)
+        restrict_to_nodes (bool): Manter apenas arestas entre nós presentes em nodes_df
+        chunksize (int): Com restrict_to_nodes, filtrar as arestas por blocos deste tamanho
+            (para ficheiros de arestas maiores do que a memória)
+
+    Returns:
+        nx.Graph: Grafo da região
+    """
+    if nodes_df is None and target_file is not None:
+        nodes_df = pd.read_csv(target_file)
+
+    G = nx.Graph()
+
+    edges = None
+    if nodes_df is not None:
+        node_ids = nodes_df[node_col].to_numpy()
+        if attributes is not None:
+            nodes_df = nodes_df[attributes]
+        records = nodes_df.to_dict('records')
+        G.add_nodes_from(zip(node_ids.tolist(), records))
+
+        if restrict_to_nodes:
+            edges = filterEdges(edge_file, node_ids, chunksize)
+
+    if edges is None:
+        edges = readEdgeArray(edge_file)
+    G.add_edges_from(edges.tolist())
+    return G
+
+
+def _legacyLoad(edge_file: Path, target_file: Path) -> nx.Graph:
+    # Construção original (linha a linha), usada apenas como referência no benchmark
+    nodes_df = pd.read_csv(target_file)
+    edges_df = pd.read_csv(edge_file)
+    G = nx.Graph()
+    for _, row in nodes_df.iterrows():
+        G.add_node(row['new_id'], **row.to_dict())
+    for _, row in edges_df.iterrows():
+        G.add_edge(row['from'], row['to'])
+    return G
+
+
+def benchmarkLoad(current_dir: Path, countries: list = None) -> pd.DataFrame:
+    """
+    Compara o tempo de carregamento do grafo (iterrows vs. carregamento em lote) por região.
+
+    Args:
+        current_dir (Path): Qualquer diretório dentro de "Twitch"
+        countries (list): Regiões a testar
+
+    Returns:
+        DataFrame: Tempos (em segundos) por região
+    """
+    if countries is None:
+        countries = ["PTBR", "DE", "ENGB", "ES", "FR", "RU"]
+
+    while current_dir.name != "Twitch":
+        current_dir = current_dir.parent
+    data_dir = current_dir / "data"
+
+    results = []
+    for country in countries:
+        edge_file = data_dir / country / f"musae_{country}_edges.csv"
+        target_file = data_dir / country / 'processed_data' / f"Final_musae_{country}_target.csv"
+
+        start = datetime.datetime.now()
+        G_old = _legacyLoad(edge_file, target_file)
+        legacy_time = (datetime.datetime.now() - start).total_seconds()
+
+        start = datetime.datetime.now()
+        G_new = loadTwitchGraph(edge_file, target_file)
+        bulk_time = (datetime.datetime.now() - start).total_seconds()
+
+        assert G_old.number_of_nodes() == G_new.number_of_nodes()
+        assert G_old.number_of_edges() == G_new.number_of_edges()
+
+        results.append({
+            'Country': country,
+            'Nodes': G_new.number_of_nodes(),
+            'Edges': G_new.number_of_edges(),
+            'iterrows (s)': legacy_time,
+            'bulk (s)': bulk_time,
+            'Speedup': legacy_time / bulk_time if bulk_time > 0 else np.nan,
+        })
+        print(f"{country}: iterrows {legacy_time:.2f}s | bulk {bulk_time:.2f}s")
+
+    return pd.DataFrame(results)
+
+
+if __name__ == "__main__":
+    print(benchmarkLoad(Path.cwd()).to_string(index=False))
@@ -0,0 +1,360 @@
+import json
+from collections import deque
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from csrGraph import TwitchCSRGraph
+from edgeStore import loadBinaryEdges
+from metricCache import fileHash
+from twitchStorage import readTable, writeTable
+
+# Colunas do twitch_network_analysis_{country}.csv atualizadas pelo modo incremental
+UPDATED_COLUMNS = ['degree', 'degree_centrality', 'clustering_coef', 'pagerank_centrality',
+                   'eigenvector_centrality']
+# Colunas que dependem de caminhos mais curtos ou de comunidades e que não são atualizadas
+STALE_COLUMNS = ['closeness_centrality', 'betweenness_centrality', 'louvain_community', 'lp_community',
+                 'louvain_stability', 'community_leiden']
+
+
+class _DynamicAdjacency:
+    """
+    Adjacência mutável sobre um TwitchCSRGraph: só as linhas dos nós tocados são copiadas
+    para sets, o resto continua a ser lido do CSR.
+    """
+
+    def __init__(self, graph: TwitchCSRGraph):
+        self.graph = graph
+        self.base_nodes = graph.number_of_nodes()
+        self.rows = {}
+
+    def __getitem__(self, node: int) -> set:
+        row = self.rows.get(node)
+        if row is None:
+            if node < self.base_nodes:
+                row = set(self.graph.indices[self.graph.indptr[node]:self.graph.indptr[node + 1]].tolist())
+            else:
+                row = set()
+            self.rows[node] = row
+        return row
+
+    def add(self, u: int, v: int) -> None:
+        self[u].add(v)
+        self[v].add(u)
+
+    def remove(self, u: int, v: int) -> None:
+        self[u].discard(v)
+        self[v].discard(u)
+
+
+class _Components:
+    """
+    Componentes conexas mutáveis: rótulo de cada nó, tamanho de cada componente e os nós de cada
+    uma (listas de arrays, filtradas pelo rótulo quando são lidas). Juntar ou dividir componentes
+    só mexe nos nós do lado mais pequeno.
+    """
+
+    def __init__(self, component: np.ndarray):
+        self.label = component
+        order = np.argsort(component, kind='stable')
+        labels, starts, counts = np.unique(component[order], return_index=True, return_counts=True)
+        self._nodes = {c: [nodes] for c, nodes in zip(labels.tolist(), np.split(order, starts[1:]))}
+        self.size = dict(zip(labels.tolist(), counts.tolist()))
+        self._next = int(labels.max(initial=-1)) + 1
+
+    def members(self, c: int) -> np.ndarray:
+        # Nós guardados para c que ainda têm o rótulo c (os que saíram numa divisão são ignorados)
+        nodes = np.concatenate(self._nodes[c])
+        nodes = nodes[self.label[nodes] == c]
+        self._nodes[c] = [nodes]
+        return nodes
+
+    def union(self, u: int, v: int) -> None:
+        a, b = int(self.label[u]), int(self.label[v])
+        if a == b:
+            return
+        # Junta a componente mais pequena à maior
+        small, large = (a, b) if self.size[a] <= self.size[b] else (b, a)
+        moved = self.members(small)
+        self.label[moved] = large
+        self._nodes[large].append(moved)
+        self.size[large] += self.size.pop(small)
+        del self._nodes[small]
+
+    def split(self, nodes: set) -> None:
+        # Os nós do lado mais pequeno de uma divisão passam para uma componente nova
+        nodes = np.fromiter(nodes, dtype=np.int64, count=len(nodes))
+        c = int(self.label[nodes[0]])
+        new = self._next
+        self._next += 1
+        self.label[nodes] = new
+        self._nodes[new] = [nodes]
+        self.size[c] -= len(nodes)
+        self.size[new] = len(nodes)
+
+
+def readEdgeDelta(delta_file: Path) -> pd.DataFrame:
+    """
+    Lê um ficheiro de alterações de arestas com as colunas from, to e action ('add' ou 'remove').
+    """
+    delta = pd.read_csv(delta_file, usecols=['from', 'to', 'action'])
+    delta['action'] = delta['action'].str.strip().str.lower()
+    assert delta['action'].isin(['add', 'remove']).all(), "action tem de ser 'add' ou 'remove'"
+    return delta[delta['from'] != delta['to']].reset_index(drop=True)
+
+
+def _subcore(adj: _DynamicAdjacency, core: np.ndarray, roots: list, r: int) -> set:
+    # Nós alcançáveis a partir das raízes passando só por nós com core number r
+    subcore = set(roots)
+    queue = deque(roots)
+    while queue:
+        w = queue.popleft()
+        for x in adj[w]:
+            if core[x] == r and x not in subcore:
+                subcore.add(x)
+                queue.append(x)
+    return subcore
+
+
+def _coreInsert(adj: _DynamicAdjacency, core: np.ndarray, u: int, v: int) -> None:
+    # Algoritmo "subcore" de inserção: só os nós do subcore da raiz podem subir para r + 1
+    r = min(core[u], core[v])
+    subcore = _subcore(adj, core, [x for x in (u, v) if core[x] == r], r)
+    support = {w: sum(1 for x in adj[w] if core[x] >= r) for w in subcore}
+    evicted = set()
+    stack = [w for w in subcore if support[w] <= r]
+    while stack:
+        w = stack.pop()
+        if w in evicted:
+            continue
+        evicted.add(w)
+        for x in adj[w]:
+            if x in subcore and x not in evicted:
+                support[x] -= 1
+                if support[x] <= r:
+                    stack.append(x)
+    for w in subcore - evicted:
+        core[w] = r + 1
+
+
+def _coreRemove(adj: _DynamicAdjacency, core: np.ndarray, u: int, v: int) -> None:
+    # Remoção: os nós do subcore que ficam com menos de r vizinhos com core >= r descem para r - 1
+    r = min(core[u], core[v])
+    subcore = _subcore(adj, core, [x for x in (u, v) if core[x] == r], r)
+    support = {w: sum(1 for x in adj[w] if core[x] >= r) for w in subcore}
+    demoted = set()
+    stack = [w for w in subcore if support[w] < r]
+    while stack:
+        w = stack.pop()
+        if w in demoted:
+            continue
+        demoted.add(w)
+        core[w] = r - 1
+        for x in adj[w]:
+            if x in subcore and x not in demoted:
+                support[x] -= 1
+                if support[x] < r:
+                    stack.append(x)
+
+
+def _splitComponent(adj: _DynamicAdjacency, u: int, v: int):
+    """
+    BFS alternada a partir de u e de v depois de remover (u, v). Devolve None se continuarem
+    ligados; caso contrário, os nós do lado que se esgotou primeiro (o mais pequeno).
+    """
+    seen = [{u}, {v}]
+    queues = [deque([u]), deque([v])]
+    while True:
+        for side in (0, 1):
+            if not queues[side]:
+                return seen[side]
+            w = queues[side].popleft()
+            for x in adj[w]:
+                if x in seen[1 - side]:
+                    return None
+                if x not in seen[side]:
+                    seen[side].add(x)
+                    queues[side].append(x)
+
+
+def _loadState(state_path: Path, edge_hash: str, graph: TwitchCSRGraph) -> dict:
+    # Triângulos, core numbers e componentes do grafo atual (calculados se não houver estado válido)
+    if state_path.exists():
+        state = np.load(state_path)
+        if str(state['edge_file_sha256']) == edge_hash and np.array_equal(state['node_ids'], graph.node_ids):
+            return {key: state[key].copy() for key in ('triangles', 'core', 'component')}
+    print("Estado incremental inexistente ou desatualizado: a calcular triângulos, núcleos e componentes")
+    return {
+        'triangles': graph.triangles(),
+        'core': graph.core_number(),
+        'component': graph.connected_components()[1].astype(np.int64),
+    }
+
+
+def updateFromDelta(country: str, data_dir: Path, delta_file: Path, change_tol: float = 1e-2,
+                    write_edges: bool = False) -> pd.DataFrame:
+    """
+    Atualiza as métricas de uma região a partir de um ficheiro de alterações de arestas,
+    sem recalcular tudo.
+
+    Graus, triângulos, coeficientes de clustering, core numbers (algoritmo de subcore por aresta)
+    e componentes conexas (junção na inserção, BFS alternada na remoção) são atualizados apenas à
+    volta dos nós tocados; PageRank e centralidade de vetor próprio recomeçam dos vetores anteriores.
+    O resultado principal são as linhas alteradas, em twitch_network_analysis_{country}.changes.csv;
+    os ficheiros da região só são alterados com write_edges=True.
+
+    Args:
+        country (str): Região
+        data_dir (Path): Diretório "data"
+        delta_file (Path): CSV com as colunas from, to, action ('add'/'remove')
+        change_tol (float): Diferença relativa abaixo da qual um valor é considerado igual (por
+            omissão 1%, acima do ruído de convergência do PageRank com tol=1e-6)
+        write_edges (bool): Aplicar as alterações à região: reescrever musae_{country}_edges.csv
+            e as linhas alteradas de twitch_network_analysis_{country}.csv. Closeness, betweenness
+            e comunidades ficam com os valores anteriores, registados como desatualizados
+            (stale_columns) no .meta.json
+
+    Returns:
+        DataFrame: Linhas alteradas (guardadas em twitch_network_analysis_{country}.changes.csv)
+    """
+    edge_file = data_dir / country / f"musae_{country}_edges.csv"
+    target_file = data_dir / country / 'processed_data' / f"Final_musae_{country}_target.csv"
+    analysis_file = data_dir / country / 'processed_data' / f"twitch_network_analysis_{country}.csv"
+    state_path = data_dir / country / 'cache' / 'incremental_state.npz'
+
+    graph = TwitchCSRGraph.from_edge_file(edge_file)
+    state = _loadState(state_path, fileHash(edge_file), graph)
+    delta = readEdgeDelta(delta_file)
+
+    previous = readTable(analysis_file).drop_duplicates('node', keep='last').set_index('node')
+
+    # Índices dos nós: os do grafo atual (ordem do CSR) e, no fim, os que não têm arestas no
+    # ficheiro atual (isolados na tabela de análise ou novos no delta)
+    delta_ids = pd.unique(delta[['from', 'to']].to_numpy().ravel())
+    new_ids = np.setdiff1d(np.union1d(delta_ids, previous.index.to_numpy()), graph.node_ids)
+    node_ids = np.concatenate([graph.node_ids, new_ids])
+    n = len(node_ids)
+    index = pd.Series(np.arange(n), index=node_ids)
+    src = index[delta['from']].to_numpy()
+    dst = index[delta['to']].to_numpy()
+
+    degree = np.concatenate([graph.degree(), np.zeros(len(new_ids), dtype=np.int64)])
+    triangles = np.concatenate([state['triangles'], np.zeros(len(new_ids), dtype=np.int64)])
+    core = np.concatenate([state['core'], np.zeros(len(new_ids), dtype=np.int64)])
+    components = _Components(np.concatenate([state['component'],
+                                             state['component'].max(initial=-1) + 1 + np.arange(len(new_ids))]))
+
+    adj = _DynamicAdjacency(graph)
+    touched = set()
+    applied = {'add': 0, 'remove': 0}
+    # Por aresta alterada: se existia antes do delta e se existe no fim (uma aresta adicionada e
+    # depois removida no mesmo delta não muda o grafo)
+    existed, present = {}, {}
+    for u, v, action in zip(src.tolist(), dst.tolist(), delta['action']):
+        if action == 'add':
+            if v in adj[u]:
+                continue
+            common = adj[u] & adj[v]
+            adj.add(u, v)
+            _coreInsert(adj, core, u, v)
+            components.union(u, v)
+            sign = 1
+        else:
+            if v not in adj[u]:
+                continue
+            adj.remove(u, v)
+            common = adj[u] & adj[v]
+            _coreRemove(adj, core, u, v)
+            split = _splitComponent(adj, u, v)
+            if split is not None:
+                components.split(split)
+            sign = -1
+
+        applied[action] += 1
+        key = (min(u, v), max(u, v))
+        existed.setdefault(key, action == 'remove')
+        present[key] = action == 'add'
+        degree[[u, v]] += sign
+        triangles[[u, v]] += sign * len(common)
+        triangles[list(common)] += sign
+        touched.update((u, v), common)
+
+    component = components.label
+    print(f"{country}: {applied['add']} arestas adicionadas, {applied['remove']} removidas, "
+          f"{len(touched)} nós tocados")
+
+    # Novo grafo (para PageRank / vetor próprio) a partir das arestas antigas e do saldo das
+    # alterações: saem as que existiam e já não existem, entram as que não existiam e existem
+    old_edges = np.asarray(loadBinaryEdges(edge_file), dtype=np.int64)
+    base = node_ids.max() + 1
+    keys = np.minimum(old_edges[:, 0], old_edges[:, 1]) * base + np.maximum(old_edges[:, 0], old_edges[:, 1])
+    pairs = np.array([(node_ids[u], node_ids[v]) for u, v in present], dtype=np.int64).reshape(-1, 2)
+    pair_keys = pairs.min(axis=1) * base + pairs.max(axis=1)
+    was, now = np.array(list(existed.values()), dtype=bool), np.array(list(present.values()), dtype=bool)
+    removed = pair_keys[was & ~now]
+    added = pairs[~was & now]
+    new_edges = np.concatenate([old_edges[~np.isin(keys, removed)], added])
+    new_graph = TwitchCSRGraph.from_edge_array(new_edges, node_ids=node_ids)
+
+    # Clustering só muda nos nós tocados
+    possible = degree * (degree - 1)
+    clustering = np.zeros(n, dtype=float)
+    mask = possible > 0
+    clustering[mask] = 2 * triangles[mask] / possible[mask]
+
+    # Tabela anterior alinhada com os nós do novo grafo (nós novos ficam sem atributos)
+    aligned = previous.reindex(node_ids)
+    warm_pagerank = aligned['pagerank_centrality'].fillna(1.0 / n).to_numpy()
+    warm_eigenvector = aligned['eigenvector_centrality'].fillna(aligned['eigenvector_centrality'].mean()).to_numpy()
+
+    updated = pd.DataFrame({
+        'degree': degree,
+        'degree_centrality': degree / (n - 1) if n > 1 else np.ones(n),
+        'clustering_coef': clustering,
+        # Partindo de um vetor já próximo, uma tolerância mais apertada custa poucas iterações
+        'pagerank_centrality': new_graph.pagerank(nstart=warm_pagerank, tol=1e-8),
+        'eigenvector_centrality': new_graph.eigenvector_centrality(nstart=warm_eigenvector, tol=1e-8),
+    }, index=pd.Index(node_ids, name='node'))
+
+    # Linhas alteradas: nós novos, métricas locais diferentes ou centralidades que mudaram mais
+    # do que change_tol (abaixo disso a diferença é ruído da iteração de potência)
+    old_values = aligned[UPDATED_COLUMNS].astype(float)
+    exact = ['degree', 'degree_centrality', 'clustering_coef']
+    approximate = ['pagerank_centrality', 'eigenvector_centrality']
+    changed = (~np.isclose(updated[exact], old_values[exact], rtol=1e-12, atol=0.0)).any(axis=1)
+    changed |= (~np.isclose(updated[approximate], old_values[approximate], rtol=change_tol, atol=0.0)).any(axis=1)
+    changed |= old_values.isna().any(axis=1).to_numpy()
+    changes = updated[changed].reset_index()
+
+    changes_file = analysis_file.with_suffix('.changes.csv')
+    changes.to_csv(changes_file, index=False)
+    print(f"{len(changes)} linhas alteradas guardadas em: {changes_file}")
+
+    if write_edges:
+        # Aplicar as linhas alteradas à tabela de análise (mantendo a ordem; nós novos no fim), só
+        # junto com o novo ficheiro de arestas, para que o hash no .meta.json corresponda à tabela
+        table = previous.reindex(previous.index.append(pd.Index(np.setdiff1d(node_ids, previous.index))))
+        table.index.name = 'node'
+        table.loc[changes['node'], UPDATED_COLUMNS] = changes[UPDATED_COLUMNS].to_numpy()
+        writeTable(table.reset_index(), analysis_file)
+
+        pd.DataFrame(new_edges, columns=['from', 'to']).to_csv(edge_file, index=False)
+        meta = {'edge_file_sha256': fileHash(edge_file), 'target_file_sha256': fileHash(target_file),
+                'stale_columns': STALE_COLUMNS}
+        with open(analysis_file.with_suffix('.meta.json'), 'w') as f:
+            json.dump(meta, f, indent=2)
+
+        # Estado para a próxima atualização (válido para o novo ficheiro de arestas, que não
+        # inclui os nós que ficaram isolados)
+        state_path.parent.mkdir(parents=True, exist_ok=True)
+        order = np.argsort(node_ids)
+        order = order[degree[order] > 0]
+        np.savez(state_path, edge_file_sha256=fileHash(edge_file), node_ids=node_ids[order],
+                 triangles=triangles[order], core=core[order], component=component[order])
+        print(f"Alterações aplicadas a {edge_file.name} e {analysis_file.name}")
+
+    giant = np.bincount(pd.factorize(component)[0]).max()
+    print(f"Componentes: {len(np.unique(component))} (gigante: {giant} nós) | "
+          f"k-core principal: k={core.max()}, {(core == core.max()).sum()} nós")
+    return changes
@@ -0,0 +1,79 @@
+import hashlib
+import json
+import os
+import pickle
+from pathlib import Path
+
+
+def fileHash(path: Path, chunk_size: int = 1 << 20) -> str:
+    """Hash SHA-256 do conteúdo de um ficheiro (lido por blocos)."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class MetricCache:
+    """
+    Cache em disco de métricas por região.
+
+    Cada entrada é identificada pelo nome da métrica, pelo hash do conteúdo dos ficheiros de
+    entrada (arestas/target) e pelos parâmetros do algoritmo; se algum deles mudar, a métrica é
+    recalculada e as restantes continuam a ser lidas da cache.
+    """
+
+    def __init__(self, cache_dir: Path, input_files: list, label: str = "", enabled: bool = True):
+        self.cache_dir = Path(cache_dir)
+        self.label = label
+        self.enabled = enabled
+        self.hits = []
+        self.misses = []
+
+        digest = hashlib.sha256()
+        for path in input_files:
+            digest.update(fileHash(path).encode())
+        self.input_hash = digest.hexdigest()
+
+    def _path(self, metric: str, params: dict) -> Path:
+        key = json.dumps({'inputs': self.input_hash, 'params': params}, sort_keys=True, default=str)
+        return self.cache_dir / f"{metric}_{hashlib.sha256(key.encode()).hexdigest()[:16]}.pkl"
+
+    def get_or_compute(self, metric: str, compute, **params):
+        """
+        Devolve a métrica guardada em cache ou calcula-a com compute() e guarda o resultado.
+
+        Args:
+            metric (str): Nome da métrica (ex.: 'betweenness_centrality')
+            compute (callable): Função sem argumentos que calcula a métrica
+            **params: Parâmetros do algoritmo que fazem parte da chave
+
+        Returns:
+            Valor da métrica
+        """
+        if not self.enabled:
+            return compute()
+
+        path = self._path(metric, params)
+        if path.exists():
+            with open(path, 'rb') as f:
+                value = pickle.load(f)
+            self.hits.append(metric)
+            print(f"[cache] {self.label} {metric}: hit")
+            return value
+
+        value = compute()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix('.tmp')
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        self.misses.append(metric)
+        print(f"[cache] {self.label} {metric}: miss (calculada e guardada)")
+        return value
+
+    def report(self) -> None:
+        """Resumo de hits/misses da execução."""
+        if self.enabled:
+            print(f"[cache] {self.label}: {len(self.hits)} hits, {len(self.misses)} misses"
+                  + (f" (recalculadas: {', '.join(self.misses)})" if self.misses else ""))
@@ -0,0 +1,115 @@
+from pathlib import Path
+
+import networkx as nx
+import numpy as np
+
+from twitchStorage import readTable
+
+CENTRALITIES = ('pagerank', 'eigenvector')
+
+
+def powerCentralities(graph, which: tuple = CENTRALITIES, alpha: float = 0.85, max_iter: int = 100,
+                      tol: float = 1.0e-6, dtype=np.float64, pagerank_start: np.ndarray = None,
+                      eigenvector_start: np.ndarray = None):
+    """
+    PageRank e centralidade de vetor próprio por iteração de potência, em conjunto: os dois
+    vetores são colunas de uma matriz (n, 2) e cada iteração faz um só produto esparso A @ X.
+
+    Os critérios de paragem e as normalizações são os do nx.pagerank e do
+    nx.eigenvector_centrality (soma dos erros absolutos < n * tol); cada coluna deixa de ser
+    atualizada quando converge.
+
+    Args:
+        graph (TwitchCSRGraph): Grafo (qualquer objeto com adjacency, degree() e number_of_nodes())
+        which (tuple): Centralidades a calcular ('pagerank' e/ou 'eigenvector')
+        alpha (float): Fator de amortecimento do PageRank
+        max_iter (int): Número máximo de iterações
+        tol (float): Tolerância
+        dtype: np.float64 ou np.float32 (metade da memória e produtos mais rápidos)
+        pagerank_start (np.ndarray): Vetor inicial do PageRank (warm start)
+        eigenvector_start (np.ndarray): Vetor inicial da centralidade de vetor próprio
+
+    Returns:
+        tuple: (dicionário {centralidade: array}, dicionário {centralidade: {'iterations', 'residual'}})
+    """
+    n = graph.number_of_nodes()
+    if n == 0:
+        raise nx.NetworkXPointlessConcept("cannot compute centrality for the null graph")
+    assert all(name in CENTRALITIES for name in which)
+
+    A = graph.adjacency.astype(dtype)
+    deg = graph.degree().astype(dtype)
+    dangling = deg == 0
+    inv_deg = np.zeros(n, dtype=dtype)
+    inv_deg[~dangling] = 1.0 / deg[~dangling]
+
+    starts = {'pagerank': pagerank_start, 'eigenvector': eigenvector_start}
+    X = np.empty((n, len(which)), dtype=dtype)
+    for col, name in enumerate(which):
+        start = starts[name]
+        x = np.ones(n, dtype=dtype) if start is None else np.asarray(start, dtype=dtype)
+        if not x.any():
+            raise nx.NetworkXError("initial vector cannot have all zero values")
+        X[:, col] = x / x.sum()
+
+    # Coluna do PageRank é multiplicada por 1/grau antes do produto (x @ D^-1 A, com A simétrica)
+    scale = np.ones((n, len(which)), dtype=dtype)
+    if 'pagerank' in which:
+        scale[:, which.index('pagerank')] = inv_deg
+
+    info = {name: {'iterations': max_iter, 'residual': np.inf} for name in which}
+    active = np.ones(len(which), dtype=bool)
+    for iteration in range(1, max_iter + 1):
+        Xlast = X
+        Y = A @ (Xlast[:, active] * scale[:, active])
+        X = Xlast.copy()
+        for position, col in enumerate(np.flatnonzero(active)):
+            name = which[col]
+            if name == 'pagerank':
+                x = Xlast[:, col]
+                X[:, col] = alpha * (Y[:, position] + x[dangling].sum() / n) + (1 - alpha) / n
+            else:
+                x = Xlast[:, col] + Y[:, position]
+                X[:, col] = x / (np.linalg.norm(x) or 1)
+
+            residual = float(np.abs(X[:, col] - Xlast[:, col]).sum())
+            info[name] = {'iterations': iteration, 'residual': residual}
+            if residual < n * tol:
+                active[col] = False
+        if not active.any():
+            break
+    else:
+        raise nx.PowerIterationFailedConvergence(max_iter)
+
+    return {name: X[:, col].astype(np.float64) for col, name in enumerate(which)}, info
+
+
+def loadWarmStart(analysis_file: Path, node_ids: np.ndarray) -> dict:
+    """
+    Vetores iniciais a partir de uma análise anterior (twitch_network_analysis_{country}.csv),
+    alinhados com node_ids. Nós que não estejam no ficheiro recebem a média dos restantes.
+
+    Returns:
+        dict: {'pagerank_start', 'eigenvector_start'} (vazio se não houver análise anterior)
+    """
+    columns = {'pagerank_start': 'pagerank_centrality', 'eigenvector_start': 'eigenvector_centrality'}
+    if not Path(analysis_file).exists():
+        return {}
+    try:
+        table = readTable(analysis_file, columns=['node'] + list(columns.values()))
+    except (KeyError, ValueError):
+        return {}
+    table = table.drop_duplicates('node', keep='last').set_index('node').reindex(np.asarray(node_ids))
+
+    starts = {}
+    for key, column in columns.items():
+        values = table[column]
+        if values.notna().any():
+            starts[key] = values.fillna(values.mean()).to_numpy()
+    return starts
+
+
+def reportPowerIteration(info: dict, label: str = "") -> None:
+    """Iterações e resíduo final de cada centralidade."""
+    print(f"{label} " + " | ".join(f"{name}: {values['iterations']} iterações "
+                                   f"(resíduo {values['residual']:.2e})" for name, values in info.items()))
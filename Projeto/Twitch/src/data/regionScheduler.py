@@ -0,0 +1,52 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from tqdm import tqdm
+
+
+def regionSize(data_dir: Path, country: str) -> int:
+    """Tamanho (em bytes) do ficheiro de arestas, usado como estimativa do custo da região."""
+    edge_file = data_dir / country / f"musae_{country}_edges.csv"
+    return edge_file.stat().st_size if edge_file.exists() else 0
+
+
+def runRegions(func, countries: list, data_dir: Path, max_workers: int = None,
+               tqdm_kwargs: dict = None, func_kwargs: dict = None) -> list:
+    """
+    Executa func(country, **func_kwargs) para cada região num conjunto de processos.
+
+    As regiões são submetidas da maior para a menor (pelo tamanho do ficheiro de arestas),
+    para que a maior não fique a correr sozinha no fim. A barra de progresso é atualizada no
+    processo principal à medida que cada região termina, e os resultados são devolvidos na
+    ordem de `countries`, independentemente da ordem de conclusão.
+
+    Args:
+        func (callable): Função de nível de módulo (tem de ser serializável)
+        countries (list): Regiões a processar
+        data_dir (Path): Diretório "data" com uma pasta por região
+        max_workers (int): Número de processos (por omissão, um por região até ao nº de CPUs)
+        tqdm_kwargs (dict): Argumentos da barra de progresso
+        func_kwargs (dict): Argumentos passados a func
+
+    Returns:
+        list: Resultado de func para cada região, pela ordem de `countries`
+    """
+    if max_workers is None:
+        max_workers = min(len(countries), os.cpu_count() or 1)
+    tqdm_kwargs = tqdm_kwargs or {}
+    func_kwargs = func_kwargs or {}
+
+    schedule = sorted(countries, key=lambda country: regionSize(data_dir, country), reverse=True)
+    results = {}
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(func, country, **func_kwargs): country for country in schedule}
+        with tqdm(total=len(countries), **tqdm_kwargs) as progress:
+            for future in as_completed(futures):
+                country = futures[future]
+                results[country] = future.result()
+                progress.set_postfix_str(country, refresh=False)
+                progress.update(1)
+
+    return [results[country] for country in countries]
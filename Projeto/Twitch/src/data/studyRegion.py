@@ -4,8 +4,25 @@ import pandas as pd
 from pathlib import Path
 import numpy as np
 import datetime
+import json
 
-def AnalyzeCountryNetwork(country: str, current_dir: pathlib.WindowsPath) -> None:
+from graphLoader import loadTwitchGraph
+from csrGraph import TwitchCSRGraph
+from betweenness import approximateBetweenness
+from bfsSweep import shortestPathSweep
+from regionScheduler import runRegions
+from metricCache import MetricCache, fileHash
+from twitchStorage import readTable, writeTable
+from incrementalUpdate import updateFromDelta
+from powerIteration import loadWarmStart, powerCentralities, reportPowerIteration
+from communityDetection import ALGORITHMS, communitySweep, ensemblePartition, reportEnsemble
+
+def AnalyzeCountryNetwork(country: str, current_dir: pathlib.WindowsPath, backend: str = "networkx",
+                          betweenness_k: int = None, betweenness_epsilon: float = None,
+                          betweenness_seed: int = 42, n_jobs: int = 1, use_cache: bool = True,
+                          delta_file: Path = None, power_dtype: str = "float64",
+                          warm_start: bool = False, resolutions: tuple = (1.0,),
+                          community_seeds: tuple = (42,), ensemble_runs: int = 0) -> None:
     print(f'\n# ===={country}==== #\n')
     start_time = datetime.datetime.now()
 
@@ -14,6 +31,8 @@ def AnalyzeCountryNetwork(country: str, current_dir: pathlib.WindowsPath) -> Non
 
     # Verificar se o país especificado é válido
     assert country in countries
+    # Backend das métricas: "networkx" (original) ou "csr" (kernels esparsos do TwitchCSRGraph)
+    assert backend in ("networkx", "csr")
     # Garantir que o diretório atual é do tipo correto e contém "Twitch" no caminho
     assert type(current_dir) == pathlib.WindowsPath and "Twitch" in str(current_dir)
 
@@ -24,71 +43,154 @@ def AnalyzeCountryNetwork(country: str, current_dir: pathlib.WindowsPath) -> Non
     # Diretório onde estão os dados
     current_dir = current_dir / "data"
 
+    # Modo incremental: aplicar um ficheiro de alterações de arestas à análise já existente
+    if delta_file is not None:
+        updateFromDelta(country, current_dir, delta_file)
+        print(f"Tempo total: {datetime.datetime.now() - start_time}\n")
+        return
+
     # Caminhos dos ficheiros
     edge_file = current_dir / country / f"musae_{country}_edges.csv"
     target_file = current_dir / country / 'processed_data' / f"Final_musae_{country}_target.csv"
 
-    # Leitura dos dados
+    # Leitura dos dados e construção do grafo (nós com todas as características do ficheiro target)
     print("A carregar dados...")
-    nodes_df = pd.read_csv(target_file)  # Dados dos nodos
-    edges_df = pd.read_csv(edge_file)   # Dados das arestas
-
-    # Inicializar o grafo
-    G_nx = nx.Graph()
-
-    # Adicionar os nós com todas as características do ficheiro target
-    for _, row in nodes_df.iterrows():
-        G_nx.add_node(row['new_id'], **row.to_dict())
-
-    # Adicionar arestas ao grafo
-    for _, row in edges_df.iterrows():
-        G_nx.add_edge(row['from'], row['to'])
+    nodes_df = readTable(target_file)  # Dados dos nodos
+    G_nx = loadTwitchGraph(edge_file, nodes_df=nodes_df)
 
     print(f"Número de nós: {G_nx.number_of_nodes()}")
     print(f"Número de arestas: {G_nx.number_of_edges()}")
 
+    # CSR pré-calculado da versão binária (nós por id crescente; os resultados são alinhados por id);
+    # só é reconstruído se o grafo tiver nós sem arestas, que não estão no CSR guardado
+    G_csr = TwitchCSRGraph.from_edge_file(edge_file)
+    if G_csr.number_of_nodes() != G_nx.number_of_nodes():
+        G_csr = TwitchCSRGraph.from_edge_file(edge_file, node_ids=list(G_nx.nodes()))
+
+    # Cache das métricas mais caras (invalidada se os ficheiros de entrada ou os parâmetros mudarem)
+    cache = MetricCache(current_dir / country / 'cache', [edge_file, target_file], label=country, enabled=use_cache)
+
     # ==================== #
     # Cálculo de Métricas
     # ==================== #
     print("A calcular métricas...")
     start_metric = datetime.datetime.now()
-    degree_centrality = nx.degree_centrality(G_nx)
+    if backend == "csr":
+        degree_centrality = G_csr.to_dict(G_csr.degree_centrality())
+    else:
+        degree_centrality = nx.degree_centrality(G_nx)
     print(f"Métrica degree_centrality da região {country} demorou {datetime.datetime.now() - start_metric}")
 
     start_metric = datetime.datetime.now()
-    closeness_centrality = nx.closeness_centrality(G_nx)
+    if backend == "csr":
+        closeness_centrality = cache.get_or_compute(
+            'closeness_centrality', lambda: G_csr.to_dict(shortestPathSweep(G_csr, n_jobs=n_jobs)['closeness']))
+    else:
+        closeness_centrality = cache.get_or_compute('closeness_centrality', lambda: nx.closeness_centrality(G_nx))
     print(f"Métrica closeness_centrality da região {country} demorou {datetime.datetime.now() - start_metric}")
 
     start_metric = datetime.datetime.now()
-    betweenness_centrality = nx.betweenness_centrality(G_nx)
+    def computeBetweenness() -> dict:
+        if betweenness_k is None and betweenness_epsilon is None:
+            return nx.betweenness_centrality(G_nx)
+        # Betweenness aproximada por amostragem de pivôs (k fixo ou adaptativo até ao erro pedido)
+        betweenness_values, betweenness_info = approximateBetweenness(
+            G_csr, k=betweenness_k or 256, seed=betweenness_seed, epsilon=betweenness_epsilon)
+        print(f"Betweenness aproximada com {betweenness_info['pivots']} pivôs "
+              f"(erro padrão máximo estimado: {betweenness_info['std_error_max']:.2e})")
+        return G_csr.to_dict(betweenness_values)
+
+    betweenness_centrality = cache.get_or_compute('betweenness_centrality', computeBetweenness,
+                                                  k=betweenness_k, epsilon=betweenness_epsilon,
+                                                  seed=betweenness_seed)
     print(f"Métrica betweenness_centrality da região {country} demorou {datetime.datetime.now() - start_metric}")
 
     start_metric = datetime.datetime.now()
-    eigenvector_centrality = nx.eigenvector_centrality(G_nx)
-    print(f"Métrica eigenvector_centrality da região {country} demorou {datetime.datetime.now() - start_metric}")
+    if backend == "csr":
+        # PageRank e vetor próprio numa só iteração de potência (opcionalmente a partir da análise anterior)
+        def computePowerCentralities() -> dict:
+            analysis_file = current_dir / country / 'processed_data' / f"twitch_network_analysis_{country}.csv"
+            starts = loadWarmStart(analysis_file, G_csr.node_ids) if warm_start else {}
+            values, info = powerCentralities(G_csr, dtype=np.dtype(power_dtype), **starts)
+            reportPowerIteration(info, country)
+            return {name: G_csr.to_dict(vector) for name, vector in values.items()}
 
-    start_metric = datetime.datetime.now()
-    pagerank_centrality = nx.pagerank(G_nx)
-    print(f"Métrica pagerank_centrality da região {country} demorou {datetime.datetime.now() - start_metric}")
+        power = cache.get_or_compute('power_centralities', computePowerCentralities,
+                                     dtype=power_dtype, warm_start=warm_start)
+        eigenvector_centrality = power['eigenvector']
+        pagerank_centrality = power['pagerank']
+        print(f"Métricas eigenvector_centrality e pagerank_centrality da região {country} demoraram "
+              f"{datetime.datetime.now() - start_metric}")
+    else:
+        eigenvector_centrality = cache.get_or_compute('eigenvector_centrality',
+                                                      lambda: nx.eigenvector_centrality(G_nx))
+        print(f"Métrica eigenvector_centrality da região {country} demorou {datetime.datetime.now() - start_metric}")
+
+        start_metric = datetime.datetime.now()
+        pagerank_centrality = cache.get_or_compute('pagerank_centrality', lambda: nx.pagerank(G_nx))
+        print(f"Métrica pagerank_centrality da região {country} demorou {datetime.datetime.now() - start_metric}")
 
     start_metric = datetime.datetime.now()
-    clustering_coef = nx.clustering(G_nx)
+    if backend == "csr":
+        clustering_coef = G_csr.to_dict(G_csr.clustering())
+    else:
+        clustering_coef = nx.clustering(G_nx)
     print(f"Métrica clustering_coef da região {country} demorou {datetime.datetime.now() - start_metric}")
 
     start_metric = datetime.datetime.now()
-    avg_clustering = nx.average_clustering(G_nx)
+    if backend == "csr":
+        avg_clustering = G_csr.average_clustering()
+    else:
+        avg_clustering = nx.average_clustering(G_nx)
     print(f"Métrica avg_clustering da região {country} demorou {datetime.datetime.now() - start_metric}")
 
     # ==================== #
     # Deteção de Comunidades
     # ==================== #
     print("A detetar comunidades...")
-    try:
-        import community as community_louvain
-        louvain_communities = community_louvain.best_partition(G_nx)
-    except ImportError:
-        print("Biblioteca community-louvain não está instalada.")
-        louvain_communities = {}
+    # Leiden (e, no backend csr, Louvain) do igraph para cada resolução e semente; a resolução
+    # principal (1.0, ou a primeira da lista) dá a coluna community_leiden
+    start_metric = datetime.datetime.now()
+    resolutions = tuple(float(resolution) for resolution in resolutions)
+    main_resolution = 1.0 if 1.0 in resolutions else resolutions[0]
+    # No backend networkx o Louvain vem do python-louvain (ou do consenso), não do varrimento
+    algorithms = ALGORITHMS if backend == "csr" else ('leiden',)
+    communities = cache.get_or_compute('community_sweep',
+                                       lambda: communitySweep(G_csr, resolutions, community_seeds,
+                                                              algorithms=algorithms, n_jobs=n_jobs),
+                                       resolutions=resolutions, seeds=tuple(community_seeds), algorithms=algorithms)
+    sweep = communities['sweep']
+    for row in sweep[sweep['best_seed']].itertuples():
+        print(f"{row.algorithm} (resolução {row.resolution:g}): {row.communities} comunidades, "
+              f"modularidade {row.modularity:.4f} (com resolução 1: {row.modularity_1:.4f})")
+    leiden_communities = G_csr.to_dict(communities['partitions'][('leiden', main_resolution)])
+    # Partições das restantes resoluções, uma coluna por resolução
+    extra_communities = {f"community_leiden_{resolution:g}": G_csr.to_dict(communities['partitions'][('leiden', resolution)])
+                         for resolution in resolutions if resolution != main_resolution}
+    print(f"Deteção de comunidades (Leiden/Louvain) da região {country} demorou {datetime.datetime.now() - start_metric}")
+
+    louvain_stability = {}
+    if ensemble_runs > 0:
+        # Consenso de ensemble_runs execuções do Louvain (reprodutível), com estabilidade por nó
+        start_metric = datetime.datetime.now()
+        ensemble = cache.get_or_compute('louvain_ensemble',
+                                        lambda: ensemblePartition(G_csr, n_runs=ensemble_runs,
+                                                                  resolution=main_resolution, n_jobs=n_jobs),
+                                        n_runs=ensemble_runs, resolution=main_resolution)
+        reportEnsemble(ensemble, country)
+        louvain_communities = G_csr.to_dict(ensemble['membership'])
+        louvain_stability = G_csr.to_dict(ensemble['stability'])
+        print(f"Consenso do Louvain da região {country} demorou {datetime.datetime.now() - start_metric}")
+    elif backend == "csr":
+        louvain_communities = G_csr.to_dict(communities['partitions'][('louvain', main_resolution)])
+    else:
+        try:
+            import community as community_louvain
+            louvain_communities = cache.get_or_compute('louvain_community',
+                                                       lambda: community_louvain.best_partition(G_nx))
+        except ImportError:
+            print("Biblioteca community-louvain não está instalada.")
+            louvain_communities = {}
 
     lp_communities = nx.community.asyn_lpa_communities(G_nx, weight=None)
     lp_communities = {node: idx for idx, community in enumerate(lp_communities) for node in community}
@@ -112,6 +214,9 @@ def AnalyzeCountryNetwork(country: str, current_dir: pathlib.WindowsPath) -> Non
             'clustering_coef': clustering_coef.get(node_id, 0),
             'louvain_community': louvain_communities.get(node_id, -1),
             'lp_community': lp_communities.get(node_id, -1),
+            'community_leiden': leiden_communities.get(node_id, -1),
+            **({'louvain_stability': louvain_stability.get(node_id, np.nan)} if louvain_stability else {}),
+            **{column: values.get(node_id, -1) for column, values in extra_communities.items()},
             **attributes  # Adicionar todas as características originais dos nós
         })
 
@@ -121,8 +226,18 @@ def AnalyzeCountryNetwork(country: str, current_dir: pathlib.WindowsPath) -> Non
     # Guardar Resultados
     # ==================== #
     output_file = current_dir / country / 'processed_data' / f"twitch_network_analysis_{country}.csv"
-    df_metrics.to_csv(output_file, index=False)
+    writeTable(df_metrics, output_file)
+
+    # Modularidade e número de comunidades de cada execução (algoritmo, resolução, semente)
+    sweep_file = current_dir / country / 'processed_data' / f"twitch_community_sweep_{country}.csv"
+    sweep.to_csv(sweep_file, index=False)
+
+    # Registo dos ficheiros de entrada, usado pelo StudyAllCountries para saber se a análise está atualizada
+    meta = {'edge_file_sha256': fileHash(edge_file), 'target_file_sha256': fileHash(target_file)}
+    with open(output_file.with_suffix('.meta.json'), 'w') as f:
+        json.dump(meta, f, indent=2)
     print(f"Ficheiro CSV com análise guardado em: {output_file}")
+    cache.report()
     print(f"Tempo total: {datetime.datetime.now() - start_time}\n")
 
 
@@ -131,6 +246,18 @@ if __name__ == "__main__":
     current_dir = Path.cwd()
     # Lista de países a analisar
     countries = ["PTBR", "DE", "ENGB", "ES", "FR", "RU"]
-    # Analisar cada país na lista
-    for country in countries:
-        AnalyzeCountryNetwork(country, current_dir)
+    # Regiões analisadas em simultâneo (1 -> uma de cada vez, como no StudyAllCountries) e processos
+    # de cada região no varrimento BFS; no total correm até max_workers * n_jobs processos
+    max_workers = 1
+    n_jobs = 1
+    if max_workers == 1:
+        for country in countries:
+            AnalyzeCountryNetwork(country, current_dir, n_jobs=n_jobs)
+    else:
+        # Analisar as regiões em paralelo (da maior para a menor)
+        data_dir = current_dir
+        while data_dir.name != "Twitch":
+            data_dir = data_dir.parent
+        runRegions(AnalyzeCountryNetwork, countries, data_dir / "data", max_workers=max_workers,
+                   tqdm_kwargs=dict(desc=" Análise das Redes Twitch", ncols=100),
+                   func_kwargs=dict(current_dir=current_dir, n_jobs=n_jobs))
@@ -0,0 +1,226 @@
+import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from csrGraph import TwitchCSRGraph
+from twitchStorage import readTable, tableColumns
+
+# Estratégias de amostragem disponíveis em sampleNodes
+STRATEGIES = ('top_views', 'degree', 'community', 'random_walk')
+
+# Colunas de comunidades usadas pela estratégia 'community', por ordem de preferência
+COMMUNITY_COLUMNS = ('community_leiden', 'louvain_community')
+
+
+def topK(values: np.ndarray, k: int) -> np.ndarray:
+    """Posições dos k maiores valores, por ordem decrescente (argpartition + ordenação só dos k)."""
+    values = np.asarray(values)
+    k = min(k, len(values))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    top = np.argpartition(-values, k - 1)[:k]
+    return top[np.lexsort((top, -values[top]))]
+
+
+def topKNeighbourhood(graph: TwitchCSRGraph, values: np.ndarray, k: int, max_neighbours: int = None) -> np.ndarray:
+    """
+    Os k nós com maior valor e os seus vizinhos diretos (1-hop), com um só gather sobre o CSR.
+
+    Se houver mais de max_neighbours vizinhos, ficam os que têm mais ligações aos k nós
+    (empates pelo valor e depois pela posição).
+
+    Args:
+        graph (TwitchCSRGraph): Grafo da região
+        values (np.ndarray): Valor de cada nó, alinhado com o CSR (ex.: views)
+        k (int): Número de nós de topo
+        max_neighbours (int): Número máximo de vizinhos acrescentados (None -> todos)
+
+    Returns:
+        np.ndarray: Posições dos nós da amostra (primeiro os k de topo)
+    """
+    values = np.asarray(values, dtype=float)
+    top = topK(values, k)
+    in_top = np.zeros(graph.number_of_nodes(), dtype=bool)
+    in_top[top] = True
+
+    neighbours = graph.neighbors_of(top)
+    links = np.bincount(neighbours[~in_top[neighbours]], minlength=graph.number_of_nodes())
+    candidates = np.flatnonzero(links)
+    if max_neighbours is not None and len(candidates) > max_neighbours:
+        order = np.lexsort((candidates, -values[candidates], -links[candidates]))
+        candidates = candidates[order[:max_neighbours]]
+    return np.concatenate([top, np.sort(candidates)])
+
+
+def degreeWeightedSample(graph: TwitchCSRGraph, n: int, seed: int = 42) -> np.ndarray:
+    """n nós sem reposição, com probabilidade proporcional ao grau."""
+    degree = graph.degree().astype(float)
+    n = min(n, int((degree > 0).sum()))
+    rng = np.random.default_rng(seed)
+    return np.sort(rng.choice(len(degree), size=n, replace=False, p=degree / degree.sum()))
+
+
+def communityStratifiedSample(graph: TwitchCSRGraph, labels: np.ndarray, n: int, seed: int = 42,
+                              values: np.ndarray = None) -> np.ndarray:
+    """
+    Amostra estratificada por comunidade: cada comunidade recebe uma quota proporcional ao seu
+    tamanho (maiores restos), e dentro de cada comunidade ficam os nós com maior valor (se
+    `values` for dado) ou nós ao acaso.
+
+    Args:
+        graph (TwitchCSRGraph): Grafo da região
+        labels (np.ndarray): Comunidade de cada nó, alinhada com o CSR
+        n (int): Tamanho da amostra
+        seed (int): Semente
+        values (np.ndarray): Valor de cada nó para escolher dentro das comunidades
+
+    Returns:
+        np.ndarray: Posições dos nós da amostra
+    """
+    labels = np.asarray(labels)
+    total = len(labels)
+    n = min(n, total)
+    _, codes, sizes = np.unique(labels, return_inverse=True, return_counts=True)
+
+    quota = sizes * n / total
+    take = np.floor(quota).astype(np.int64)
+    remainder = n - take.sum()
+    take[np.argsort(-(quota - take), kind='stable')[:remainder]] += 1
+
+    # Ordem dentro de cada comunidade: valor decrescente ou aleatória
+    rng = np.random.default_rng(seed)
+    key = -np.asarray(values, dtype=float) if values is not None else rng.random(total)
+    order = np.lexsort((key, codes))
+    rank = np.empty(total, dtype=np.int64)
+    starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    rank[order] = np.arange(total) - np.repeat(starts, sizes)
+    return np.flatnonzero(rank < take[codes])
+
+
+def randomWalkSample(graph: TwitchCSRGraph, n: int, seed: int = 42, walkers: int = 32,
+                     restart: float = 0.15, start: np.ndarray = None, max_steps: int = 10000) -> np.ndarray:
+    """
+    Amostra por passeios aleatórios com reinício: `walkers` passeios avançam em simultâneo
+    (um passo de todos é um gather sobre o CSR) até serem visitados n nós distintos.
+
+    Args:
+        graph (TwitchCSRGraph): Grafo da região
+        n (int): Número de nós a visitar
+        seed (int): Semente
+        walkers (int): Número de passeios em paralelo
+        restart (float): Probabilidade de voltar ao nó de partida em cada passo
+        start (np.ndarray): Nós de partida (por omissão, os de maior grau)
+        max_steps (int): Número máximo de passos
+
+    Returns:
+        np.ndarray: Posições dos nós visitados (pela ordem da primeira visita)
+    """
+    rng = np.random.default_rng(seed)
+    degree = graph.degree()
+    n = min(n, graph.number_of_nodes())
+    if start is None:
+        start = topK(degree, walkers)
+    start = np.resize(np.asarray(start, dtype=np.int64), walkers)
+
+    visited = np.zeros(graph.number_of_nodes(), dtype=bool)
+    sample = []
+    current = start.copy()
+    for _ in range(max_steps):
+        fresh = current[~visited[current]]
+        _, first = np.unique(fresh, return_index=True)
+        new = fresh[np.sort(first)][:n - len(sample)]
+        visited[new] = True
+        sample.extend(new.tolist())
+        if len(sample) >= n:
+            break
+
+        # Um passo: vizinho ao acaso (ou reinício, também em nós sem vizinhos)
+        deg = degree[current]
+        jump = (rng.random(walkers) < restart) | (deg == 0)
+        step = graph.indptr[current] + (rng.random(walkers) * np.maximum(deg, 1)).astype(np.int64)
+        current = np.where(jump, start, graph.indices[np.minimum(step, len(graph.indices) - 1)])
+    return np.asarray(sample, dtype=np.int64)
+
+
+def communityLabels(analysis_path: Path, node_ids: np.ndarray) -> np.ndarray:
+    """
+    Comunidade de cada nó (alinhada com node_ids, -1 nos nós sem valor) a partir da tabela de
+    análise, na primeira coluna de COMMUNITY_COLUMNS que existir (tabelas geradas antes do Leiden
+    só têm louvain_community).
+
+    Returns:
+        np.ndarray: Comunidades, ou None se a tabela não tiver nenhuma dessas colunas
+    """
+    available = [column for column in COMMUNITY_COLUMNS if column in tableColumns(analysis_path)]
+    if not available:
+        print(f"{Path(analysis_path).name} não tem colunas de comunidades ({', '.join(COMMUNITY_COLUMNS)})")
+        return None
+    column = available[0]
+    if column != COMMUNITY_COLUMNS[0]:
+        print(f"{Path(analysis_path).name} não tem {COMMUNITY_COLUMNS[0]}; a usar {column}")
+    communities = readTable(analysis_path, columns=['node', column]).drop_duplicates('node', keep='last')
+    return communities.set_index('node')[column].reindex(node_ids).fillna(-1).to_numpy()
+
+
+def sampleNodes(graph: TwitchCSRGraph, strategy: str, n: int, seed: int = 42, values: np.ndarray = None,
+                labels: np.ndarray = None, k: int = None) -> np.ndarray:
+    """
+    Posições dos nós de uma amostra para visualização.
+
+    Args:
+        graph (TwitchCSRGraph): Grafo da região
+        strategy (str): 'top_views' (k de topo + vizinhos), 'degree', 'community' ou 'random_walk'
+        n (int): Tamanho da amostra
+        seed (int): Semente (as amostras são determinísticas)
+        values (np.ndarray): Valor de cada nó (ex.: views), para 'top_views' e 'community'
+        labels (np.ndarray): Comunidade de cada nó, para 'community'
+        k (int): Número de nós de topo em 'top_views' (os restantes n - k são vizinhos)
+
+    Returns:
+        np.ndarray: Posições dos nós da amostra
+    """
+    assert strategy in STRATEGIES
+    if strategy == 'top_views':
+        k = n if k is None else k
+        return topKNeighbourhood(graph, values, k, max_neighbours=n - k)
+    if strategy == 'degree':
+        return degreeWeightedSample(graph, n, seed)
+    if strategy == 'community':
+        return communityStratifiedSample(graph, labels, n, seed, values)
+    return randomWalkSample(graph, n, seed)
+
+
+def benchmarkSampling(current_dir: Path, country: str = "DE", percent: float = 15) -> pd.DataFrame:
+    """
+    Tempo de cada estratégia para uma amostra com o tamanho usado pelo seeGraph
+    (percent% dos nós de topo + até metade desse número de vizinhos).
+    """
+    while current_dir.name != "Twitch":
+        current_dir = current_dir.parent
+    data_dir = current_dir / "data" / country
+    graph = TwitchCSRGraph.from_edge_file(data_dir / f"musae_{country}_edges.csv")
+    analysis_path = data_dir / 'processed_data' / f"twitch_network_analysis_{country}.csv"
+    table = readTable(analysis_path, columns=['node', 'views'])
+    table = table.drop_duplicates('node', keep='last').set_index('node').reindex(graph.node_ids)
+    values = table['views'].fillna(0).to_numpy()
+    labels = communityLabels(analysis_path, graph.node_ids)
+
+    k = max(int(graph.number_of_nodes() * percent / 100), 300)
+    n = k + k // 2
+    results = []
+    for strategy in STRATEGIES:
+        if strategy == 'community' and labels is None:
+            print(f"{strategy}: ignorada (sem colunas de comunidades)")
+            continue
+        start = datetime.datetime.now()
+        sample = sampleNodes(graph, strategy, n, values=values, labels=labels, k=k)
+        elapsed = (datetime.datetime.now() - start).total_seconds()
+        results.append({'Strategy': strategy, 'Nodes': len(sample), 'Time (s)': elapsed})
+        print(f"{strategy}: {len(sample)} nós em {elapsed * 1000:.1f} ms")
+    return pd.DataFrame(results)
+
+
+if __name__ == "__main__":
+    print(benchmarkSampling(Path.cwd()).to_string(index=False))
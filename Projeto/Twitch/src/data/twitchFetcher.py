@@ -0,0 +1,332 @@
+import asyncio
+import os
+import random
+import time
+from datetime import datetime
+from pathlib import Path
+
+import aiohttp
+import pandas as pd
+
+# https://dev.twitch.tv/docs/api/reference/
+HELIX_URL = 'https://api.twitch.tv/helix'
+
+# Máximo de ids por pedido aceite pelos endpoints /users e /channels
+BATCH_SIZE = 100
+
+COLUMNS = ['id', 'username', 'created_at', 'profile_pic', 'broadcaster_type', 'game_name']
+
+
+class TokenBucket:
+    """
+    Limitador de pedidos (token bucket) partilhado pelos pedidos concorrentes.
+
+    Os tokens são repostos a `rate` por segundo até `capacity`; os cabeçalhos Ratelimit-Remaining
+    e Ratelimit-Reset das respostas da Twitch corrigem o estado local, e quando o servidor indica
+    que não restam pedidos, ninguém avança até ao instante de reset.
+    """
+
+    def __init__(self, rate: float = 800 / 60, capacity: int = 800):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.reset_at = 0.0  # Instante (time.time) até ao qual o servidor não aceita pedidos
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                wait_reset = self.reset_at - time.time()
+                if wait_reset > 0:
+                    await asyncio.sleep(wait_reset)
+                    self.tokens = float(self.capacity)
+                    self.updated = time.monotonic()
+                    self.reset_at = 0.0
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def update_from_headers(self, headers) -> None:
+        remaining = headers.get('Ratelimit-Remaining')
+        reset = headers.get('Ratelimit-Reset')
+        if remaining is None:
+            return
+        self._refill()
+        self.tokens = min(self.tokens, float(remaining))
+        if int(remaining) == 0 and reset is not None:
+            self.reset_at = float(reset)
+
+
+class CheckpointWriter:
+    """
+    Guarda os resultados parciais num CSV em modo append, escrevendo a cada `every` lotes,
+    para que uma execução interrompida possa ser retomada sem repetir os pedidos já feitos.
+    """
+
+    def __init__(self, path: Path, every: int = 10):
+        self.path = Path(path)
+        self.every = every
+        self._rows = []
+        self._batches = 0
+
+    def add(self, rows: list) -> None:
+        self._rows.extend(rows)
+        self._batches += 1
+        if self._batches >= self.every:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._rows:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        write_header = not self.path.exists() or self.path.stat().st_size == 0
+        with open(self.path, 'a', newline='', encoding='utf-8') as f:
+            pd.DataFrame(self._rows, columns=COLUMNS).to_csv(f, header=write_header, index=False)
+            f.flush()
+            os.fsync(f.fileno())
+        self._rows = []
+        self._batches = 0
+
+
+def loadCheckpoint(path: Path) -> pd.DataFrame:
+    """Lê os resultados parciais já guardados (vazio se não existirem)."""
+    path = Path(path)
+    if not path.exists() or path.stat().st_size == 0:
+        return pd.DataFrame(columns=COLUMNS)
+    return pd.read_csv(path).drop_duplicates('id', keep='last')
+
+
+def _parseUser(user_info: dict) -> dict:
+    created_at_raw = user_info.get('created_at', None)
+    if created_at_raw:
+        created_at = datetime.strptime(created_at_raw, '%Y-%m-%dT%H:%M:%SZ').date()
+    else:
+        created_at = None
+    return {
+        'username': user_info.get('display_name', None),
+        'created_at': created_at,
+        'profile_pic': user_info.get('profile_image_url', None),
+        'broadcaster_type': user_info.get('broadcaster_type', None),
+    }
+
+
+class TwitchHelixClient:
+    """
+    Cliente reutilizável da API Helix.
+
+    Usa uma única sessão aiohttp (ligações reaproveitadas com keep-alive), repete os pedidos
+    com resposta 429/5xx ou erro de ligação com backoff exponencial e jitter, guarda numa
+    dead-letter os ids cujos lotes falharam definitivamente (para uma nova passagem) e conta,
+    por endpoint, pedidos, erros, repetições e latência.
+
+    Uso:
+        async with TwitchHelixClient(client_id, oauth_token) as client:
+            df = await client.fetch_users(ids)
+            client.report()
+    """
+
+    RETRY_STATUS = {429, 500, 502, 503, 504}
+
+    def __init__(self, client_id: str, oauth_token: str, base_url: str = HELIX_URL,
+                 concurrency: int = 8, batch_size: int = BATCH_SIZE, bucket: TokenBucket = None,
+                 max_retries: int = 5, backoff_base: float = 0.5, backoff_max: float = 30.0,
+                 timeout: float = 30.0):
+        self.headers = {
+            'Client-ID': client_id,
+            'Authorization': f'Bearer {oauth_token}'
+        }
+        self.base_url = base_url
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.bucket = bucket or TokenBucket()
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self.session = None
+        self.dead_letter = []
+        self.stats = {}
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(limit=self.concurrency, keepalive_timeout=60)
+        self.session = aiohttp.ClientSession(headers=self.headers, connector=connector,
+                                             timeout=aiohttp.ClientTimeout(total=self.timeout))
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.session.close()
+
+    def _backoff(self, attempt: int) -> float:
+        # "Full jitter": espera aleatória entre 0 e o limite exponencial
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def _record(self, endpoint: str, latency: float, error: bool = False) -> None:
+        stats = self.stats.setdefault(endpoint, {'requests': 0, 'errors': 0, 'retries': 0,
+                                                 'latency_total': 0.0, 'latency_max': 0.0})
+        stats['requests'] += 1
+        stats['errors'] += int(error)
+        stats['latency_total'] += latency
+        stats['latency_max'] = max(stats['latency_max'], latency)
+
+    async def get_json(self, endpoint: str, params: list) -> dict:
+        """
+        GET {base_url}/{endpoint}, repetido até max_retries vezes em 429/5xx e erros de ligação.
+        Outros erros HTTP (ex.: 401) são lançados de imediato.
+        """
+        url = f'{self.base_url}/{endpoint}'
+        for attempt in range(self.max_retries + 1):
+            await self.bucket.acquire()
+            start = time.perf_counter()
+            try:
+                async with self.session.get(url, params=params) as response:
+                    self.bucket.update_from_headers(response.headers)
+                    if response.status in self.RETRY_STATUS:
+                        raise aiohttp.ClientResponseError(response.request_info, response.history,
+                                                          status=response.status, message=response.reason,
+                                                          headers=response.headers)
+                    response.raise_for_status()
+                    data = await response.json()
+            except aiohttp.ClientResponseError as err:
+                self._record(endpoint, time.perf_counter() - start, error=True)
+                if err.status not in self.RETRY_STATUS or attempt == self.max_retries:
+                    raise
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                self._record(endpoint, time.perf_counter() - start, error=True)
+                if attempt == self.max_retries:
+                    raise
+            else:
+                self._record(endpoint, time.perf_counter() - start)
+                return data
+
+            self.stats[endpoint]['retries'] += 1
+            await asyncio.sleep(self._backoff(attempt))
+
+    async def _fetchBatch(self, semaphore: asyncio.Semaphore, ids: list) -> list:
+        """Vai buscar /users e /channels para um lote de até 100 ids e junta os resultados por id."""
+        async with semaphore:
+            users = await self.get_json('users', [('id', str(i)) for i in ids])
+            channels = await self.get_json('channels', [('broadcaster_id', str(i)) for i in ids])
+
+        users_by_id = {int(user['id']): _parseUser(user) for user in users.get('data', [])}
+        games_by_id = {int(channel['broadcaster_id']): channel.get('game_name', None)
+                       for channel in channels.get('data', [])}
+
+        rows = []
+        for user_id in ids:
+            user = users_by_id.get(int(user_id), dict.fromkeys(['username', 'created_at', 'profile_pic',
+                                                                'broadcaster_type']))
+            rows.append({'id': user_id, **user, 'game_name': games_by_id.get(int(user_id), None)})
+        return rows
+
+    async def _runBatches(self, ids: list, checkpoint: CheckpointWriter = None) -> list:
+        semaphore = asyncio.Semaphore(self.concurrency)
+        batches = [ids[start:start + self.batch_size] for start in range(0, len(ids), self.batch_size)]
+        tasks = {asyncio.create_task(self._fetchBatch(semaphore, batch)): batch for batch in batches}
+
+        rows = []
+        try:
+            for task in asyncio.as_completed(tasks):
+                try:
+                    batch_rows = await task
+                except aiohttp.ClientResponseError as http_err:
+                    print(f"Erro HTTP ao fazer requisição: {http_err.status} {http_err.message}")
+                    continue
+                except (aiohttp.ClientError, asyncio.TimeoutError) as req_err:
+                    print(f"Erro ao fazer requisição: {req_err!r}")
+                    continue
+                rows.extend(batch_rows)
+                if checkpoint is not None:
+                    checkpoint.add(batch_rows)
+        finally:
+            # Mesmo que a execução seja interrompida, os lotes já concluídos ficam guardados
+            if checkpoint is not None:
+                checkpoint.flush()
+            for task in tasks:
+                task.cancel()
+
+        # Os lotes que falharam vão para a dead-letter
+        for task, batch in tasks.items():
+            if task.done() and not task.cancelled() and task.exception() is not None:
+                self.dead_letter.extend(batch)
+        return rows
+
+    async def fetch_users(self, ids: list, checkpoint: CheckpointWriter = None,
+                          retry_dead_letter: bool = True) -> pd.DataFrame:
+        """
+        Obtém os dados de utilizador e de canal de uma lista de ids, em lotes de `batch_size`
+        e com até `concurrency` lotes em simultâneo.
+
+        Args:
+            ids (list): Ids Twitch dos utilizadores
+            checkpoint (CheckpointWriter): Onde guardar os lotes concluídos (opcional)
+            retry_dead_letter (bool): Fazer uma segunda passagem pelos ids cujos lotes falharam
+
+        Returns:
+            DataFrame: Colunas id, username, created_at, profile_pic, broadcaster_type, game_name
+        """
+        rows = await self._runBatches(ids, checkpoint)
+        if retry_dead_letter and self.dead_letter:
+            retry_ids, self.dead_letter = self.dead_letter, []
+            print(f"A repetir {len(retry_ids)} ids que falharam")
+            rows.extend(await self._runBatches(retry_ids, checkpoint))
+        print(f"{len(rows)}/{len(ids)} utilizadores obtidos"
+              + (f" ({len(self.dead_letter)} na dead-letter)" if self.dead_letter else ""))
+        return pd.DataFrame(rows, columns=COLUMNS)
+
+    def report(self) -> None:
+        """Contadores por endpoint: pedidos, erros, repetições e latência média/máxima."""
+        for endpoint, stats in self.stats.items():
+            mean_ms = 1000 * stats['latency_total'] / max(stats['requests'], 1)
+            print(f"[helix] /{endpoint}: {stats['requests']} pedidos, {stats['errors']} erros, "
+                  f"{stats['retries']} repetições, latência média {mean_ms:.0f} ms, "
+                  f"máx {1000 * stats['latency_max']:.0f} ms")
+
+
+async def fetchTwitchUsers(ids: list, client_id: str, oauth_token: str, base_url: str = HELIX_URL,
+                           concurrency: int = 8, batch_size: int = BATCH_SIZE,
+                           bucket: TokenBucket = None, checkpoint: CheckpointWriter = None,
+                           **client_kwargs) -> tuple:
+    """
+    Obtém os dados de utilizador e de canal de uma lista de ids com um TwitchHelixClient
+    (ver TwitchHelixClient.fetch_users).
+
+    Os ids cujos lotes falharam mesmo depois da segunda passagem (a dead-letter do cliente)
+    são devolvidos, para uma nova execução mais tarde.
+
+    Args:
+        ids (list): Ids Twitch dos utilizadores
+        client_id (str): Client-ID da aplicação
+        oauth_token (str): Token OAuth
+        base_url (str): URL base da API (permite usar um servidor local de teste)
+        concurrency (int): Número máximo de lotes em curso
+        batch_size (int): Ids por pedido (máximo 100)
+        bucket (TokenBucket): Limitador de pedidos (por omissão, o limite padrão da Helix)
+        checkpoint (CheckpointWriter): Onde guardar os lotes concluídos (opcional)
+        **client_kwargs: Outros parâmetros do cliente (max_retries, backoff_base, ...)
+
+    Returns:
+        tuple: (DataFrame com as colunas id, username, created_at, profile_pic, broadcaster_type,
+                game_name; lista dos ids que falharam)
+    """
+    async with TwitchHelixClient(client_id, oauth_token, base_url=base_url, concurrency=concurrency,
+                                 batch_size=batch_size, bucket=bucket, **client_kwargs) as client:
+        df = await client.fetch_users(ids, checkpoint=checkpoint)
+        client.report()
+        failed_ids = list(client.dead_letter)
+    return df, failed_ids
+
+
+def fetchUsers(ids: list, client_id: str, oauth_token: str, **kwargs) -> tuple:
+    """
+    Versão síncrona de fetchTwitchUsers (para usar em scripts e notebooks sem event loop).
+    Devolve (DataFrame, ids que falharam).
+    """
+    return asyncio.run(fetchTwitchUsers(ids, client_id, oauth_token, **kwargs))
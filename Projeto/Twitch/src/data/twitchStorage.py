@@ -0,0 +1,111 @@
+from pathlib import Path
+
+import pandas as pd
+
+# O pyarrow é opcional: sem ele, as tabelas continuam a ser lidas e escritas só em CSV
+try:
+    import pyarrow  # noqa: F401
+    HAS_PARQUET = True
+except ImportError:
+    HAS_PARQUET = False
+
+# Tipos das colunas dos ficheiros processed_data (Raw_/Final_musae_*_target.csv e
+# twitch_network_analysis_*.csv); as colunas que não estão aqui mantêm o tipo inferido
+COLUMN_TYPES = {
+    'id': 'int64',
+    'new_id': 'int64',
+    'node': 'int64',
+    'days': 'int64',
+    'views': 'int64',
+    'degree': 'int64',
+    'louvain_community': 'int64',
+    'lp_community': 'int64',
+    'community_leiden': 'int64',
+    'mature': 'bool',
+    'partner': 'bool',
+    'is_leap': 'bool',
+    'broadcaster_type': 'category',
+    'game_name': 'category',
+    'created_at': 'date',
+}
+
+
+def applySchema(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Converte as colunas conhecidas para o tipo definido em COLUMN_TYPES (categorias para
+    broadcaster_type/game_name, booleanos para mature/partner, datas para created_at).
+    Colunas inteiras ou booleanas com valores em falta ficam no tipo original.
+    """
+    df = df.copy()
+    for column, dtype in COLUMN_TYPES.items():
+        if column not in df.columns:
+            continue
+        if dtype == 'date':
+            df[column] = pd.to_datetime(df[column], errors='coerce')
+        elif dtype == 'category':
+            df[column] = df[column].astype('category')
+        elif not df[column].isna().any():
+            df[column] = df[column].astype(dtype)
+    return df
+
+
+def parquetPath(csv_path: Path) -> Path:
+    """Ficheiro Parquet correspondente a um CSV de processed_data."""
+    return Path(csv_path).with_suffix('.parquet')
+
+
+def writeTable(df: pd.DataFrame, csv_path: Path) -> None:
+    """
+    Guarda uma tabela com o esquema tipado: o CSV (formato partilhado no repositório) e, se o
+    pyarrow estiver disponível, uma cópia Parquet ao lado, que é a que readTable usa.
+    """
+    csv_path = Path(csv_path)
+    df = applySchema(df)
+    df.to_csv(csv_path, index=False)
+    if HAS_PARQUET:
+        df.to_parquet(parquetPath(csv_path), index=False)
+
+
+def _parquetIsCurrent(csv_path: Path) -> bool:
+    # O Parquet só é usado se existir e não for mais antigo do que o CSV
+    parquet_path = parquetPath(csv_path)
+    return HAS_PARQUET and parquet_path.exists() and (
+        not csv_path.exists() or parquet_path.stat().st_mtime >= csv_path.stat().st_mtime)
+
+
+def readTable(csv_path: Path, columns: list = None) -> pd.DataFrame:
+    """
+    Lê uma tabela de processed_data já com o esquema tipado.
+
+    Lê o Parquet se existir e for mais recente do que o CSV; caso contrário lê o CSV e, com
+    pyarrow disponível, gera o Parquet para as leituras seguintes.
+
+    Args:
+        csv_path (Path): Caminho do ficheiro CSV
+        columns (list): Colunas a carregar (por omissão, todas)
+
+    Returns:
+        DataFrame: Tabela com os tipos de COLUMN_TYPES
+    """
+    csv_path = Path(csv_path)
+    parquet_path = parquetPath(csv_path)
+
+    if _parquetIsCurrent(csv_path):
+        return pd.read_parquet(parquet_path, columns=columns)
+
+    if not HAS_PARQUET:
+        return applySchema(pd.read_csv(csv_path, usecols=columns))
+
+    # Conversão feita uma única vez: lê o CSV completo e guarda o Parquet
+    df = applySchema(pd.read_csv(csv_path))
+    df.to_parquet(parquet_path, index=False)
+    return df[columns] if columns is not None else df
+
+
+def tableColumns(csv_path: Path) -> list:
+    """Nomes das colunas de uma tabela sem a ler (esquema do Parquet ou cabeçalho do CSV)."""
+    csv_path = Path(csv_path)
+    if _parquetIsCurrent(csv_path):
+        import pyarrow.parquet as pq
+        return pq.read_schema(parquetPath(csv_path)).names
+    return pd.read_csv(csv_path, nrows=0).columns.tolist()
@@ -1,3 +1,4 @@
+import sys
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
@@ -6,6 +7,10 @@ import numpy as np
 import powerlaw
 import matplotlib.patheffects as pe
 
+# Módulos partilhados em src/data
+sys.path.append(str(Path(__file__).resolve().parents[1] / 'data'))
+from twitchStorage import readTable
+
 
 def setup_style():
     """Configuração global do estilo dos gráficos"""
@@ -362,8 +367,8 @@ def count_null_usernames(countries, directory):
         file_path = f'{directory}/data/{country}/processed_data/Raw_musae_{country}_target.csv'
         
         try:
-            # Ler o ficheiro
-            df = pd.read_csv(file_path)
+            # Ler apenas a coluna necessária
+            df = readTable(file_path, columns=['username'])
             
             # Contar usernames nulos
             null_count = df['username'].isnull().sum()
@@ -1199,7 +1204,7 @@ if __name__ == "__main__":
     output_dir = current_dir / 'docs' / "Imagens"
 
     # Ler o ficheiro CSV
-    df = pd.read_csv(csv_path)
+    df = readTable(csv_path)
 
     # Configuração de estilo dos gráficos
     plt.style.use('dark_background')
@@ -1,3 +1,5 @@
+import datetime
+import sys
 from pathlib import Path
 import matplotlib.pyplot as plt
 import networkx as nx
@@ -5,70 +7,91 @@ import numpy as np
 import pandas as pd
 import seaborn as sns
 from matplotlib.offsetbox import OffsetImage, AnnotationBbox
-import requests
-from PIL import Image
-from io import BytesIO
-
-def seeGraph(current_dir, edgePath, targetPath, PercNodes, country):
-    # Ler os caminhos acima
-    nodos_df = pd.read_csv(targetPath)
-    arestas_df = pd.read_csv(edgePath)
-
-    # Criar grafo vazio
-    G = nx.Graph()
-
-    # Adicionar os nodos ao grafo com as visualizações de cada conta (relação entre tamanho do nodo e views)
-    for _, row in nodos_df.iterrows():
-        G.add_node(row['new_id'],
-                   views=row['views'],
-                   mature=row['mature'],
-                   broadcaster_type=row['broadcaster_type'],
-                   features=row.to_dict())  # Adiciona as características de cada nodo
-
-    # Adicionar as arestas ao grafo
-    for _, row in arestas_df.iterrows():
-        G.add_edge(row['from'], row['to'])
 
-    NumNodes = max(int(G.number_of_nodes() * (PercNodes / 100)), 300)
-
-    # Selecionar os nós baseado nas views (nós mais influentes)
-    node_views = [(node, G.nodes[node]['views']) for node in G.nodes()]
-    sorted_nodes = [node for node, views in sorted(node_views, key=lambda x: x[1], reverse=True)]
-    
-    # Criar subgrafo com os nós mais visualizados e seus vizinhos diretos
-    selected_nodes = sorted_nodes[:NumNodes]
-    neighbors = set()
-    for node in selected_nodes:
-        neighbors.update(G.neighbors(node))
-    
-    # Combinar os nós selecionados com alguns dos seus vizinhos
-    final_nodes = set(selected_nodes)
-    neighbor_list = list(neighbors - set(selected_nodes))
-    if neighbor_list:
-        additional_nodes = min(len(neighbor_list), NumNodes // 2)  # Adiciona até 50% mais nós
-        final_nodes.update(neighbor_list[:additional_nodes])
-    
-    subgrafo = G.subgraph(list(final_nodes))
+# Módulos partilhados em src/data
+sys.path.append(str(Path(__file__).resolve().parents[1] / 'data'))
+from graphLoader import loadTwitchGraph
+from csrGraph import TwitchCSRGraph
+from subgraphSampling import communityLabels, sampleNodes
+from twitchStorage import readTable
+from graphLayout import cachedLayout
+from imageCache import ImageCache, imageCacheDir
+
+# Cor de cada broadcaster_type (em minúsculas)
+BROADCASTER_COLORS = {
+    'partner': '#9146FF',          # Roxo Twitch
+    'affiliate': '#00A9FF',        # Azul claro
+    'account_deleted': '#E91916',  # Vermelho Twitch
+    'non_streamer': '#1FE5B6',     # Verde Twitch
+}
+
+
+def nodeStyleTable(subgrafo) -> pd.DataFrame:
+    """
+    Tabela com o estilo de cada nó do subgrafo, indexada pelo nó: posição na ordem de
+    subgrafo.nodes, views, tamanho (100 a 1600, pelas views normalizadas), cor (pelo
+    broadcaster_type) e forma ('s' para mature, 'o' para os restantes).
+    """
+    nodes = list(subgrafo.nodes)
+    attributes = subgrafo.nodes
+    views = np.array([attributes[n]['views'] for n in nodes], dtype=float)
+    span = views.max() - views.min()
+    sizes = (views - views.min()) / span if span > 0 else np.zeros(len(nodes))
+
+    broadcaster_type = pd.Series([attributes[n].get('broadcaster_type', '') for n in nodes], dtype=object)
+    mature = np.array([attributes[n]['mature'] == True for n in nodes], dtype=bool)
+
+    return pd.DataFrame({
+        'position': np.arange(len(nodes)),
+        'views': views,
+        'size': 100 + sizes * 1500,
+        'color': broadcaster_type.fillna('').str.lower().map(BROADCASTER_COLORS).fillna('#A9A9A9').to_numpy(),
+        'shape': np.where(mature, 's', 'o'),
+    }, index=pd.Index(nodes, name='node'))
+
+
+def seeGraph(current_dir, edgePath, targetPath, PercNodes, country, layout="force", image_cache=None,
+             sampling="top_views", seed=42):
+    # Ler os nodos e construir o grafo (cada nodo guarda as suas características, incluindo as views)
+    nodos_df = readTable(targetPath, columns=['new_id', 'views', 'mature', 'broadcaster_type',
+                                              'username', 'profile_pic'])
+    G = loadTwitchGraph(edgePath, nodes_df=nodos_df)
 
-    # Obter os valores de "views" para cada nodo no subgrafo
-    views = [subgrafo.nodes[n]['views'] for n in subgrafo.nodes]
+    NumNodes = max(int(G.number_of_nodes() * (PercNodes / 100)), 300)
 
-    # Definir o tamanho dos nós com base nas views (normalizando)
-    node_sizes = np.array(views)
-    node_sizes = (node_sizes - min(node_sizes)) / (max(node_sizes) - min(node_sizes))
-    node_sizes = 100 + (node_sizes * 1500)  # Escalar os tamanhos (mínimo de 50 e máximo de 1050)
+    # Amostra de nós sobre o CSR: por omissão, os NumNodes nós com mais views e até NumNodes // 2
+    # dos seus vizinhos diretos (ver subgraphSampling.STRATEGIES para as restantes estratégias)
+    G_csr = TwitchCSRGraph.from_edge_file(edgePath)
+    node_views = nodos_df.drop_duplicates('new_id').set_index('new_id')['views'].reindex(G_csr.node_ids)
+    labels = None
+    if sampling == 'community':
+        twitch_dir = Path(current_dir)
+        while twitch_dir.name != "Twitch":
+            twitch_dir = twitch_dir.parent
+        analysis_path = twitch_dir / 'data' / country / 'processed_data' / f"twitch_network_analysis_{country}.csv"
+        labels = communityLabels(analysis_path, G_csr.node_ids)
+        if labels is None:
+            raise ValueError(f"A amostragem 'community' precisa de uma coluna de comunidades em {analysis_path}")
+    sample = sampleNodes(G_csr, sampling, NumNodes + NumNodes // 2, seed=seed,
+                         values=node_views.fillna(0).to_numpy(), labels=labels, k=NumNodes)
+
+    subgrafo = G.subgraph(G_csr.node_ids[sample].tolist())
+
+    # Tabela de estilo (posição, views, tamanho, cor e forma de cada nó), construída uma só vez
+    style = nodeStyleTable(subgrafo)
 
     # Ajustar o layout da rede para centralizar os nós com mais views
-    pos = nx.spring_layout(subgrafo, k=1, iterations=50, seed=42)
+    # (posições guardadas em cache por subgrafo e parâmetros; layout='spring' usa o nx.spring_layout)
+    pos = cachedLayout(subgrafo, Path(edgePath).parent / 'cache' / 'layout', method=layout,
+                       k=1, iterations=50, seed=42)
     
     # Ajustar posições baseado nas views
-    weights = {node: subgrafo.nodes[node]['views'] for node in subgrafo.nodes()}
-    max_weight = max(weights.values())
+    max_weight = style['views'].max()
     
     # Normalizar pesos e ajustar posições
-    for node in pos:
+    for node, node_views in style['views'].items():
         # Calcular distância do centro baseado nas views (mais views = mais próximo do centro)
-        weight = weights[node] / max_weight
+        weight = node_views / max_weight
         x, y = pos[node]
         distance = np.sqrt(x**2 + y**2)
         if distance > 0:
@@ -80,82 +103,39 @@ def seeGraph(current_dir, edgePath, targetPath, PercNodes, country):
     plt.figure(figsize=(20, 20), dpi=300)
     plt.style.use("dark_background")  # Background escuro para maior contraste
 
-    # Definir a cor dos nós com base no broadcaster_type
-    broadcaster_colors = {
-        'partner': '#9146FF',      # Roxo Twitch
-        'affiliate': '#00A9FF',    # Azul claro
-        'account_Deleted': '#E91916',  # Vermelho Twitch
-        'non_Streamer': '#1FE5B6',   # Verde Twitch
-    }
-    
-    # Mapear as cores para cada nó baseado no broadcaster_type
-    node_colors = []
-    for n in subgrafo.nodes:
-        broadcaster_type = subgrafo.nodes[n]['features'].get('broadcaster_type', '')
-        # Converter para lowercase para evitar problemas de case
-        broadcaster_type = broadcaster_type.lower()
-        
-        if broadcaster_type == 'partner':
-            color = broadcaster_colors['partner']
-        elif broadcaster_type == 'affiliate':
-            color = broadcaster_colors['affiliate']
-        elif broadcaster_type == 'account_deleted':
-            color = broadcaster_colors['account_Deleted']
-        elif broadcaster_type == 'non_streamer':
-            color = broadcaster_colors['non_Streamer']
-            
-        node_colors.append(color)
-
-    # Separar os nós com base no valor de "mature"
-    mature_nodes = [n for n in subgrafo.nodes if subgrafo.nodes[n]['mature'] == True]
-    non_mature_nodes = [n for n in subgrafo.nodes if subgrafo.nodes[n]['mature'] == False]
-
-    # Definir os tamanhos dos nós
-    mature_node_sizes = [node_sizes[list(subgrafo.nodes).index(n)] for n in mature_nodes]
-    non_mature_node_sizes = [node_sizes[list(subgrafo.nodes).index(n)] for n in non_mature_nodes]
-
-    # Desenhar nós "mature" com formato de quadrado ('s')
-    nx.draw_networkx_nodes(subgrafo, pos,
-                           nodelist=mature_nodes,
-                           node_size=mature_node_sizes,
-                           node_color=[node_colors[list(subgrafo.nodes).index(n)] for n in mature_nodes],
-                           node_shape='s',  # Formato de quadrado
-                           edgecolors='white', linewidths=1.5,  # Borda branca
-                           alpha=0.9)
-
-    # Desenhar nós "non-mature" com formato de círculo (padrão: 'o')
-    nx.draw_networkx_nodes(subgrafo, pos,
-                           nodelist=non_mature_nodes,
-                           node_size=non_mature_node_sizes,
-                           node_color=[node_colors[list(subgrafo.nodes).index(n)] for n in non_mature_nodes],
-                           node_shape='o',  # Formato de círculo
-                           edgecolors='white', linewidths=1.5,  # Borda branca
-                           alpha=0.9)
+    # Desenhar nós "mature" com formato de quadrado ('s') e "non-mature" com formato de círculo ('o')
+    for shape in ('s', 'o'):
+        rows = style[style['shape'] == shape]
+        nx.draw_networkx_nodes(subgrafo, pos,
+                               nodelist=rows.index.tolist(),
+                               node_size=rows['size'].to_numpy(),
+                               node_color=rows['color'].tolist(),
+                               node_shape=shape,
+                               edgecolors='white', linewidths=1.5,  # Borda branca
+                               alpha=0.9)
 
     # Após desenhar os nós normais, adicionar imagens e labels para os top nós por views
-    node_views = [(node, G.nodes[node]['views']) for node in subgrafo.nodes()]
-    top_nodes = sorted(node_views, key=lambda x: x[1], reverse=True)[:3] # NumNodes para todos
+    top_nodes = list(style['views'].nlargest(3).items())  # NumNodes para todos
     
     # Criar dicionário de labels e imagens apenas para os top nós
     labels = {}
     label_pos = pos.copy()  # Criar cópia das posições para ajustar os labels
 
+    # Imagens de perfil a partir da cache local (descarregadas em paralelo só se ainda não existirem)
+    if image_cache is None:
+        image_cache = ImageCache(imageCacheDir(Path(current_dir)))
+    image_cache.prefetch(subgrafo.nodes[node]['profile_pic'] for node, _ in top_nodes)
+
     for node, _ in top_nodes:
-        username = subgrafo.nodes[node]['features']['username']
+        username = subgrafo.nodes[node]['username']
         views = subgrafo.nodes[node]['views']
-        profile_pic_url = subgrafo.nodes[node]['features']['profile_pic']
+        profile_pic_url = subgrafo.nodes[node]['profile_pic']
         
         # Adicionar a imagem como um nó circular
-        try:
-            # Baixar a imagem da URL
-            response = requests.get(profile_pic_url)
-            img = Image.open(BytesIO(response.content))
-            
-            # Converter para array numpy
-            img_array = np.asarray(img)
-            
-            # Criar e configurar a imagem
-            imagebox = OffsetImage(img_array, zoom=0.05)  # Ajuste o zoom conforme necessário
+        img_array = image_cache.get(profile_pic_url)
+        if img_array is not None:
+            # Criar e configurar a imagem (o mesmo tamanho final das imagens originais de 300px com zoom 0.05)
+            imagebox = OffsetImage(img_array, zoom=15 / img_array.shape[1])
             imagebox.image.axes = plt.gca()
             
             # Criar uma anotação com a imagem
@@ -167,15 +147,15 @@ def seeGraph(current_dir, edgePath, targetPath, PercNodes, country):
                                            edgecolor='white',
                                            alpha=0.8))
             plt.gca().add_artist(ab)
-        except Exception as e:
-            print(f"Não foi possível carregar a imagem para {username}: {str(e)}")
+        else:
+            print(f"Não foi possível carregar a imagem para {username}")
         
         # Adicionar o label com username e views
         labels[node] = f"{username}\n{views:,} views"
 
         # Ajustar posição do label para ficar abaixo da imagem
         x, y = pos[node]
-        node_size = node_sizes[list(subgrafo.nodes).index(node)]
+        node_size = style.at[node, 'size']
         offset = node_size / 800  # Ajuste este valor para controlar a distância
         label_pos[node] = (x, y - offset )  # Mover o label para baixo
     
@@ -243,6 +223,50 @@ def seeGraph(current_dir, edgePath, targetPath, PercNodes, country):
     # Mostrar o gráfico
     plt.show()
 
+def benchmarkNodeStyle(current_dir: Path, country: str = "DE", sizes: tuple = (500, 1000, 2000, 4000)) -> pd.DataFrame:
+    """
+    Compara o estilo dos nós com list.index (implementação anterior do seeGraph) com a
+    nodeStyleTable, em subgrafos com os `sizes` nós com mais views da região.
+
+    Returns:
+        DataFrame: Tempos (em segundos) por tamanho do subgrafo
+    """
+    while current_dir.name != "Twitch":
+        current_dir = current_dir.parent
+    edge_path = current_dir / 'data' / country / f"musae_{country}_edges.csv"
+    target_path = current_dir / 'data' / country / 'processed_data' / f"Final_musae_{country}_target.csv"
+    nodes_df = readTable(target_path, columns=['new_id', 'views', 'mature', 'broadcaster_type'])
+    G = loadTwitchGraph(edge_path, nodes_df=nodes_df)
+    by_views = nodes_df.sort_values('views', ascending=False)['new_id'].tolist()
+
+    results = []
+    for size in sizes:
+        subgrafo = G.subgraph(by_views[:size])
+
+        start = datetime.datetime.now()
+        node_sizes = np.array([subgrafo.nodes[n]['views'] for n in subgrafo.nodes], dtype=float)
+        node_colors = [BROADCASTER_COLORS.get(str(subgrafo.nodes[n].get('broadcaster_type', '')).lower(), '#A9A9A9')
+                       for n in subgrafo.nodes]
+        mature_nodes = [n for n in subgrafo.nodes if subgrafo.nodes[n]['mature'] == True]
+        non_mature_nodes = [n for n in subgrafo.nodes if subgrafo.nodes[n]['mature'] == False]
+        for nodelist in (mature_nodes, non_mature_nodes):
+            [node_sizes[list(subgrafo.nodes).index(n)] for n in nodelist]
+            [node_colors[list(subgrafo.nodes).index(n)] for n in nodelist]
+        list_time = (datetime.datetime.now() - start).total_seconds()
+
+        start = datetime.datetime.now()
+        style = nodeStyleTable(subgrafo)
+        for shape in ('s', 'o'):
+            rows = style[style['shape'] == shape]
+            rows['size'].to_numpy(), rows['color'].tolist()
+        table_time = (datetime.datetime.now() - start).total_seconds()
+
+        results.append({'Nodes': size, 'list.index (s)': list_time, 'table (s)': table_time,
+                        'Speedup': list_time / table_time if table_time > 0 else np.nan})
+        print(f"{size} nós: list.index {list_time:.3f}s | tabela {table_time:.4f}s")
+    return pd.DataFrame(results)
+
+
 if __name__ == "__main__":
     # ================= #
     current_dir = Path.cwd()
@@ -252,10 +276,11 @@ if __name__ == "__main__":
     countries = ["PTBR", "DE", "ENGB", "ES", "FR", "RU"]
     for country in countries:
         Filedges = "musae_" + country + "_edges.csv"
-        Filetarget = "musae_" + country + "_target.csv"
+        Filetarget = "Final_musae_" + country + "_target.csv"
 
         edgePath = current_dir / 'data' / country / Filedges
-        targetPath = current_dir / 'data' / country / Filetarget
+        # Target processado (com broadcaster_type, username e profile_pic, usados no desenho)
+        targetPath = current_dir / 'data' / country / 'processed_data' / Filetarget
 
         PercNodes = 15  # 40 -> 40% dos nodos da rede
 
@@ -0,0 +1,221 @@
+import hashlib
+import json
+import os
+import sys
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import matplotlib
+import pandas as pd
+
+# Módulos partilhados em src/data
+sys.path.append(str(Path(__file__).resolve().parents[1] / 'data'))
+from metricCache import fileHash
+from twitchStorage import readTable, tableColumns
+
+# Ficheiro (dentro da pasta de imagens) com o registo de cada figura já gerada
+STAMPS_FILE = '.render_stamps.json'
+
+# Funções do TwitchGraphs que podem ser pedidas num manifesto (uma figura por região e coluna)
+RENDERERS = ('plot_histogram', 'plot_pie_chart', 'detect_power_law', 'plot_community_distribution',
+             'plot_circular_distribution')
+
+# Colunas usadas por cada função além de 'column' e 'community_column' (verificadas antes de gerar)
+RENDERER_COLUMNS = {'plot_circular_distribution': ('normalized_day', 'day_of_year')}
+
+# Tabelas já lidas em cada processo (várias figuras da mesma região leem a tabela uma só vez)
+_tables = {}
+# Ficheiros gravados pela figura em curso (registados por Figure.savefig no processo do pool)
+_saved = []
+
+
+def defaultManifest(countries: list = None) -> list:
+    """
+    Figuras do TwitchGraphs.__main__ (histogramas, gráficos circulares e leis de potência) por região.
+
+    Todas as figuras são geradas a partir da tabela de análise da região,
+    data/{country}/processed_data/twitch_network_analysis_{country}.csv (a que o
+    AnalyzeCountryNetwork escreve), e não do twitch_network_metrics_{country}.csv lido no
+    TwitchGraphs.__main__. Figuras cujas colunas ainda não existem na tabela (ex.:
+    community_leiden em análises anteriores ao Leiden) são ignoradas pelo renderBatch.
+    """
+    if countries is None:
+        countries = ["PTBR", "DE", "ENGB", "ES", "FR", "RU"]
+
+    histograms = {'degree': 'blue', 'degree_centrality': 'blue', 'closeness_centrality': 'green',
+                  'betweenness_centrality': 'purple', 'eigenvector_centrality': 'red', 'views': 'orange',
+                  'days': 'teal', 'clustering_coef': 'pink'}
+    jobs = []
+    for country in countries:
+        jobs += [{'function': 'plot_histogram', 'country': country, 'column': column, 'color': color}
+                 for column, color in histograms.items()]
+        jobs += [{'function': 'plot_pie_chart', 'country': country, 'column': column}
+                 for column in ('community_leiden', 'partner', 'mature')]
+        jobs.append({'function': 'detect_power_law', 'country': country, 'column': 'degree'})
+        jobs += [{'function': 'plot_community_distribution', 'country': country, 'column': column,
+                  'community_column': 'louvain_community'} for column in ('mature', 'partner')]
+    return jobs
+
+
+def loadManifest(path: Path) -> list:
+    """Lê um manifesto JSON: lista de {'function', 'country', 'column' (opcional), outros argumentos}."""
+    with open(path) as f:
+        jobs = json.load(f)
+    for job in jobs:
+        if job.get('function') not in RENDERERS:
+            raise ValueError(f"Função desconhecida no manifesto: {job.get('function')}")
+    return jobs
+
+
+def requiredColumns(job: dict) -> list:
+    """Colunas da tabela de análise de que uma figura precisa."""
+    columns = [job[key] for key in ('column', 'community_column') if key in job]
+    return columns + list(RENDERER_COLUMNS.get(job['function'], ()))
+
+
+def jobKey(job: dict) -> str:
+    """Identificador legível de uma figura (função, região, coluna e restantes argumentos)."""
+    return json.dumps(job, sort_keys=True)
+
+
+def _initWorker() -> None:
+    # Backend sem janelas: plt.show() não bloqueia nem abre janelas
+    matplotlib.use('Agg')
+    warnings.filterwarnings('ignore', message='.*non-interactive.*')
+
+    from matplotlib.figure import Figure
+    savefig = Figure.savefig
+
+    def recordingSavefig(self, fname, *args, **kwargs):
+        _saved.append(Path(fname).resolve())
+        return savefig(self, fname, *args, **kwargs)
+
+    Figure.savefig = recordingSavefig
+
+    import TwitchGraphs
+    TwitchGraphs.setup_style()
+
+
+def _renderJob(job: dict, table_path: str, output_dir: str) -> dict:
+    """Gera uma figura num processo do pool e devolve os ficheiros criados/alterados."""
+    import matplotlib.pyplot as plt
+    import TwitchGraphs
+
+    output_dir = Path(output_dir).resolve()
+    start = time.time()
+    _saved.clear()
+    try:
+        if table_path not in _tables:
+            _tables[table_path] = readTable(table_path)
+        df = _tables[table_path]
+
+        options = {key: value for key, value in job.items() if key not in ('function', 'country', 'column')}
+        if 'column' in job:
+            options['column_name'] = job['column']
+        getattr(TwitchGraphs, job['function'])(df, country=job['country'], output_dir=output_dir, **options)
+        status, error = 'rendered', None
+    except Exception as e:
+        status, error = 'failed', f"{type(e).__name__}: {e}"
+    finally:
+        # Fechar todas as figuras (as funções do TwitchGraphs não as fecham depois do show)
+        plt.close('all')
+
+    outputs = sorted({str(path.relative_to(output_dir)) for path in _saved if path.is_relative_to(output_dir)})
+    return {'status': status, 'error': error, 'seconds': time.time() - start, 'outputs': outputs}
+
+
+def renderBatch(jobs: list, data_dir: Path, output_dir: Path, max_workers: int = None,
+                force: bool = False) -> pd.DataFrame:
+    """
+    Gera as figuras do manifesto em processos separados, com o backend Agg.
+
+    Cada figura tem um registo (hash da tabela de análise da região, do código do TwitchGraphs
+    e dos argumentos da figura) guardado em output_dir/.render_stamps.json; figuras cujo
+    registo não mudou e cujos ficheiros ainda existem não são geradas de novo. Figuras que
+    precisam de colunas que a tabela não tem também não são geradas (ficam 'skipped', com o
+    motivo em 'reason').
+
+    Args:
+        jobs (list): Manifesto (ver defaultManifest/loadManifest)
+        data_dir (Path): Diretório "data"
+        output_dir (Path): Pasta base das imagens (ex.: docs/Imagens)
+        max_workers (int): Número de processos (por omissão, os CPUs disponíveis)
+        force (bool): Gerar todas as figuras, mesmo as que estão atualizadas
+
+    Returns:
+        DataFrame: Estado ('rendered', 'skipped' ou 'failed'), motivo e tempo de cada figura
+    """
+    data_dir, output_dir = Path(data_dir), Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    stamps_path = output_dir / STAMPS_FILE
+    stamps = json.loads(stamps_path.read_text()) if stamps_path.exists() else {}
+
+    code_hash = fileHash(Path(__file__).resolve().parent / 'TwitchGraphs.py')
+    table_paths, table_hashes, table_columns = {}, {}, {}
+    for country in {job['country'] for job in jobs}:
+        table_paths[country] = data_dir / country / 'processed_data' / f"twitch_network_analysis_{country}.csv"
+        exists = table_paths[country].exists()
+        table_hashes[country] = fileHash(table_paths[country]) if exists else None
+        table_columns[country] = set(tableColumns(table_paths[country])) if exists else set()
+
+    results = []
+    pending = {}
+    for job in jobs:
+        key = jobKey(job)
+        stamp = hashlib.sha256(f"{table_hashes[job['country']]}|{code_hash}|{key}".encode()).hexdigest()
+        previous = stamps.get(key)
+        missing = [column for column in requiredColumns(job) if column not in table_columns[job['country']]]
+        if table_hashes[job['country']] is None:
+            results.append({'job': key, 'status': 'failed', 'seconds': 0.0, 'reason': None,
+                            'error': f"{table_paths[job['country']].name} não existe"})
+        elif missing:
+            results.append({'job': key, 'status': 'skipped', 'seconds': 0.0, 'error': None,
+                            'reason': f"coluna em falta: {', '.join(missing)}"})
+        elif (not force and previous is not None and previous['stamp'] == stamp and previous['outputs']
+                and all((output_dir / output).exists() for output in previous['outputs'])):
+            results.append({'job': key, 'status': 'skipped', 'seconds': 0.0, 'error': None, 'reason': 'atualizada'})
+        else:
+            pending[key] = (job, stamp)
+
+    # Figuras da mesma região seguidas, para aproveitar a tabela já lida em cada processo
+    order = sorted(pending, key=lambda key: pending[key][0]['country'])
+    if order:
+        with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count(), initializer=_initWorker) as executor:
+            futures = {executor.submit(_renderJob, pending[key][0], str(table_paths[pending[key][0]['country']]),
+                                       str(output_dir)): key for key in order}
+            for future in as_completed(futures):
+                key = futures[future]
+                result = future.result()
+                if result['status'] == 'rendered':
+                    stamps[key] = {'stamp': pending[key][1], 'outputs': result['outputs']}
+                else:
+                    stamps.pop(key, None)
+                results.append({'job': key, 'status': result['status'], 'seconds': result['seconds'],
+                                'error': result['error'], 'reason': None})
+
+        tmp_path = stamps_path.with_suffix('.tmp')
+        tmp_path.write_text(json.dumps(stamps, indent=2, sort_keys=True))
+        os.replace(tmp_path, stamps_path)
+
+    report = pd.DataFrame(results, columns=['job', 'status', 'reason', 'seconds', 'error'])
+    counts = report['status'].value_counts()
+    up_to_date = int((report['reason'] == 'atualizada').sum())
+    print(f"Figuras: {counts.get('rendered', 0)} geradas, {up_to_date} atualizadas, "
+          f"{counts.get('skipped', 0) - up_to_date} sem colunas, {counts.get('failed', 0)} com erro")
+    for row in report[(report['status'] == 'skipped') & (report['reason'] != 'atualizada')].itertuples():
+        print(f"  {row.job}: {row.reason}")
+    for row in report[report['status'] == 'failed'].itertuples():
+        print(f"  {row.job}: {row.error}")
+    return report
+
+
+if __name__ == "__main__":
+    current_dir = Path.cwd()
+    while current_dir.name != "Twitch":
+        current_dir = current_dir.parent
+
+    # Manifesto opcional passado na linha de comandos; por omissão, as figuras do TwitchGraphs
+    manifest = loadManifest(Path(sys.argv[1])) if len(sys.argv) > 1 else defaultManifest()
+    renderBatch(manifest, current_dir / 'data', current_dir / 'docs' / 'Imagens')
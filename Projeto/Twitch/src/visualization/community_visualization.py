@@ -1,11 +1,19 @@
+import sys
 import networkx as nx
 import pandas as pd
 import matplotlib.pyplot as plt
 from pathlib import Path
 import pathlib
 
+# Módulos partilhados em src/data
+sys.path.append(str(Path(__file__).resolve().parents[1] / 'data'))
+from graphLoader import loadTwitchGraph
+from twitchStorage import readTable
+from graphLayout import cachedLayout
 
-def getCommunities(country:str, filter_mature:bool = False, filter_partner:bool = False, current_dir:pathlib.WindowsPath = Path.cwd()):
+
+def getCommunities(country:str, filter_mature:bool = False, filter_partner:bool = False, current_dir:pathlib.WindowsPath = Path.cwd(),
+                   layout:str = "force", chunksize:int = None):
 
     countries = ["PTBR", "DE", "ENGB", "ES", "FR", "RU"]
 
@@ -18,8 +26,8 @@ def getCommunities(country:str, filter_mature:bool = False, filter_partner:bool
     # Caminho do CSV com as comunidades
     community_csv_path = current_dir / 'data' / country / f"twitch_network_metrics_{country}.csv"
 
-    # Ler o CSV
-    df_communities = pd.read_csv(community_csv_path)
+    # Ler apenas as colunas usadas (comunidade e filtros)
+    df_communities = readTable(community_csv_path, columns=['node', 'community_leiden', 'mature', 'partner'])
 
     # Aplicar filtros, se necessário
     if filter_mature:
@@ -27,21 +35,14 @@ def getCommunities(country:str, filter_mature:bool = False, filter_partner:bool
     if filter_partner:
         df_communities = df_communities[df_communities['partner'] == True]
 
-    # Criar um grafo vazio
-    G = nx.Graph()
-
-    # Adicionar os nodos ao grafo
-    for index, row in df_communities.iterrows():
-        G.add_node(row['node'], community=row['community_leiden'])
-
     # Adicionar as arestas a partir do CSV original (caso tenha um CSV de arestas)
-    edgePath = current_dir / country / f"musae_{country}_edges.csv"
-    arestas_df = pd.read_csv(edgePath)
+    edgePath = current_dir / 'data' / country / f"musae_{country}_edges.csv"
 
-    # Adicionar as arestas apenas entre nós que passaram nos filtros
-    for _, row in arestas_df.iterrows():
-        if row['from'] in G.nodes and row['to'] in G.nodes:
-            G.add_edge(row['from'], row['to'])
+    # Criar o grafo apenas com os nós que passaram nos filtros e as arestas entre eles
+    # (com chunksize, as arestas são filtradas por blocos, sem carregar o ficheiro todo)
+    nodes_df = df_communities[['node', 'community_leiden']].rename(columns={'community_leiden': 'community'})
+    G = loadTwitchGraph(edgePath, nodes_df=nodes_df, node_col='node',
+                        attributes=['community'], restrict_to_nodes=True, chunksize=chunksize)
 
     # Calcular a centralidade de grau para filtrar os nós
     degree_centrality = nx.degree_centrality(G)
@@ -60,7 +61,9 @@ def getCommunities(country:str, filter_mature:bool = False, filter_partner:bool
     colors = [G_filtered.nodes[node]['community'] for node in G_filtered.nodes]
 
     # Calcular posições dos nós
-    pos = nx.spring_layout(G_filtered, seed=42, k=0.7)  # Aumente k para maior dispersão
+    # Aumente k para maior dispersão (posições guardadas em cache por subgrafo e parâmetros)
+    pos = cachedLayout(G_filtered, current_dir / 'data' / country / 'cache' / 'layout', method=layout,
+                       k=0.7, seed=42)
 
     # Ajustar o tamanho da figura e a qualidade da visualização
     plt.figure(figsize=(20, 20), dpi=300)
@@ -8,6 +8,57 @@ from scipy.stats import f_oneway
 from scipy.stats import chi2_contingency
 import matplotlib.patheffects as pe
 import powerlaw
+import sys
+import datetime
+
+# Módulos partilhados em src/data
+sys.path.append(str(Path(__file__).resolve().parents[1] / 'data'))
+from twitchStorage import readTable
+
+def eta_correlations(df, categorical_cols, numeric_cols):
+    """
+    Razão de correlação ETA para todos os pares (categórica, numérica).
+    
+    Para cada variável categórica, todas as numéricas são tratadas de uma vez com um groupby:
+    a soma de quadrados entre grupos vem das contagens e médias de cada categoria,
+    sum(n_g * (média_g - média)^2), e a total de sum((x - média)^2). Os valores em falta são
+    ignorados par a par, como em dropna sobre as duas colunas.
+    
+    Args:
+        df (DataFrame): DataFrame com os dados
+        categorical_cols (list): Variáveis categóricas
+        numeric_cols (list): Variáveis numéricas
+    
+    Returns:
+        dict: {(categórica, numérica): eta}
+    """
+    eta = {}
+    numeric = df[list(numeric_cols)].astype(float)
+    for cat_col in categorical_cols:
+        try:
+            labels = df[cat_col]
+            valid = labels.notna().to_numpy()
+            if not valid.any():
+                continue
+            values = numeric[valid]
+            
+            groups = values.groupby(labels[valid], observed=True)
+            counts = groups.count()
+            means = groups.mean()
+            grand_mean = values.mean()
+            
+            between = (counts * (means - grand_mean) ** 2).sum()
+            total = ((values - grand_mean) ** 2).sum()
+            # Precisa de mais de uma categoria com valores válidos
+            categories = (counts > 0).sum()
+            
+            for num_col in numeric_cols:
+                if categories[num_col] > 1 and total[num_col] > 0:
+                    eta[(cat_col, num_col)] = np.sqrt(between[num_col] / total[num_col])
+        except Exception as e:
+            print(f"Erro no cálculo ETA para {cat_col}: {str(e)}")
+            continue
+    return eta
 
 def calculate_correlations(df, country, output_dir):
     """
@@ -37,37 +88,7 @@ def calculate_correlations(df, country, output_dir):
     correlations['spearman'] = df[numeric_cols].corr(method='spearman')
     
     # 3. Correlação ETA (entre variáveis categóricas e numéricas)
-    for cat_col in categorical_cols:
-        for num_col in numeric_cols:
-            try:
-                # Verificar se há valores válidos
-                if df[cat_col].isna().all() or df[num_col].isna().all():
-                    continue
-                    
-                # Remover valores NA
-                valid_data = df[[cat_col, num_col]].dropna()
-                if len(valid_data) == 0:
-                    continue
-                
-                categories = valid_data[cat_col].unique()
-                if len(categories) <= 1:  # Precisa ter mais de uma categoria
-                    continue
-                
-                # Calcular ETA
-                categories_means = valid_data.groupby(cat_col, observed=True)[num_col].mean()
-                grand_mean = valid_data[num_col].mean()
-                
-                numerator = sum(len(valid_data[valid_data[cat_col] == cat]) * 
-                              (categories_means[cat] - grand_mean)**2 
-                              for cat in categories)
-                denominator = sum((valid_data[num_col] - grand_mean)**2)
-                
-                if denominator > 0:
-                    eta = np.sqrt(numerator/denominator)
-                    correlations['eta'][(cat_col, num_col)] = eta
-            except Exception as e:
-                print(f"Erro no cálculo ETA para {cat_col} e {num_col}: {str(e)}")
-                continue
+    correlations['eta'] = eta_correlations(df, categorical_cols, numeric_cols)
     
     # 5. V de Cramér e Coeficiente de Contingência de Pearson
     for cat1 in categorical_cols:
@@ -413,6 +434,51 @@ def plot_correlations(correlations, country, output_dir):
         plt.close()
 
 
+def benchmark_eta(current_dir, country="DE"):
+    """
+    Compara o cálculo ETA anterior (um filtro por categoria, para cada par) com o
+    eta_correlations, na tabela de análise completa da região.
+    
+    Returns:
+        DataFrame: Tempo (em segundos) e maior diferença absoluta por variável categórica
+    """
+    while current_dir.name != "Twitch":
+        current_dir = current_dir.parent
+    df = readTable(current_dir / 'data' / country / 'processed_data' / f"twitch_network_analysis_{country}.csv")
+    numeric_cols = df.select_dtypes(include=['int64', 'float64']).columns
+    categorical_cols = df.select_dtypes(include=['object', 'bool', 'category']).columns
+    
+    results = []
+    for cat_col in categorical_cols:
+        start = datetime.datetime.now()
+        loop_eta = {}
+        for num_col in numeric_cols:
+            valid_data = df[[cat_col, num_col]].dropna()
+            categories = valid_data[cat_col].unique()
+            if len(categories) <= 1:
+                continue
+            categories_means = valid_data.groupby(cat_col, observed=True)[num_col].mean()
+            grand_mean = valid_data[num_col].mean()
+            numerator = sum(len(valid_data[valid_data[cat_col] == cat]) *
+                            (categories_means[cat] - grand_mean)**2
+                            for cat in categories)
+            denominator = sum((valid_data[num_col] - grand_mean)**2)
+            if denominator > 0:
+                loop_eta[num_col] = np.sqrt(numerator/denominator)
+        loop_time = (datetime.datetime.now() - start).total_seconds()
+        
+        start = datetime.datetime.now()
+        grouped_eta = eta_correlations(df, [cat_col], numeric_cols)
+        grouped_time = (datetime.datetime.now() - start).total_seconds()
+        
+        error = max((abs(grouped_eta[(cat_col, num_col)] - value) for num_col, value in loop_eta.items()), default=0.0)
+        results.append({'Categorical': cat_col, 'Categories': df[cat_col].nunique(),
+                        'Loop (s)': loop_time, 'Groupby (s)': grouped_time,
+                        'Pairs': len(grouped_eta), 'Max diff': error})
+        print(f"{cat_col}: ciclo {loop_time:.3f}s | groupby {grouped_time:.4f}s | diferença máx. {error:.2e}")
+    return pd.DataFrame(results)
+
+
 # Exemplo de uso
 if __name__ == "__main__":
     # Configurar diretórios
@@ -425,7 +491,7 @@ if __name__ == "__main__":
     output_dir.mkdir(exist_ok=True)
     
     # Ler dados
-    df = pd.read_csv(csv_path)
+    df = readTable(csv_path)
     
     # Calcular correlações
     correlations = calculate_correlations(df, country, output_dir)
\ No newline at end of file
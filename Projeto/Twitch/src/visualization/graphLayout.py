@@ -0,0 +1,211 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import networkx as nx
+import numpy as np
+
+# Métodos de layout: 'spring' (nx.spring_layout) ou 'force' (Fruchterman-Reingold vetorizado, abaixo)
+LAYOUTS = ('spring', 'force')
+
+# Até este número de nós, a repulsão do 'force' é calculada exatamente entre todos os pares
+EXACT_LIMIT = 1000
+
+
+def _exactRepulsion(pos: np.ndarray, k2: float, block_size: int = 1024) -> np.ndarray:
+    """Repulsão k²/d entre todos os pares de nós, por blocos de linhas."""
+    force = np.zeros_like(pos)
+    for start in range(0, len(pos), block_size):
+        delta = pos[start:start + block_size, None, :] - pos[None, :, :]
+        d2 = np.maximum((delta ** 2).sum(axis=2), 1e-4)
+        force[start:start + block_size] = (delta * (k2 / d2)[:, :, None]).sum(axis=1)
+    return force
+
+
+def _cellLookup(keys: np.ndarray, cell_keys: np.ndarray) -> tuple:
+    """Posição de cada chave em cell_keys (ordenado) e se a célula existe."""
+    where = np.minimum(np.searchsorted(cell_keys, keys), len(cell_keys) - 1)
+    return where, cell_keys[where] == keys
+
+
+def _barnesHutRepulsion(pos: np.ndarray, k2: float, max_near: int = 32, max_level: int = 16) -> np.ndarray:
+    """
+    Repulsão aproximada à Barnes-Hut, com uma hierarquia de grelhas (quadtree) 2^l x 2^l:
+    em cada nível, cada nó interage com o centro de massa das células filhas das vizinhas da
+    sua célula-mãe que não são vizinhas da sua célula (a "lista de interação"); no nível mais fino,
+    os nós das células vizinhas (3x3) interagem exatamente. O nível mais fino é o primeiro em
+    que cada nó tem, em média, no máximo max_near vizinhos próximos.
+    """
+    n = len(pos)
+    low = pos.min(axis=0)
+    span = float((pos.max(axis=0) - low).max()) or 1.0
+    unit = (pos - low) / span
+    offsets = np.array([(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1)])
+
+    def cells(level: int) -> tuple:
+        G = 1 << level
+        cxy = np.minimum((unit * G).astype(np.int64), G - 1)
+        key = cxy[:, 0] * G + cxy[:, 1]
+        cell_keys, inverse, mass = np.unique(key, return_inverse=True, return_counts=True)
+        return G, cxy, cell_keys, inverse, mass
+
+    def neighbourhood(G: int, cxy: np.ndarray, cell_keys: np.ndarray, mass: np.ndarray) -> tuple:
+        x = cxy[:, 0, None] + offsets[None, :, 0]
+        y = cxy[:, 1, None] + offsets[None, :, 1]
+        valid = (x >= 0) & (x < G) & (y >= 0) & (y < G)
+        where, found = _cellLookup(np.where(valid, x * G + y, -1), cell_keys)
+        return where, valid & found
+
+    # Nível mais fino: o primeiro com poucos pares próximos
+    level = 2
+    while True:
+        G, cxy, cell_keys, inverse, mass = cells(level)
+        where, present = neighbourhood(G, cxy, cell_keys, mass)
+        if (mass[where] * present).sum() <= max_near * n or level >= max_level:
+            break
+        level += 1
+
+    force = np.zeros_like(pos)
+
+    # Campo distante, nível a nível
+    children = np.array([(2 * dx + a, 2 * dy + b) for dx, dy in offsets for a in (0, 1) for b in (0, 1)])
+    for l in range(2, level + 1):
+        G_l, cxy_l, keys_l, inverse_l, mass_l = cells(l)
+        centroid = np.column_stack([np.bincount(inverse_l, weights=pos[:, axis]) for axis in range(2)]) / mass_l[:, None]
+        parent = cxy_l // 2
+        x = 2 * parent[:, 0, None] + children[None, :, 0]
+        y = 2 * parent[:, 1, None] + children[None, :, 1]
+        separated = (np.abs(x - cxy_l[:, 0, None]) > 1) | (np.abs(y - cxy_l[:, 1, None]) > 1)
+        valid = separated & (x >= 0) & (x < G_l) & (y >= 0) & (y < G_l)
+        cell, found = _cellLookup(np.where(valid, x * G_l + y, -1), keys_l)
+        weight = np.where(valid & found, mass_l[cell], 0)
+        delta = pos[:, None, :] - centroid[cell]
+        d2 = np.maximum((delta ** 2).sum(axis=2), 1e-4)
+        force += (delta * (weight * k2 / d2)[:, :, None]).sum(axis=1)
+
+    # Campo próximo: pares de nós em células vizinhas do nível mais fino
+    order = np.argsort(inverse, kind='stable')
+    start = np.concatenate([[0], np.cumsum(mass)[:-1]])
+    counts = np.where(present, mass[where], 0).ravel()
+    src = np.repeat(np.repeat(np.arange(n), len(offsets)), counts)
+    first = np.repeat(start[where].ravel(), counts)
+    dst = order[first + np.arange(len(src)) - np.repeat(np.cumsum(counts) - counts, counts)]
+    keep = src != dst
+    src, dst = src[keep], dst[keep]
+    delta = pos[src] - pos[dst]
+    d2 = np.maximum((delta ** 2).sum(axis=1), 1e-4)
+    for axis in range(2):
+        force[:, axis] += np.bincount(src, weights=delta[:, axis] * k2 / d2, minlength=n)
+    return force
+
+
+def forceLayout(edges: np.ndarray, n: int, k: float = None, iterations: int = 50, seed: int = 42,
+                exact_limit: int = EXACT_LIMIT) -> np.ndarray:
+    """
+    Layout Fruchterman-Reingold (as mesmas forças e arrefecimento do nx.spring_layout),
+    vetorizado em NumPy: atração pelas arestas com bincount e repulsão exata (até exact_limit
+    nós) ou aproximada à Barnes-Hut (ver _barnesHutRepulsion).
+
+    Args:
+        edges (np.ndarray): Arestas (E, 2) com índices 0..n-1
+        n (int): Número de nós
+        k (float): Distância ótima entre nós (por omissão, 1/sqrt(n))
+        iterations (int): Número de iterações
+        seed (int): Semente das posições iniciais
+        exact_limit (int): Número máximo de nós para a repulsão exata
+
+    Returns:
+        np.ndarray: Posições (n, 2), centradas e escaladas para [-1, 1]
+    """
+    rng = np.random.default_rng(seed)
+    pos = rng.random((n, 2))
+    if n <= 1:
+        return np.zeros((n, 2))
+
+    k = k if k is not None else np.sqrt(1.0 / n)
+    k2 = k * k
+    edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+    u, v = edges[:, 0], edges[:, 1]
+
+    t = max(pos.max(axis=0) - pos.min(axis=0)) * 0.1
+    dt = t / (iterations + 1)
+    for _ in range(iterations):
+        displacement = _exactRepulsion(pos, k2) if n <= exact_limit else _barnesHutRepulsion(pos, k2)
+
+        # Atração: cada aresta puxa as extremidades com força d²/k
+        delta = pos[u] - pos[v]
+        pull = delta * (np.sqrt((delta ** 2).sum(axis=1)) / k)[:, None]
+        for axis in range(2):
+            displacement[:, axis] -= np.bincount(u, weights=pull[:, axis], minlength=n)
+            displacement[:, axis] += np.bincount(v, weights=pull[:, axis], minlength=n)
+
+        length = np.maximum(np.sqrt((displacement ** 2).sum(axis=1)), 0.01)
+        pos += displacement * (t / length)[:, None]
+        t -= dt
+
+    pos -= pos.mean(axis=0)
+    return pos / (np.abs(pos).max() or 1.0)
+
+
+def computeLayout(G: nx.Graph, method: str = 'force', k: float = None, iterations: int = 50,
+                  seed: int = 42) -> dict:
+    """Posições {nó: (x, y)} com o método pedido ('spring' ou 'force')."""
+    assert method in LAYOUTS
+    if method == 'spring':
+        return nx.spring_layout(G, k=k, iterations=iterations, seed=seed)
+
+    nodes = list(G.nodes())
+    index = {node: i for i, node in enumerate(nodes)}
+    edges = np.array([(index[a], index[b]) for a, b in G.edges()], dtype=np.int64).reshape(-1, 2)
+    pos = forceLayout(edges, len(nodes), k=k, iterations=iterations, seed=seed)
+    return dict(zip(nodes, pos))
+
+
+def layoutKey(G: nx.Graph, method: str, params: dict) -> str:
+    """Hash do conjunto de nós, das arestas e dos parâmetros do layout."""
+    nodes = np.sort(np.array(list(G.nodes()), dtype=np.int64))
+    edges = np.array(list(G.edges()), dtype=np.int64).reshape(-1, 2)
+    edges = np.sort(edges, axis=1)
+    edges = edges[np.lexsort((edges[:, 1], edges[:, 0]))]
+
+    digest = hashlib.sha256()
+    digest.update(nodes.tobytes())
+    digest.update(edges.tobytes())
+    digest.update(json.dumps({'method': method, **params}, sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+def cachedLayout(G: nx.Graph, cache_dir: Path = None, method: str = 'force', k: float = None,
+                 iterations: int = 50, seed: int = 42) -> dict:
+    """
+    Como computeLayout, mas guarda as posições em cache_dir (um .npz por subgrafo e parâmetros):
+    voltar a desenhar o mesmo subgrafo com outro estilo não recalcula o layout.
+
+    Args:
+        G (nx.Graph): Grafo a desenhar (nós inteiros)
+        cache_dir (Path): Pasta da cache (None -> sem cache)
+        method (str): 'spring' ou 'force'
+        k (float): Distância ótima entre nós
+        iterations (int): Número de iterações
+        seed (int): Semente
+
+    Returns:
+        dict: {nó: np.ndarray([x, y])}
+    """
+    params = {'k': k, 'iterations': iterations, 'seed': seed}
+    if cache_dir is None:
+        return computeLayout(G, method, **params)
+
+    cache_path = Path(cache_dir) / f"{method}_{layoutKey(G, method, params)[:16]}.npz"
+    if cache_path.exists():
+        cached = np.load(cache_path)
+        print(f"[layout] posições lidas de {cache_path.name}")
+        return dict(zip(cached['nodes'].tolist(), cached['pos']))
+
+    pos = computeLayout(G, method, **params)
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = cache_path.with_suffix('.tmp.npz')
+    np.savez(tmp_path, nodes=np.array(list(pos.keys()), dtype=np.int64), pos=np.array(list(pos.values())))
+    os.replace(tmp_path, cache_path)
+    return pos
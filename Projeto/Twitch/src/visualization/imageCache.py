@@ -0,0 +1,135 @@
+import hashlib
+import os
+import sys
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from pathlib import Path
+
+import numpy as np
+import requests
+from PIL import Image
+
+# Módulos partilhados em src/data
+sys.path.append(str(Path(__file__).resolve().parents[1] / 'data'))
+from twitchStorage import readTable
+
+
+class ImageCache:
+    """
+    Cache das imagens de perfil (profile_pic) usadas nos gráficos.
+
+    Cada imagem é descarregada uma única vez, reduzida para uma miniatura e guardada em disco
+    ({cache_dir}/{sha256 do URL}.png); as imagens já descodificadas ficam numa LRU em memória.
+    Com offline=True (ou sem rede) só é usado o que já está em disco.
+    """
+
+    def __init__(self, cache_dir: Path, thumbnail_size: int = 128, max_memory: int = 256,
+                 max_workers: int = 8, timeout: float = 10, offline: bool = False):
+        self.cache_dir = Path(cache_dir)
+        self.thumbnail_size = thumbnail_size
+        self.max_memory = max_memory
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.offline = offline
+        self._memory = OrderedDict()
+        # URLs que falharam nesta sessão (não voltam a ser pedidos)
+        self._failed = set()
+        self._session = requests.Session()
+
+    def path(self, url: str) -> Path:
+        """Ficheiro da miniatura de um URL."""
+        return self.cache_dir / f"{hashlib.sha256(url.encode()).hexdigest()[:32]}.png"
+
+    def _download(self, url: str) -> bool:
+        """Descarrega um URL e guarda a miniatura (escrita atómica). Devolve True se correu bem."""
+        try:
+            response = self._session.get(url, timeout=self.timeout)
+            response.raise_for_status()
+            image = Image.open(BytesIO(response.content)).convert('RGBA')
+            image.thumbnail((self.thumbnail_size, self.thumbnail_size))
+
+            path = self.path(url)
+            tmp_path = path.with_suffix('.tmp')
+            image.save(tmp_path, format='PNG')
+            os.replace(tmp_path, path)
+            return True
+        except Exception as e:
+            self._failed.add(url)
+            print(f"Não foi possível descarregar {url}: {type(e).__name__}")
+            return False
+
+    def prefetch(self, urls) -> dict:
+        """
+        Descarrega em paralelo (max_workers threads) os URLs que ainda não estão em disco.
+
+        Args:
+            urls (iterable): URLs das imagens (valores em falta são ignorados)
+
+        Returns:
+            dict: Número de imagens já em cache, descarregadas e com erro
+        """
+        urls = {url for url in urls if isinstance(url, str) and url}
+        missing = [url for url in urls if url not in self._failed and not self.path(url).exists()]
+        stats = {'cached': len(urls) - len(missing), 'downloaded': 0, 'failed': 0}
+        if not missing or self.offline:
+            stats['failed'] = len(missing)
+            return stats
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            results = list(executor.map(self._download, missing))
+        stats['downloaded'] = sum(results)
+        stats['failed'] = len(results) - stats['downloaded']
+        return stats
+
+    def get(self, url: str) -> np.ndarray:
+        """
+        Imagem (array RGBA) de um URL: da memória, do disco ou, em último caso, da rede.
+
+        Returns:
+            np.ndarray: Miniatura, ou None se não estiver disponível
+        """
+        if not isinstance(url, str) or not url:
+            return None
+        if url in self._memory:
+            self._memory.move_to_end(url)
+            return self._memory[url]
+
+        path = self.path(url)
+        if not path.exists():
+            if self.offline or url in self._failed:
+                return None
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            if not self._download(url):
+                return None
+
+        with Image.open(path) as image:
+            array = np.asarray(image.convert('RGBA'))
+        self._memory[url] = array
+        if len(self._memory) > self.max_memory:
+            self._memory.popitem(last=False)
+        return array
+
+
+def imageCacheDir(current_dir: Path) -> Path:
+    """Pasta das miniaturas (partilhada por todas as regiões): data/cache/profile_pics."""
+    while current_dir.name != "Twitch":
+        current_dir = current_dir.parent
+    return current_dir / 'data' / 'cache' / 'profile_pics'
+
+
+if __name__ == "__main__":
+    # Descarregar as imagens de perfil dos canais com mais views de cada região
+    current_dir = Path.cwd()
+    cache = ImageCache(imageCacheDir(current_dir))
+    while current_dir.name != "Twitch":
+        current_dir = current_dir.parent
+
+    countries = ["PTBR", "DE", "ENGB", "ES", "FR", "RU"]
+    top_n = 500
+    for country in countries:
+        target_path = current_dir / 'data' / country / 'processed_data' / f"Final_musae_{country}_target.csv"
+        nodes_df = readTable(target_path, columns=['views', 'profile_pic'])
+        urls = nodes_df.nlargest(top_n, 'views')['profile_pic']
+        print(f"{country}: {cache.prefetch(urls.dropna())}")